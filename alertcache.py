@@ -0,0 +1,244 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import snortparser as my_parser
+
+CACHE_HASH_SIZE = 64 * 1024  # bytes of the head and tail of a log file which are hashed for its fingerprint
+CACHE_VERSION = 2  # version of the cache files, older files are ignored
+
+
+class AlertCache:
+    """
+    persistent cache of the imported alerts of Snort log files (and optionally the nodes and edges generated from them)
+    the alerts are saved as columns of an AlertTable (numpy .npz file, dictionaries as JSON), keyed by the path of
+    the log file and checked against its fingerprint (size, modification time and hashes of the head and tail)
+    an unchanged file is loaded without parsing, if the file has grown only the appended alert blocks are parsed
+    """
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: folder of the cache files (created if it does not exist)
+        """
+        self.cache_dir = str(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_path(self, file_path, suffix):
+        """path of a cache file of the log file (named after the hash of its absolute path)"""
+        name = hashlib.sha1(os.path.abspath(str(file_path)).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + suffix)
+
+    def import_alerts(self, file_path, workers=1):
+        """
+        import the alerts of the log file from the cache, only the part of the file which is not cached is parsed
+        (same result as import_alerts(read_log_file(file_path), columnar=True))
+        :param file_path: file path of the Snort log file (alert)
+        :param workers: number of processes to parse the file (if it is not cached)
+        :return: AlertTable of the validated alerts sorted by timestamp
+        """
+        print('[*] Start importing alerts (cache ' + self.cache_dir + ')')
+        with open(file_path, 'rb') as current:
+            stat = os.fstat(current.fileno())
+            if stat.st_size == 0:
+                print('FILE IS EMPTY')
+                return my_parser.AlertTable()
+            with mmap.mmap(current.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                fingerprint = file_fingerprint(mm, stat)
+                alerts, meta = self.load_alerts(file_path)
+                start = 0
+                if alerts is None:
+                    print('[*] Log file not cached, parsing everything')
+                elif fingerprint == meta['fingerprint']:
+                    print('[*] Log file unchanged, loading ' + str(len(alerts)) + ' alerts from the cache')
+                    start = meta['parsed_end']
+                elif is_cached_prefix(mm, meta):
+                    print('[*] Log file has grown, parsing ' + str(stat.st_size - meta['parsed_end']) + ' new bytes')
+                    start = meta['parsed_end']
+                else:
+                    print('[*] Log file changed, parsing everything')
+                    alerts = None
+                if alerts is None:
+                    alerts = my_parser.AlertTable()
+                    meta = {'num_corrupted': 0}
+
+                # only complete alert blocks are cached, an incomplete last block is parsed again the next time
+                complete_end = max(start, my_parser.complete_blocks_end(mm))
+                if complete_end > start or fingerprint != meta.get('fingerprint'):
+                    new_alerts, num_corrupted = parse_byte_range(file_path, mm, start, complete_end, workers)
+                    if len(new_alerts):
+                        alerts.extend(new_alerts)
+                        alerts.sort()
+                    meta = {
+                        'parsed_end': complete_end,
+                        'parsed_head': hash_bytes(mm, 0, min(complete_end, CACHE_HASH_SIZE)),
+                        'parsed_tail': hash_bytes(mm, complete_end - CACHE_HASH_SIZE, complete_end),
+                        'fingerprint': fingerprint,
+                        'num_corrupted': meta['num_corrupted'] + num_corrupted,
+                    }
+                    self.save_alerts(file_path, alerts, meta)
+                num_corrupted = meta['num_corrupted']
+
+                # rest of the file (incomplete last block)
+                rest, rest_corrupted = parse_byte_range(file_path, mm, complete_end, stat.st_size, 1)
+                if len(rest):
+                    alerts.extend(rest)
+                    alerts.sort()
+                num_corrupted += rest_corrupted
+
+        print('[*] Importing alerts successful (' + str(len(alerts)) + ' successful / ' + str(
+            num_corrupted) + ' ignored)')
+        return alerts
+
+    def load_alerts(self, file_path):
+        """
+        load the cached alerts of the log file
+        :return: tuple of the AlertTable and the meta data (None, None if there are no valid cached alerts)
+        """
+        path = self.entry_path(file_path, '.npz')
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with np.load(path) as saved:
+                meta = json.loads(saved['meta'].tobytes().decode('utf-8'))
+                if meta.get('version') != CACHE_VERSION or meta.get('file_path') != os.path.abspath(str(file_path)) \
+                        or meta.get('year') != current_year():
+                    # other format, hash collision or the year of the timestamps has changed
+                    return None, None
+                alerts = my_parser.AlertTable()
+                alerts.set_columns({name: saved['column_' + name] for name in meta['columns']}, meta['names'],
+                                   meta['classifications'], meta['additionals'], meta['raws'])
+        except (OSError, ValueError, KeyError) as e:
+            print('[*] Ignoring broken cache file ' + path + ' (' + str(e) + ')')
+            return None, None
+        return alerts, meta
+
+    def save_alerts(self, file_path, alerts, meta):
+        """
+        save the alerts of the log file (written to a temporary file first, other processes may read the cache)
+        the cached nodes and edges of the file are removed (they belong to the old alerts)
+        :param alerts: AlertTable
+        :param meta: dict of parsed_end, parsed_head, parsed_tail, fingerprint and num_corrupted
+        """
+        columns = alerts.columns()
+        meta = dict(meta, version=CACHE_VERSION, file_path=os.path.abspath(str(file_path)), year=current_year(),
+                    columns=list(columns), names=alerts.names, classifications=alerts.classifications,
+                    additionals=alerts.additionals, raws=alerts.raws)
+        path = self.entry_path(file_path, '.npz')
+        temp_path = path + '.' + str(os.getpid()) + '.tmp'
+        with open(temp_path, 'wb') as saved:
+            np.savez(saved, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                     **{'column_' + name: column for name, column in columns.items()})
+        os.replace(temp_path, path)
+        graph_path = self.entry_path(file_path, '.graph.pickle')
+        if os.path.exists(graph_path):
+            os.remove(graph_path)
+
+    def load_graph(self, file_path, key):
+        """
+        return the cached nodes and edges of the log file
+        :param key: what the nodes and edges were generated for (e.g. number of time ranges)
+        :return: the saved graph (e.g. tuple of nodes and edges) or None if it is not cached or the file has changed
+        """
+        path = self.entry_path(file_path, '.graph.pickle')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as saved:
+            graphs = pickle.load(saved)
+        if graphs['fingerprint'] != current_fingerprint(file_path) or key not in graphs['graphs']:
+            return None
+        print('[*] Loading nodes and edges from the cache')
+        return graphs['graphs'][key]
+
+    def save_graph(self, file_path, key, graph):
+        """
+        save the nodes and edges of the log file (next to the other cached graphs of the unchanged file)
+        :param key: what the nodes and edges were generated for (e.g. number of time ranges)
+        :param graph: nodes and edges (anything which can be pickled)
+        """
+        path = self.entry_path(file_path, '.graph.pickle')
+        fingerprint = current_fingerprint(file_path)
+        graphs = {}
+        if os.path.exists(path):
+            with open(path, 'rb') as saved:
+                old = pickle.load(saved)
+            if old['fingerprint'] == fingerprint:
+                graphs = old['graphs']
+        graphs[key] = graph
+        temp_path = path + '.' + str(os.getpid()) + '.tmp'
+        with open(temp_path, 'wb') as saved:
+            pickle.dump({'fingerprint': fingerprint, 'graphs': graphs}, saved, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+
+def current_year():
+    """year of the timestamps without year (see parse_alert)"""
+    return str(datetime.datetime.now().year)
+
+
+def hash_bytes(mm, start, end):
+    """sha1 (hex) of the bytes start:end of the memory-mapped file (start is clipped to 0)"""
+    return hashlib.sha1(mm[max(0, start):end]).hexdigest()
+
+
+def file_fingerprint(mm, stat):
+    """
+    fingerprint of a log file: size, modification time and hashes of the first and last bytes
+    :param mm: memory-mapped log file
+    :param stat: os.stat_result of the file
+    :return: list (JSON serializable)
+    """
+    size = stat.st_size
+    return [size, stat.st_mtime_ns, hash_bytes(mm, 0, min(size, CACHE_HASH_SIZE)),
+            hash_bytes(mm, size - CACHE_HASH_SIZE, size)]
+
+
+def current_fingerprint(file_path):
+    """fingerprint of the log file (None if it is empty)"""
+    with open(file_path, 'rb') as current:
+        stat = os.fstat(current.fileno())
+        if stat.st_size == 0:
+            return None
+        with mmap.mmap(current.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return file_fingerprint(mm, stat)
+
+
+def is_cached_prefix(mm, meta):
+    """True if the cached part of the log file is unchanged (same first bytes and bytes before its end)"""
+    parsed_end = meta['parsed_end']
+    return parsed_end <= len(mm) and \
+        hash_bytes(mm, 0, min(parsed_end, CACHE_HASH_SIZE)) == meta['parsed_head'] and \
+        hash_bytes(mm, parsed_end - CACHE_HASH_SIZE, parsed_end) == meta['parsed_tail']
+
+
+def parse_byte_range(file_path, mm, start, end, workers=1):
+    """
+    parse the alerts of the bytes start:end of the log file (start is the beginning of an alert block)
+    :param file_path: file path of the Snort log file (alert)
+    :param mm: memory-mapped log file
+    :param workers: number of processes
+    :return: tuple of the AlertTable (sorted by timestamp) and the number of corrupted alerts
+    """
+    if end <= start:
+        return my_parser.AlertTable(), 0
+    if workers <= 1:
+        return my_parser.import_byte_range(file_path, (start, end), True)
+    ranges = my_parser.split_byte_ranges(mm, workers, start, end)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(my_parser.import_byte_range, [file_path] * len(ranges), ranges,
+                                    [True] * len(ranges)))
+    alerts = my_parser.AlertTable()
+    for table, _ in results:
+        alerts.extend(table)
+    alerts.sort()
+    return alerts, sum(corrupted for _, corrupted in results)
@@ -0,0 +1,91 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+# Benchmark: scaling of generate_nodes_and_edges (hash indexes) with the number of distinct hosts
+# compared to the former linear scans over all nodes and edges and to the vectorized engine
+# usage: python benchmarks/bench_aggregation.py [--hosts 1000 10000 100000] [--legacy_max_hosts 5000]
+import argparse
+import contextlib
+import io
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import snortparser as my_parser
+import synthetic
+
+
+def legacy_generate_nodes_and_edges(alerts_validated):
+    """the former aggregation: linear search of nodes and edges for every alert"""
+    all_nodes = []
+    all_edges = []
+    for alert_obj in alerts_validated:
+        for ip, port, new_type, is_from in [(alert_obj.from_ip, alert_obj.from_port, my_parser.TYPE_ATTACKER, True),
+                                            (alert_obj.to_ip, alert_obj.to_port, my_parser.TYPE_VICTIM, False)]:
+            existing_node, index = my_parser.find_node_by_ip(all_nodes, ip)
+            if not existing_node:
+                existing_node = my_parser.Node(ip, new_type)
+                all_nodes.append(existing_node)
+            elif is_from and existing_node.get_type() == my_parser.TYPE_VICTIM:
+                existing_node.set_type(my_parser.TYPE_COMPROMISED)
+            if port:
+                if is_from:
+                    existing_node.add_port_out(port)
+                else:
+                    existing_node.add_port_in(port)
+        flag = False
+        for edge in all_edges:
+            if edge.compare_with_alert(alert_obj):
+                edge.merge_with_alert(alert_obj)
+                flag = True
+        if not flag:
+            all_edges.append(my_parser.Edge([alert_obj.name], [alert_obj.classification], [alert_obj.priority],
+                                            alert_obj.from_ip, alert_obj.to_ip, [0], [alert_obj.from_port],
+                                            [alert_obj.to_port], [alert_obj.timestamp], [alert_obj.additional]))
+    return all_nodes, all_edges
+
+
+def measure(function, alerts):
+    """run function quietly and return the seconds and the result"""
+    start = perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(alerts)
+    return perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", dest='hosts', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='numbers of distinct hosts')
+    parser.add_argument("--alerts_per_host", dest='alerts_per_host', type=int, default=2,
+                        help='number of alerts per host')
+    parser.add_argument("--legacy_max_hosts", dest='legacy_max_hosts', type=int, default=5000,
+                        help='largest number of hosts for the (quadratic) legacy aggregation')
+    p = parser.parse_args()
+
+    print('%10s %10s %8s %8s %12s %14s %15s %12s' % ('hosts', 'alerts', 'nodes', 'edges', 'indexed [s]',
+                                                     'us per alert', 'vectorized [s]', 'legacy [s]'))
+    for num_hosts in p.hosts:
+        alerts = synthetic.generate_alerts(num_hosts * p.alerts_per_host, num_hosts)
+        seconds, (nodes, edges) = measure(my_parser.generate_nodes_and_edges, alerts)
+
+        table = my_parser.AlertTable()
+        for alert_obj in alerts:
+            table.append(alert_obj)
+        vectorized_seconds, (vectorized_nodes, vectorized_edges) = measure(
+            my_parser.generate_nodes_and_edges_vectorized, table)
+        assert [node.to_dict() for node in nodes] == vectorized_nodes.to_dict('records')
+        assert [edge.to_dict() for edge in edges] == vectorized_edges.to_dict('records')
+
+        legacy = '-'
+        if num_hosts <= p.legacy_max_hosts:
+            legacy_seconds, (legacy_nodes, legacy_edges) = measure(legacy_generate_nodes_and_edges, alerts)
+            assert [node.to_dict() for node in nodes] == [node.to_dict() for node in legacy_nodes]
+            assert [edge.to_dict() for edge in edges] == [edge.to_dict() for edge in legacy_edges]
+            legacy = '%.3f' % legacy_seconds
+        print('%10d %10d %8d %8d %12.3f %14.2f %15.3f %12s' % (num_hosts, len(alerts), len(nodes), len(edges),
+                                                              seconds, seconds / len(alerts) * 1e6,
+                                                              vectorized_seconds, legacy))
@@ -0,0 +1,56 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+# Benchmark: export and import time and file size of the nodes and edges files (csv, parquet, feather)
+# against the number of edges (synthetic alerts), csv reads the lists back with ast.literal_eval
+# usage: python benchmarks/bench_export.py [--edges 1000 10000 100000]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import snortparser as my_parser
+import synthetic
+
+
+def time_format(file_format, nodes, edges):
+    """seconds to export and import the nodes and edges in file_format and the size of the files (bytes)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = perf_counter()
+        nodes_file, edges_file = my_parser.export_nodes_and_edges(nodes, edges, file_format)
+        export_time = perf_counter() - start
+        start = perf_counter()
+        my_parser.import_nodes_and_edges(nodes_file, edges_file, file_format)
+        import_time = perf_counter() - start
+    return export_time, import_time, os.path.getsize(nodes_file) + os.path.getsize(edges_file)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", dest='edges', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='approximate numbers of edges')
+    p = parser.parse_args()
+
+    print('edges    format    export [s]   import [s]   size [MB]')
+    for num_edges in p.edges:
+        alerts = synthetic.generate_alerts(num_edges * 2, num_edges, max(1, num_edges // 100))
+        with contextlib.redirect_stdout(io.StringIO()):
+            nodes, edges = my_parser.generate_nodes_and_edges_vectorized(alerts)
+
+        # the files are written to the working directory (fix names)
+        with tempfile.TemporaryDirectory() as folder:
+            cwd = os.getcwd()
+            os.chdir(folder)
+            try:
+                for file_format in my_parser.EXPORT_FORMATS:
+                    export_time, import_time, size = time_format(file_format, nodes, edges)
+                    print('%-8d %-9s %-12.3f %-12.3f %.2f' % (len(edges), file_format, export_time, import_time,
+                                                              size / 1024 / 1024))
+            finally:
+                os.chdir(cwd)
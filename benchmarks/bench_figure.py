@@ -0,0 +1,73 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+# Benchmark: build time and JSON payload size of the figure (network_graph) against the number of edges
+# the batched edge traces are compared to the former one go.Scatter per edge
+# usage: python benchmarks/bench_figure.py [--edges 100 1000 10000] [--legacy_max_edges 5000]
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import plotly.graph_objs as go
+import plotly.utils
+
+import snortparser as my_parser
+import server as my_server
+import synthetic
+
+
+def legacy_edge_traces(figure_edges):
+    """the former edge traces: one go.Scatter per edge (same segments as the batched traces)"""
+    traces = []
+    for trace in figure_edges:
+        for index in range(0, len(trace.x), 3):
+            traces.append(go.Scatter(x=tuple(trace.x[index:index + 2]) + (None,),
+                                     y=tuple(trace.y[index:index + 2]) + (None,),
+                                     mode='lines',
+                                     line={'width': trace.line.width},
+                                     marker=dict(color=trace.line.color),
+                                     line_shape='spline',
+                                     opacity=1))
+    return traces
+
+
+def json_size(value):
+    return len(json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", dest='edges', type=int, nargs='+', default=[100, 1000, 5000, 10000],
+                        help='approximate numbers of edges')
+    parser.add_argument("--legacy_max_edges", dest='legacy_max_edges', type=int, default=10000,
+                        help='build the former per edge traces only up to this number of edges')
+    p = parser.parse_args()
+
+    print('edges    traces   build [s]   JSON [MB]   edge traces [MB]   legacy traces   legacy build [s]   legacy [MB]')
+    for num_edges in p.edges:
+        alerts = synthetic.generate_alerts(num_edges * 2, num_edges, max(1, num_edges // 20))
+        with contextlib.redirect_stdout(io.StringIO()):
+            nodes, edges = my_parser.generate_nodes_and_edges_vectorized(alerts)
+
+        start = perf_counter()
+        figure = my_server.network_graph(nodes, edges, '')
+        build_time = perf_counter() - start
+        size = json_size(figure)
+        figure_edges = [trace for trace in figure['data'] if trace.mode == 'lines']
+        edges_size = json_size(figure_edges)
+
+        legacy = '-'
+        if len(edges) <= p.legacy_max_edges:
+            start = perf_counter()
+            traces = legacy_edge_traces(figure_edges)
+            legacy_time = perf_counter() - start
+            legacy = '%-15d %-18.3f %.3f' % (len(traces), legacy_time, json_size(traces) / 1e6)
+        print('%-8d %-8d %-11.3f %-11.3f %-18.3f %s' % (len(edges), len(figure['data']), build_time,
+                                                        size / 1e6, edges_size / 1e6, legacy))
@@ -0,0 +1,55 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+# Benchmark: time of the layouts (shell, force-directed, incremental) against the number of nodes
+# incremental: first layout from scratch and placing 1% new nodes into the layout of the other nodes
+# usage: python benchmarks/bench_layout.py [--nodes 1000 10000 100000]
+import argparse
+import contextlib
+import io
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import snortparser as my_parser
+import server as my_server
+import synthetic
+
+
+def time_layout(name, nodes, edges):
+    """seconds to compute the layout name of the graph (without cache)"""
+    nodeSet = dict.fromkeys(nodes['IP'])
+    shells = [[''], list(nodeSet)]
+    start = perf_counter()
+    my_server.LAYOUTS[name](nodeSet, edges, shells)
+    return perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", dest='nodes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='approximate numbers of nodes')
+    p = parser.parse_args()
+
+    print('nodes    edges    shell [s]   force [s]   incremental [s]   incremental +1% [s]')
+    for num_nodes in p.nodes:
+        alerts = synthetic.generate_alerts(num_nodes * 2, num_nodes, max(1, num_nodes // 100))
+        with contextlib.redirect_stdout(io.StringIO()):
+            nodes, edges = my_parser.generate_nodes_and_edges_vectorized(alerts)
+
+        shell_time = time_layout('shell', nodes, edges)
+        force_time = time_layout('force', nodes, edges)
+        my_server.g_node_positions = {}
+        incremental_time = time_layout('incremental', nodes, edges)
+
+        # place the last 1% of the nodes into the layout of the others (placed at the start)
+        added = set(nodes['IP'][-max(1, len(nodes) // 100):])
+        with contextlib.redirect_stdout(io.StringIO()):
+            my_server.g_node_positions = my_server.sweep_layouts(
+                [nodes[~nodes['IP'].isin(added)]], [edges[~edges['From IP'].isin(added) & ~edges['To IP'].isin(added)]])
+        added_time = time_layout('incremental', nodes, edges)
+        print('%-8d %-8d %-11.3f %-11.3f %-17.3f %.3f' % (len(nodes), len(edges), shell_time, force_time,
+                                                          incremental_time, added_time))
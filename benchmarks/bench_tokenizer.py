@@ -0,0 +1,40 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+# Micro-benchmark: fast header tokenizer vs. regular expressions (parse_alert with fast=False)
+# usage: python benchmarks/bench_tokenizer.py [--file_path exampleLogs/iot/alert] [--repeat 5]
+import argparse
+import os
+import sys
+from pathlib import Path
+from timeit import repeat
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import snortparser as my_parser
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file_path", dest='file_path', type=Path, default=Path('exampleLogs/iot/alert'),
+                        help='path to snort log file')
+    parser.add_argument("--repeat", dest='repeat', type=int, default=5, help='number of measurements')
+    p = parser.parse_args()
+
+    blocks = list(my_parser.read_log_file(p.file_path))
+
+    # both paths have to produce the same alerts
+    for block in blocks:
+        fast = vars(my_parser.parse_alert(block, '2020', fast=True))
+        regex = vars(my_parser.parse_alert(block, '2020', fast=False))
+        assert fast == regex, block
+
+    results = {}
+    for name, fast in [('regex', False), ('tokenizer', True)]:
+        timings = repeat(lambda: [my_parser.parse_alert(block, '2020', fast=fast) for block in blocks],
+                         number=1, repeat=p.repeat)
+        results[name] = min(timings)
+        print('[*] %-10s %8.2f ms  (%6.2f us per alert)' % (name, results[name] * 1000,
+                                                           results[name] / len(blocks) * 1e6))
+
+    print('[*] %d alerts, speedup: %.2fx' % (len(blocks), results['regex'] / results['tokenizer']))
@@ -0,0 +1,77 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+# Synthetic Snort alerts for the benchmarks (scan-heavy traffic with many distinct hosts)
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import snortparser as my_parser
+
+SIGNATURES = [
+    ('129:14:1', 'TCP Timestamp is missing', 'Potentially Bad Traffic', '2'),
+    ('129:15:1', 'Reset outside window', 'Potentially Bad Traffic', '2'),
+    ('129:12:1', 'Consecutive TCP small segments exceeding threshold', 'Potentially Bad Traffic', '2'),
+    ('129:4:1', 'TCP Timestamp is outside of PAWS window', 'Generic Protocol Command Decode', '3'),
+    ('1:469:3', 'ICMP PING NMAP', 'Attempted Information Leak', '2'),
+    ('1:1418:11', 'SNMP request tcp', 'Attempted Information Leak', '2'),
+    ('1:2465:7', 'NETBIOS SMB-DS IPC$ share access', 'Generic Protocol Command Decode', '3'),
+    ('1:41978:3', 'OS-WINDOWS Microsoft Windows SMB remote code execution attempt', 'Attempted Administrator Privilege Gain', '1'),
+]
+START_TIME = my_parser.parse_timestamp('2020/05/31-08:00:00.000000')
+
+
+def host_ip(index):
+    """distinct IPv4 address of the host with the given index (10.0.0.0/8)"""
+    return my_parser.int_to_ip((10 << 24) + index + 1)
+
+
+def generate_alerts(num_alerts, num_hosts, num_attackers=None, seed=0):
+    """
+    generate validated alert objects sorted by time: a few attackers scan all hosts
+    :param num_alerts: number of alerts
+    :param num_hosts: number of distinct hosts (every host is hit at least once if num_alerts >= num_hosts)
+    :param num_attackers: number of scanning hosts (default: 1% of the hosts)
+    :return: list of alert objects
+    """
+    rnd = random.Random(seed)
+    num_attackers = num_attackers or max(1, num_hosts // 100)
+    alerts = []
+    time = START_TIME
+    for i in range(num_alerts):
+        time += rnd.randint(1, 2000000)
+        rule, name, classification, priority = rnd.choice(SIGNATURES)
+        alert_obj = my_parser.Alert()
+        alert_obj.name = name
+        alert_obj.classification = classification
+        alert_obj.priority = priority
+        alert_obj.from_ip = host_ip(rnd.randrange(num_attackers))
+        alert_obj.to_ip = host_ip(i % num_hosts if i < num_hosts else rnd.randrange(num_hosts))
+        if rnd.random() < 0.05:
+            # some replies of the victims
+            alert_obj.from_ip, alert_obj.to_ip = alert_obj.to_ip, alert_obj.from_ip
+        if name != 'ICMP PING NMAP':
+            alert_obj.from_port = str(rnd.randint(1024, 65535))
+            alert_obj.to_port = str(rnd.choice([22, 80, 139, 443, 445, 502, 8080]))
+        alert_obj.time = time
+        alert_obj.timestamp = my_parser.timestamp_to_datetime(time).strftime(my_parser.TIMESTAMP_FORMAT)
+        alerts.append(alert_obj)
+    return alerts
+
+
+def write_log(file_path, alerts):
+    """write alert objects in the Snort alert (full) format"""
+    with open(file_path, 'w') as log:
+        for alert_obj in alerts:
+            rule = [signature[0] for signature in SIGNATURES if signature[1] == alert_obj.name][0]
+            log.write('[**] [' + rule + '] ' + alert_obj.name + ' [**]\n')
+            log.write('[Classification: ' + alert_obj.classification + '] [Priority: ' + alert_obj.priority + '] \n')
+            # Snort leaves out the year
+            source = alert_obj.from_ip + (':' + alert_obj.from_port if alert_obj.from_port else '')
+            destination = alert_obj.to_ip + (':' + alert_obj.to_port if alert_obj.to_port else '')
+            log.write(alert_obj.timestamp[5:] + ' ' + source + ' -> ' + destination + '\n')
+            log.write('TCP TTL:64 TOS:0x0 ID:0 IpLen:20 DgmLen:40 DF\n')
+            log.write('***A**** Seq: 0x87B912FB  Ack: 0xE2EE832A  Win: 0x400  TcpLen: 20\n\n')
@@ -0,0 +1,187 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+import atexit
+import itertools
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+import snortparser as my_parser
+from lrucache import LRUCache
+
+DATASET_RAM_BUDGET = 1024 * 1024 * 1024  # maximal size of the loaded datasets (bytes, approximate, see state_size)
+SIZE_SAMPLE = 100  # number of items of a long list or dict whose sizes are measured (object_size)
+
+
+class DatasetPool:
+    """
+    registered datasets (e.g. snort log files or csv pairs) which are parsed lazily the first time they are opened,
+    the loaded datasets are kept in an LRU pool within a RAM budget (the dataset loaded last is kept even if it is
+    larger than the budget, it is shown anyway)
+    the parsed state of an evicted dataset is spilled to disk, so it is read back from there instead of being parsed
+    again when it is opened the next time (also by other worker processes sharing the spill folder)
+    """
+
+    def __init__(self, ram_budget=DATASET_RAM_BUDGET, spill_dir=None, on_evict=None):
+        """
+        :param ram_budget: maximal size of the loaded datasets (bytes, approximate memory of the parsed states)
+        :param spill_dir: folder for the spilled datasets (default: temporary folder), a subfolder is created
+        and removed at exit
+        :param on_evict: if existing: function(name) called when a dataset was evicted from the pool (e.g. to drop
+        the data kept for it elsewhere)
+        """
+        self.loaders = {}  # name -> function returning the parsed state of the dataset
+        self.spill_paths = {}  # name -> file of the spilled parsed state
+        self.load_locks = {}  # name -> lock held while the dataset is loaded (other datasets are loaded meanwhile)
+        self.pool = LRUCache(sys.maxsize, ram_budget, self.evicted, keep_last=True)  # name -> parsed state
+        self.spilling = {}  # name -> parsed state of an evicted dataset while it is written to the spill folder
+        self.on_evict = on_evict
+        self.spill_dir = tempfile.mkdtemp(prefix='snort-net-viewer-', dir=spill_dir)
+        self.owner = os.getpid()
+        self.lock = threading.Lock()  # counters and spilling
+        self.num_loads = 0  # number of parsed datasets
+        self.num_spill_loads = 0  # number of datasets read back from the spill folder
+        self.num_spills = 0  # number of datasets written to the spill folder
+        atexit.register(self.remove_spill_dir)
+
+    def __len__(self):
+        return len(self.loaders)
+
+    def register(self, name, loader):
+        """
+        add a dataset (not loaded yet)
+        :param name: unique name of the dataset (e.g. path of the file)
+        :param loader: function without arguments returning the parsed state of the dataset
+        """
+        if name in self.loaders:
+            raise ValueError('dataset already registered: ' + name)
+        self.spill_paths[name] = os.path.join(self.spill_dir, str(len(self.loaders)) + '.pickle')
+        self.load_locks[name] = threading.Lock()
+        self.loaders[name] = loader
+
+    def names(self):
+        """names of the registered datasets (in order of registration)"""
+        return list(self.loaders)
+
+    def get(self, name):
+        """
+        return the parsed state of the dataset, loaded from the spill folder or parsed if it is not in the pool
+        a dataset is loaded once even if it is requested by several threads, other datasets are served meanwhile
+        """
+        state = self.pool.get(name)
+        if state is not None:
+            return state
+        with self.load_locks[name]:
+            # loaded by another thread while waiting
+            state = self.pool.get(name)
+            if state is not None:
+                return state
+            path = self.spill_paths[name]
+            with self.lock:
+                # evicted, but still being spilled
+                state = self.spilling.get(name)
+            if state is None and os.path.exists(path):
+                print('[*] Loading dataset ' + name + ' from the spill folder')
+                with open(path, 'rb') as spilled:
+                    state = pickle.load(spilled)
+                with self.lock:
+                    self.num_spill_loads += 1
+            elif state is None:
+                print('[*] Loading dataset ' + name)
+                state = self.loaders[name]()
+                with self.lock:
+                    self.num_loads += 1
+            self.pool.put(name, state, state_size(state))
+            return state
+
+    def evicted(self, name, state):
+        """
+        spill a dataset evicted from the pool (once, the parsed state does not change) and call on_evict
+        (called by the pool in the thread which loaded another dataset)
+        """
+        path = self.spill_paths[name]
+        if not os.path.exists(path):
+            with self.lock:
+                self.spilling[name] = state
+            print('[*] Spilling dataset ' + name)
+            # written to a temporary file first (other processes may spill the same dataset)
+            temp_path = path + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+            with open(temp_path, 'wb') as spilled:
+                pickle.dump(state, spilled, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+            with self.lock:
+                self.spilling.pop(name, None)
+                self.num_spills += 1
+        if self.on_evict is not None:
+            self.on_evict(name)
+
+    def remove_spill_dir(self):
+        """remove the spill folder (only by the process which created it)"""
+        if os.getpid() == self.owner:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+def state_size(state):
+    """
+    approximate memory of a parsed state (bytes): DataFrames with frame_size, snapshots of time ranges with
+    snapshots_size (once for the nodes and edges), lists and tuples item by item and anything else with object_size
+    """
+    snapshots = {}  # id -> TimeRangeSnapshots
+
+    def size_of(value):
+        if isinstance(value, pd.DataFrame):
+            return frame_size(value)
+        if isinstance(value, my_parser.SnapshotList):
+            snapshots[id(value.snapshots)] = value.snapshots
+            return 0
+        if isinstance(value, (list, tuple)):
+            return sys.getsizeof(value) + sum(size_of(item) for item in value)
+        return object_size(value)
+
+    return size_of(state) + sum(snapshots_size(time_ranges) for time_ranges in snapshots.values())
+
+
+def object_size(value):
+    """
+    approximate memory of a value of plain objects (bytes): lists, tuples and dicts with their items, the items
+    of long ones are estimated from a sample of SIZE_SAMPLE items
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        sample = list(itertools.islice(value.items(), SIZE_SAMPLE))
+    elif isinstance(value, (list, tuple)):
+        sample = value[::max(1, len(value) // SIZE_SAMPLE)]
+    else:
+        return size
+    if len(sample) > 0:
+        size += sum(object_size(item) for item in sample) * len(value) // len(sample)
+    return size
+
+
+def frame_size(frame):
+    """memory of a DataFrame (bytes): memory_usage(deep=True) and the items of the lists in the cells"""
+    size = int(frame.memory_usage(deep=True).sum())
+    for column in frame.columns:
+        if frame[column].dtype == object:
+            size += sum(sys.getsizeof(item) for cell in frame[column] if isinstance(cell, list) for item in cell)
+    return size
+
+
+def snapshots_size(time_ranges):
+    """
+    approximate memory of TimeRangeSnapshots (bytes): the deltas and marks (object_size) and a full snapshot cache
+    (every cached snapshot counted like the last time range, the largest one)
+    """
+    if len(time_ranges) == 0:
+        return 0
+    nodes, edges = time_ranges.get(-1)
+    stored = object_size((time_ranges.deltas, time_ranges.node_marks, time_ranges.edge_marks))
+    return stored + time_ranges.cache.max_items * (frame_size(nodes) + frame_size(edges))
@@ -0,0 +1,276 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+from collections import deque
+from time import perf_counter
+
+import networkx as nx
+import numpy as np
+
+INCREMENTAL_ITERATIONS = 30  # maximal number of refinement iterations for the new nodes
+INCREMENTAL_MAX_PAIRS = 300 * 1000 * 1000  # bound of the repulsion computations (new nodes x cells x iterations)
+GRID_SIZE = 32  # the repulsion is computed from the centroids of GRID_SIZE x GRID_SIZE cells
+REPULSION_CHUNK = 4 * 1000 * 1000  # number of (node, cell) pairs whose repulsion is computed at once (memory bound)
+SPRING_MAX_NODES = 500  # the first layout of smaller graphs is the spring layout of networkx (force_layout else)
+CALIBRATION_SAMPLE = 1000  # pinned nodes used to estimate the distances and forces of the previous layouts
+FORCE_ITERATIONS = 100  # maximal number of iterations of the force-directed layout
+FORCE_TIME_BUDGET = 10.0  # seconds after which the iterations of the force-directed layout are stopped
+FORCE_GRID = 256  # maximal cells per side of the grid on which the repulsion of the force-directed layout is computed
+FORCE_GRAVITY = 0.5  # pull to the center (keeps the components together)
+MESH_SOFTENING = 0.25  # softening of the grid distances (squared, in cells)
+
+
+def incremental_layout(G, previous=None, iterations=INCREMENTAL_ITERATIONS, seed=None):
+    """
+    force-directed layout warm started from previous positions: nodes with a previous position are pinned,
+    only the new nodes are placed (next to their already placed neighbors) and refined with a few iterations
+    of Fruchterman-Reingold forces, so the layout stays stable between snapshots
+    :param G: networkx graph of the snapshot
+    :param previous: dict node -> position (x, y) from previous snapshots (not modified)
+    :param iterations: maximal number of refinement iterations (fewer for very large graphs)
+    :param seed: seed of the random positions (nodes without placed neighbors)
+    :return: dict node -> position (numpy array) of all nodes of G
+    """
+    previous = previous or {}
+    nodes = list(G)
+    pos = np.zeros((len(nodes), 2))
+    placed = np.zeros(len(nodes), dtype=bool)
+    for i, node in enumerate(nodes):
+        if node in previous:
+            pos[i] = previous[node]
+            placed[i] = True
+    new = np.flatnonzero(~placed)
+    if len(new) == 0:
+        return dict(zip(nodes, pos))
+    if len(new) == len(nodes):
+        # first layout
+        if len(nodes) < SPRING_MAX_NODES:
+            return nx.spring_layout(G, seed=seed)
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+        return dict(zip(nodes, force_layout(edges[:, 0], edges[:, 1], len(nodes), seed=seed)))
+    rng = np.random.default_rng(seed)
+    pinned = placed.copy()
+    index = {node: i for i, node in enumerate(nodes)}
+    neighbors = {}  # node index -> indexes of the neighbors (both directions, without duplicates and loops)
+
+    def neighbors_of(i):
+        if i not in neighbors:
+            neighbors[i] = [index[neighbor] for neighbor in dict.fromkeys(nx.all_neighbors(G, nodes[i]))
+                            if neighbor != nodes[i]]
+        return neighbors[i]
+
+    # size of the drawing: bounding box of the pinned nodes ([-1, 1] at first)
+    # optimal distance k of two nodes: median length of the pinned edges (of a sample, like the previous layouts)
+    if pinned.any():
+        low = pos[pinned].min(axis=0)
+        high = pos[pinned].max(axis=0)
+    else:
+        low, high = np.array([-1.0, -1.0]), np.array([1.0, 1.0])
+    side = max(float((high - low).max()), 2.0 / np.sqrt(len(nodes)))
+    low, high = (low + high - side) / 2, (low + high + side) / 2
+    sample = np.flatnonzero(pinned)
+    if len(sample) > CALIBRATION_SAMPLE:
+        sample = rng.choice(sample, CALIBRATION_SAMPLE, replace=False)
+    pinned_edges = np.array([(i, j) for i in sample for j in neighbors_of(i) if pinned[j]],
+                            dtype=np.int64).reshape(-1, 2)
+    if len(pinned_edges):
+        k = float(np.median(np.sqrt(((pos[pinned_edges[:, 0]] - pos[pinned_edges[:, 1]]) ** 2).sum(axis=1))))
+    else:
+        k = side / np.sqrt(len(nodes))
+    k = max(k, 1e-6)
+
+    # the pinned nodes are counted in the grid cells once, the new nodes in every iteration
+    softening = max((side / GRID_SIZE / 2) ** 2, (k / 100) ** 2)
+    pinned_counts, pinned_sums = grid_sums(pos[pinned], low, side)
+    repulsion = calibrate_repulsion(pos, sample, pinned_edges, k, pinned_counts, pinned_sums, softening)
+
+    place_new_nodes(pos, placed, new, neighbors_of, low, high, k, rng)
+
+    # edges with a new node (attraction), the new nodes are repelled by all nodes
+    edges = np.array([(i, j) for i in new for j in neighbors_of(i) if i < j or pinned[j]],
+                     dtype=np.int64).reshape(-1, 2)
+    iterations = min(iterations, INCREMENTAL_MAX_PAIRS // (len(new) * GRID_SIZE * GRID_SIZE))
+    # short refinement: the new nodes move at most one optimal distance k per iteration (cooling down)
+    temperature = k
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        counts, sums = grid_sums(pos[new], low, side)
+        displacement = np.zeros((len(nodes), 2))
+        displacement[new] = repulsion * grid_repulsion(pinned_counts + counts, pinned_sums + sums, pos[new],
+                                                       softening)
+        delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+        distance = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), k / 100)
+        force = delta * (distance / k)[:, None]
+        np.add.at(displacement, edges[:, 0], -force)
+        np.add.at(displacement, edges[:, 1], force)
+        # move the new nodes at most temperature far
+        length = np.maximum(np.sqrt((displacement[new] ** 2).sum(axis=1)), 1e-12)
+        pos[new] += displacement[new] * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+    return dict(zip(nodes, pos))
+
+
+def calibrate_repulsion(pos, sample, pinned_edges, k, counts, sums, softening):
+    """
+    strength of the repulsion (k^2 in Fruchterman-Reingold) for which the sample of pinned nodes is closest to an
+    equilibrium of the forces (least squares fit), so the new nodes fit into the density of the previous layouts
+    :param pinned_edges: all pinned edges of the sample nodes (sample node, neighbor)
+    :param counts: grid_sums of the pinned nodes
+    """
+    if len(pinned_edges) == 0:
+        return k * k
+    attraction = np.zeros((len(pos), 2))
+    delta = pos[pinned_edges[:, 0]] - pos[pinned_edges[:, 1]]
+    np.add.at(attraction, pinned_edges[:, 0], -delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None])
+    attraction = attraction[sample]
+    repulsion = grid_repulsion(counts, sums, pos[sample], softening)
+    strength = -(attraction * repulsion).sum() / max((repulsion * repulsion).sum(), 1e-300)
+    return strength if strength > 0 else k * k
+
+
+def grid_sums(points, low, size):
+    """
+    number of points and sums of their positions in the cells of a GRID_SIZE x GRID_SIZE grid
+    over the square [low, low + size] (points outside are counted in the border cells)
+    """
+    cells = np.clip(((points - low) / size * GRID_SIZE).astype(np.int64), 0, GRID_SIZE - 1)
+    cells = cells[:, 0] * GRID_SIZE + cells[:, 1]
+    counts = np.bincount(cells, minlength=GRID_SIZE * GRID_SIZE)
+    sums = np.column_stack([np.bincount(cells, points[:, 0], GRID_SIZE * GRID_SIZE),
+                            np.bincount(cells, points[:, 1], GRID_SIZE * GRID_SIZE)])
+    return counts, sums
+
+
+def grid_repulsion(counts, sums, targets, softening):
+    """
+    repulsion (strength 1, i.e. 1 / distance) on the targets, every grid cell (grid_sums) repels with the number
+    of its points from their centroid
+    :param softening: added to the squared distances (the points of a cell are spread over the cell)
+    :return: numpy array (len(targets) x 2) of the displacements
+    """
+    used = counts > 0
+    counts = counts[used]
+    centroids = sums[used] / counts[:, None]
+    centroids2 = (centroids ** 2).sum(axis=1)
+    result = np.zeros((len(targets), 2))
+    chunk = max(1, REPULSION_CHUNK // max(len(centroids), 1))
+    for start in range(0, len(targets), chunk):
+        rows = targets[start:start + chunk]
+        # squared distances |t|^2 + |c|^2 - 2 t.c and sum of weight * (t - c) as matrix products
+        distance2 = (rows ** 2).sum(axis=1)[:, None] + centroids2[None, :] - 2 * rows @ centroids.T
+        weights = counts / (np.maximum(distance2, 0) + softening)
+        result[start:start + chunk] = rows * weights.sum(axis=1)[:, None] - weights @ centroids
+    return result
+
+
+def place_new_nodes(pos, placed, new, neighbors_of, low, high, k, rng):
+    """
+    initial positions of the new nodes in breadth-first order: next to the mean of their placed neighbors,
+    nodes without placed neighbors (e.g. first node of a new component) at a random position in [low, high]
+    :param neighbors_of: function node index -> indexes of the neighbors
+    """
+    queue = deque(i for i in new if any(placed[j] for j in neighbors_of(i)))
+    queued = np.zeros(len(placed), dtype=bool)
+    queued[list(queue)] = True
+    remaining = iter(new)
+    while True:
+        if not queue:
+            # next component without placed nodes
+            root = next((i for i in remaining if not queued[i]), None)
+            if root is None:
+                break
+            queued[root] = True
+            queue.append(root)
+        i = queue.popleft()
+        around = [j for j in neighbors_of(i) if placed[j]]
+        if around:
+            pos[i] = pos[around].mean(axis=0) + (rng.random(2) - 0.5) * k
+        else:
+            pos[i] = low + rng.random(2) * (high - low)
+        placed[i] = True
+        for j in neighbors_of(i):
+            if not placed[j] and not queued[j]:
+                queued[j] = True
+                queue.append(j)
+
+
+def force_layout(sources, targets, num_nodes, iterations=FORCE_ITERATIONS, time_budget=FORCE_TIME_BUDGET, seed=None):
+    """
+    force-directed layout (Fruchterman-Reingold) for large graphs: the repulsion of all nodes is computed on a grid
+    by FFT convolution (particle-mesh, O(n + grid^2 log grid) per iteration instead of O(n^2)), the attraction along
+    the edges of the sparse edge list, a weak gravity keeps the components together
+    :param sources: numpy array with the index of the first node of every edge
+    :param targets: numpy array with the index of the second node of every edge
+    :param num_nodes: number of nodes (indexes 0 to num_nodes - 1)
+    :param iterations: maximal number of iterations
+    :param time_budget: seconds after which the iterations are stopped (None: no limit)
+    :param seed: seed of the random start positions
+    :return: numpy array (num_nodes x 2) of the positions in [-1, 1]
+    """
+    start = perf_counter()
+    pos = np.random.default_rng(seed).uniform(-1, 1, (num_nodes, 2))
+    if num_nodes < 2:
+        return np.zeros((num_nodes, 2))
+    loops = sources == targets
+    sources, targets = sources[~loops], targets[~loops]
+    # optimal distance k: the nodes fill an area of about 4
+    k = 2 / np.sqrt(num_nodes)
+    # about 2 sqrt(n) cells per side (power of 2 for the FFT)
+    mesh = ForceMesh(int(min(FORCE_GRID, max(32, 2 ** np.ceil(np.log2(2 * np.sqrt(num_nodes)))))))
+    temperature = 0.5
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        displacement = k * k * mesh.repulsion(pos)
+        delta = pos[sources] - pos[targets]
+        distance = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), k / 100)
+        force = delta * (distance / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] += np.bincount(targets, force[:, axis], num_nodes) - \
+                                     np.bincount(sources, force[:, axis], num_nodes)
+        displacement -= FORCE_GRAVITY * pos
+        # move every node at most temperature far
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-12)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+        if time_budget is not None and perf_counter() - start > time_budget:
+            break
+    # rescale to [-1, 1] like the layouts of networkx
+    pos -= pos.mean(axis=0)
+    scale = np.abs(pos).max()
+    return pos / scale if scale > 0 else pos
+
+
+class ForceMesh:
+    """
+    repulsion (1 / distance) of all nodes computed on a grid x grid mesh: the nodes are counted in the cells
+    and the counts are convolved (FFT) with the force kernel, every node gets the force of its cell
+    (the nodes of the same cell do not repel each other)
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        # kernel offset / (offset^2 + softening) for the offsets -grid .. grid - 1 (in cells, wrapped around
+        # for the zero padded convolution), scaled with 1 / cell size later
+        offsets = np.arange(2 * grid)
+        offsets = np.where(offsets < grid, offsets, offsets - 2 * grid).astype(float)
+        dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+        distance2 = dx ** 2 + dy ** 2 + MESH_SOFTENING
+        self.kernel_x = np.fft.rfft2(dx / distance2)
+        self.kernel_y = np.fft.rfft2(dy / distance2)
+
+    def repulsion(self, pos):
+        """:return: numpy array (len(pos) x 2) of the repulsion (strength 1) on every node"""
+        grid = self.grid
+        low = pos.min(axis=0)
+        cell_size = max(float((pos.max(axis=0) - low).max()), 1e-12) / (grid - 1)
+        cells = np.clip(((pos - low) / cell_size).astype(np.int64), 0, grid - 1)
+        cells = cells[:, 0] * grid + cells[:, 1]
+        counts = np.zeros((2 * grid, 2 * grid))
+        counts[:grid, :grid] = np.bincount(cells, minlength=grid * grid).reshape(grid, grid)
+        counts = np.fft.rfft2(counts)
+        force_x = np.fft.irfft2(counts * self.kernel_x, s=(2 * grid, 2 * grid))[:grid, :grid].ravel()
+        force_y = np.fft.irfft2(counts * self.kernel_y, s=(2 * grid, 2 * grid))[:grid, :grid].ravel()
+        return np.column_stack([force_x[cells], force_y[cells]]) / cell_size
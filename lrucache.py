@@ -0,0 +1,105 @@
+######################################################
+#    Snort Net Viewer                                #
+#    author: David Krüger                            #
+#    https://github.com/david-tub/snort-net-viewer   #
+######################################################
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    small least-recently-used cache: the least recently used entries are evicted
+    when more than max_items entries are stored or (if max_bytes is given) their sizes exceed max_bytes
+    thread-safe (the callbacks of the server run in several threads)
+    """
+
+    def __init__(self, max_items=8, max_bytes=None, on_evict=None, keep_last=False):
+        """
+        :param on_evict: if existing: function(key, value) called for every evicted entry (after the entry is
+        removed, outside the lock of the cache)
+        :param keep_last: True -> the entry put last is kept even if it is larger than max_bytes
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.keep_last = keep_last
+        self.items = OrderedDict()
+        self.sizes = {}  # key -> size of the entry (bytes, as given to put)
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # locks cannot be pickled (e.g. the cache of snapshots sent to a worker process)
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key, default=None):
+        """return the cached value (and mark it as recently used) or default"""
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size=0):
+        """
+        add or replace an entry and evict the least recently used entries if necessary
+        :param size: size of the entry in bytes (limited by max_bytes if given), an entry
+        larger than max_bytes is not kept (unless keep_last)
+        """
+        evicted = []
+        with self.lock:
+            if key in self.items:
+                self.num_bytes -= self.sizes[key]
+            self.items[key] = value
+            self.items.move_to_end(key)
+            self.sizes[key] = size
+            self.num_bytes += size
+            while len(self.items) > self.max_items or \
+                    (self.max_bytes is not None and self.num_bytes > self.max_bytes and
+                     len(self.items) > (1 if self.keep_last else 0)):
+                old_key, old_value = self.items.popitem(last=False)
+                self.num_bytes -= self.sizes.pop(old_key)
+                evicted.append((old_key, old_value))
+        if self.on_evict is not None:
+            for old_key, old_value in evicted:
+                self.on_evict(old_key, old_value)
+
+    def remove_where(self, predicate):
+        """
+        remove the entries for which predicate(key, value) is true (not evicted, on_evict is not called)
+        :return: number of removed entries
+        """
+        with self.lock:
+            keys = [key for key, value in self.items.items() if predicate(key, value)]
+            for key in keys:
+                del self.items[key]
+                self.num_bytes -= self.sizes.pop(key)
+        return len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.sizes.clear()
+            self.num_bytes = 0
+
+    def hit_rate(self):
+        """share of the lookups which were served from the cache (0 if no lookups yet)"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -6,26 +6,157 @@
 
 import snortparser as my_parser
 import server as my_server
+from alertcache import AlertCache
+from datasets import DATASET_RAM_BUDGET, DatasetPool
 import argparse
+import functools
 from pathlib import Path
 from time import process_time
 
-if __name__ == '__main__':
+
+def parse_arguments(args=None):
+    """
+    parse the program arguments
+    :param args: list of arguments (default: command line)
+    :return: namespace of the arguments
+    """
     # parse program arguments
     parser = argparse.ArgumentParser()
     parser.add_argument("--mode", dest='mode', help='one of the allowed modes',
-                        choices=['export-only', 'export-display', 'import-display', 'display-only'], required=True)
+                        choices=['export-only', 'export-display', 'import-display', 'display-only', 'display-window',
+                                 'display-sliding', 'follow', 'display-datasets'],
+                        required=True)
     parser.add_argument("--file_path", dest='file_path', type=Path, help='path to snort log file', required=False)
     parser.add_argument("--time_ranges", dest='time_ranges',
-                        help='needed for mode display-only: number of time ranges (min=2)', type=int,
+                        help='needed for mode display-only: number of time ranges (min=2), '
+                             'display-window: number of marks on the time axis', type=int,
                         required=False)
     parser.add_argument("--nodes_file_path", dest='nodes_file_path',
-                        help='needed for mode import-display: path to csv file of nodes', type=Path,
+                        help='needed for mode import-display: path to csv (or --format) file of nodes', type=Path,
                         required=False)
     parser.add_argument("--edges_file_path", dest='edges_file_path',
-                        help='needed for mode import-display: path to csv file of edges', type=Path,
+                        help='needed for mode import-display: path to csv (or --format) file of edges', type=Path,
+                        required=False)
+    parser.add_argument("--format", dest='format',
+                        help='format of the exported (export-only, export-display) and imported (import-display, '
+                             'display-datasets) nodes and edges files: csv, parquet or feather (lists are kept as '
+                             'list columns, much faster to read) (default: csv)',
+                        choices=my_parser.EXPORT_FORMATS, default='csv', required=False)
+    parser.add_argument("--workers", dest='workers',
+                        help='number of processes to parse the snort log file in parallel (default: 1)', type=int,
+                        default=1, required=False)
+    parser.add_argument("--columnar", dest='columnar', action='store_true',
+                        help='keep the imported alerts in a compact columnar table (less memory)')
+    parser.add_argument("--engine", dest='engine', help='engine to generate the nodes and edges (default: loop)',
+                        choices=['loop', 'vectorized'], default='loop', required=False)
+    parser.add_argument("--window", dest='window',
+                        help='needed for mode display-sliding: length of the sliding window in minutes (default: 15)',
+                        type=float, default=15, required=False)
+    parser.add_argument("--step", dest='step',
+                        help='needed for mode display-sliding: step of the sliding window in minutes (default: 5)',
+                        type=float, default=5, required=False)
+    parser.add_argument("--checkpoint", dest='checkpoint', type=Path,
+                        help='mode follow: checkpoint file to resume from (default: <log file name>.checkpoint)',
                         required=False)
-    p = parser.parse_args()
+    parser.add_argument("--webgl_threshold", dest='webgl_threshold',
+                        help='number of edges above which the graph is drawn with WebGL (default: 1000)', type=int,
+                        default=my_server.WEBGL_EDGE_THRESHOLD, required=False)
+    parser.add_argument("--layout", dest='layout',
+                        help='layout of the graph: shell (around the node to center), incremental (stable positions '
+                             'between time ranges, new nodes are placed next to the existing ones) or force '
+                             '(force-directed, for large graphs) (default: shell)',
+                        choices=list(my_server.LAYOUTS), default=my_server.LAYOUT, required=False)
+    parser.add_argument("--precompute_workers", dest='precompute_workers',
+                        help='number of background processes which precompute the figures of all time ranges '
+                             'of one log file (0: compute on demand only, default: 2)', type=int,
+                        default=my_server.PRECOMPUTE_WORKERS, required=False)
+    parser.add_argument("--datasets", dest='datasets', nargs='+',
+                        help='needed for mode display-datasets: snort log files or csv pairs (nodes.csv,edges.csv), '
+                             'a dataset is loaded when it is selected', required=False)
+    parser.add_argument("--ram_budget", dest='ram_budget', type=float,
+                        help='mode display-datasets: memory for the loaded datasets in MB, the least recently used '
+                             'datasets are evicted and read back from the spill folder (default: 1024)',
+                        default=DATASET_RAM_BUDGET / 1024 / 1024, required=False)
+    parser.add_argument("--spill_dir", dest='spill_dir', type=Path,
+                        help='mode display-datasets: folder for the parsed datasets (default: temporary folder)',
+                        required=False)
+    parser.add_argument("--cache_dir", dest='cache_dir', type=Path,
+                        help='folder to cache the imported alerts and the nodes and edges of the snort log files, '
+                             'an unchanged file is loaded from the cache, of a grown file only the new alerts are '
+                             'parsed (implies --columnar)', required=False)
+    p = parser.parse_args(args)
+    if p.engine == 'vectorized' or p.mode == 'display-window' or p.cache_dir:
+        # the vectorized engine (and the time index) works on the columns of the alerts, the cache saves them
+        p.columnar = True
+    return p
+
+
+def import_log_file(file_path, p):
+    """
+    read and import the alerts of a snort log file (see parse_arguments for the options)
+    :return: list of alerts or AlertTable (columnar)
+    """
+    if p.cache_dir:
+        # parse only what is not cached yet
+        return AlertCache(p.cache_dir).import_alerts(file_path, p.workers)
+    if p.workers > 1:
+        # parse byte ranges of the file in parallel
+        return my_parser.import_alerts_parallel(file_path, p.workers, p.columnar)
+    # alerts are read lazily block by block
+    return my_parser.import_alerts(my_parser.read_log_file(file_path), p.columnar)
+
+
+def generate_nodes_and_edges(imported, file_path, p, time_ranges=None):
+    """
+    generate the nodes and edges with the engine of the options (loaded from the cache if the log file is unchanged)
+    :param imported: imported alerts of the log file
+    :param file_path: path of the snort log file
+    :param time_ranges: time ranges (None: one graph of all alerts)
+    :return: nodes and edges (DataFrames, lists of DataFrames with time ranges)
+    """
+    key = None if time_ranges is None else tuple(time_ranges)
+    if p.cache_dir:
+        graph = AlertCache(p.cache_dir).load_graph(file_path, key)
+        if graph is not None:
+            return graph
+    if p.engine == 'vectorized':
+        graph = my_parser.generate_nodes_and_edges_vectorized(imported, time_ranges)
+    else:
+        graph = my_parser.generate_nodes_and_edges(imported, time_ranges)
+    if p.cache_dir:
+        AlertCache(p.cache_dir).save_graph(file_path, key, graph)
+    return graph
+
+
+def load_dataset(entry, p):
+    """
+    parse a dataset of mode display-datasets (loader of the DatasetPool)
+    :param entry: path of a snort log file or paths of a csv pair (nodes.csv,edges.csv)
+    :return: tuple of the list of nodes, the list of edges (one per time range), the time ranges
+    (empty for csv files) and the positions of the nodes (incremental layout, see server.dataset_positions)
+    """
+    if ',' in entry:
+        nodes_file, edges_file = entry.split(',', 1)
+        nodes, edges = my_parser.import_nodes_and_edges(Path(nodes_file), Path(edges_file), p.format)
+        return [nodes], [edges], [], my_server.dataset_positions([nodes], [edges])
+    imported = import_log_file(Path(entry), p)
+    time_ranges = p.time_ranges
+    if not isinstance(time_ranges, int) or time_ranges <= 1:
+        # use default
+        time_ranges = 5
+    time_ranges = my_parser.calculate_time_ranges(imported, time_ranges)
+    nodes_list, edges_list = generate_nodes_and_edges(imported, Path(entry), p, time_ranges)
+    return nodes_list, edges_list, time_ranges, my_server.dataset_positions(nodes_list, edges_list)
+
+
+def build_server(p):
+    """
+    import the alerts and build the dash server according to the mode (see parse_arguments)
+    :return: True if the server is built and can be started, False if there is nothing to display (export-only)
+    """
+    my_server.WEBGL_EDGE_THRESHOLD = p.webgl_threshold
+    my_server.LAYOUT = p.layout
+    my_server.PRECOMPUTE_WORKERS = p.precompute_workers
 
     print('[*] Starting in mode: ' + p.mode)
 
@@ -33,34 +164,32 @@ if __name__ == '__main__':
     processing_start = process_time()
 
     # read and import log file
-    if p.mode != 'import-display':
-        read = my_parser.read_log_file(p.file_path)
-        imported = my_parser.import_alerts(read)
+    if p.mode == 'export-only' and p.engine == 'loop' and p.workers <= 1 and not p.cache_dir:
+        # stream alerts directly into the aggregation (bounded memory, sorted in chunks and merged)
+        imported = my_parser.stream_alerts(my_parser.read_log_file(p.file_path))
+    elif p.mode not in ('import-display', 'follow', 'display-datasets'):
+        imported = import_log_file(p.file_path, p)
 
-    # export csv and exit
+    # export (csv, parquet or feather) and exit
     if p.mode == 'export-only':
         # generate nodes and edges
-        nodes, edges = my_parser.generate_nodes_and_edges(imported)
-        # export to csv
-        nodes_file, edges_file = my_parser.export_to_csv(nodes, edges)
+        nodes, edges = generate_nodes_and_edges(imported, p.file_path, p)
+        # export to csv (or --format)
+        nodes_file, edges_file = my_parser.export_nodes_and_edges(nodes, edges, p.format)
     # export and visualize
     elif p.mode == 'export-display':
         # generate nodes and edges
-        nodes, edges = my_parser.generate_nodes_and_edges(imported)
-        # export to csv
-        nodes_file, edges_file = my_parser.export_to_csv(nodes, edges)
-        # build network and dash server (use csv files)
-        my_server.build(nodes_file=nodes_file, edges_file=edges_file, alert_file=p.file_path, timer_start=processing_start)
-        # start server
-        print('[*] Starting the server ...')
-        my_server.app.run_server(debug=False)
+        nodes, edges = generate_nodes_and_edges(imported, p.file_path, p)
+        # export to csv (or --format)
+        nodes_file, edges_file = my_parser.export_nodes_and_edges(nodes, edges, p.format)
+        # build network and dash server (use exported files)
+        my_server.build(nodes_file=nodes_file, edges_file=edges_file, alert_file=p.file_path, file_format=p.format,
+                        timer_start=processing_start)
     # import given csv file and display
     elif p.mode == 'import-display':
         # build network and dash server
-        my_server.build(nodes_file=p.nodes_file_path, edges_file=p.edges_file_path, timer_start=processing_start)
-        # start server
-        print('[*] Starting the server ...')
-        my_server.app.run_server(debug=False)
+        my_server.build(nodes_file=p.nodes_file_path, edges_file=p.edges_file_path, file_format=p.format,
+                        timer_start=processing_start)
     # 'display-only' - visualize directly without export
     # enable time range adjustment
     elif p.mode == 'display-only':
@@ -72,14 +201,63 @@ if __name__ == '__main__':
         time_ranges = my_parser.calculate_time_ranges(imported, time_ranges)
         # generate nodes and edges in ranges
         # returns a list of nodes and a list of edges according to the time ranges
-        nodes_list, edges_list = my_parser.generate_nodes_and_edges(imported, time_ranges)
+        nodes_list, edges_list = generate_nodes_and_edges(imported, p.file_path, p, time_ranges)
         # build network and dash server
         my_server.build(nodes=nodes_list, edges=edges_list, time_ranges=time_ranges, alert_file=p.file_path, timer_start=processing_start)
-        # start server
-        print('[*] Starting the server ...')
-        my_server.app.run_server(debug=False)
+    # 'display-window' - visualize any time window (aggregated on demand from the time index of the alerts)
+    elif p.mode == 'display-window':
+        time_ranges = p.time_ranges
+        if not isinstance(time_ranges, int) or time_ranges <= 1:
+            # use default
+            time_ranges = 5
+        # time ranges are only used as marks of the range slider
+        time_ranges = my_parser.calculate_time_ranges(imported, time_ranges)
+        alert_index = my_parser.AlertIndex(imported)
+        # build network and dash server
+        my_server.build(alert_index=alert_index, time_ranges=time_ranges, alert_file=p.file_path,
+                        timer_start=processing_start)
+    # 'display-sliding' - visualize a sliding (non-cumulative) time window, moved step by step
+    elif p.mode == 'display-sliding':
+        if p.window <= 0 or p.step <= 0:
+            print('[*] ERROR: window and step must be positive')
+            exit(-1)
+        # minutes -> microseconds
+        sliding_window = my_parser.SlidingWindowGraph(imported, int(p.window * 60000000))
+        # build network and dash server
+        my_server.build(sliding_window=sliding_window, sliding_step=int(p.step * 60000000), alert_file=p.file_path,
+                        timer_start=processing_start)
+    # 'follow' - follow the growing log file, new alerts are imported and shown automatically
+    elif p.mode == 'follow':
+        checkpoint = p.checkpoint
+        if checkpoint is None:
+            # use default (root folder)
+            checkpoint = Path(p.file_path.name + '.checkpoint')
+        follower = my_parser.LogFollower(p.file_path, str(checkpoint))
+        # import everything appended since the checkpoint
+        follower.poll()
+        # build network and dash server
+        my_server.build(follower=follower, alert_file=p.file_path, timer_start=processing_start)
+    # 'display-datasets' - several log files or csv pairs in one server, a dataset is loaded when it is selected
+    elif p.mode == 'display-datasets':
+        if not p.datasets:
+            print('[*] ERROR: no datasets given (--datasets)')
+            exit(-1)
+        datasets = DatasetPool(int(p.ram_budget * 1024 * 1024), p.spill_dir)
+        for entry in p.datasets:
+            datasets.register(entry, functools.partial(load_dataset, entry, p))
+        # build network and dash server
+        my_server.build(datasets=datasets, timer_start=processing_start)
     else:
         print('[*] ERROR: unknown mode')
         exit(-1)
+    return p.mode != 'export-only'
+
+
+if __name__ == '__main__':
+    p = parse_arguments()
+    if build_server(p):
+        # start server
+        print('[*] Starting the server ...')
+        my_server.app.run_server(debug=False)
 
     exit(0)
@@ -3,13 +3,20 @@
 #    author: David Krüger                            #
 #    https://github.com/david-tub/snort-net-viewer   #
 ######################################################
-import ast
+import hashlib
 import json
+import operator
 import os
 import pathlib
+import pickle
 import re
+import threading
+import uuid
+import concurrent.futures
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from textwrap import dedent as d
-from time import process_time
+from time import process_time, sleep
 
 import dash
 import dash_core_components as dcc
@@ -19,29 +26,68 @@ import networkx as nx
 import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
+import plotly.utils
 from colour import Color
 
+import layouts
+import snortparser as my_parser
+from lrucache import LRUCache
+
 # import the css template, and pass the css template into dash
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets, suppress_callback_exceptions=True)
 app.title = "Snort Net Viewer"
 
-NODE_TO_CENTER = ''
-current_nodes = None
-current_edges = None
+# the callbacks take the selected snapshot and node to center from the browser, the data below is read-only after build
+# (except the caches and the follower, which replaces g_follow_view and g_node_positions after a poll under
+# g_snapshot_lock), so several users and worker processes can be served
 g_nodes_list = []
 g_edges_list = []
 flag_use_file = False  # True -> use of time ranges and slider
+g_alert_index = None  # if existing: time index of the alerts, any window can be selected (display-window)
+RANGE_SLIDER_STEPS = 1000  # resolution of the time window range slider
+g_sliding_window = None  # if existing: sliding window graph, the window is moved step by step (display-sliding)
+g_sliding_step = 0  # step of the sliding window (microseconds)
+SLIDING_PLAY_INTERVAL = 2000  # milliseconds between two steps while playing
+g_follower = None  # if existing: LogFollower, new alerts of the log file are shown automatically (follow)
+g_datasets = None  # if existing: DatasetPool, the dataset is selected in the browser (display-datasets)
+g_snapshot_lock = threading.Lock()  # the follower changes with every poll
+g_follow_view = None  # nodes, edges and key of the snapshot of the follower, published after a poll with new alerts
+g_follow_thread = None  # thread of this process which polls the followed log file (start_following)
+FOLLOW_POLL_INTERVAL = 2000  # milliseconds between two polls of the followed log file (and refreshes of the browser)
+WEBGL_EDGE_THRESHOLD = 1000  # number of edges above which WebGL (go.Scattergl) is used to draw the graph
+EDGE_WIDTH_STEP = 0.5  # edge widths are rounded to multiples of the step, one trace per width (and color)
+ARROW_SIZE = 14  # size of the arrowheads (pixel)
+ARROW_COLOR = '#444'
+FIGURE_CACHE_SIZE = 1024  # number of figures sent to the browsers which are kept to compute the changes (dash.Patch)
+FIGURE_CACHE_BYTES = 4 * 1024 * 1024  # maximal memory of the kept figures (summaries, see figure_summary)
+g_figure_cache = LRUCache(FIGURE_CACHE_SIZE, FIGURE_CACHE_BYTES)  # figure key -> summary of the figure
+EDGE_STORE_CACHE_SIZE = 8  # number of figures whose edges are kept for the clicks
+g_edge_stores = LRUCache(EDGE_STORE_CACHE_SIZE)  # figure key -> snapshot and EdgeStore with its edges (table on click)
+TABLE_PAGE_SIZE = 25  # rows of a page of the attack details table
+LAYOUT_CACHE_SIZE = 128  # maximal number of cached layouts
+LAYOUT_CACHE_BYTES = 256 * 1024 * 1024  # maximal memory of the cached layouts (IPs and positions)
+g_layout_cache = LRUCache(LAYOUT_CACHE_SIZE, LAYOUT_CACHE_BYTES)  # (snapshot, center, layout) -> (IPs, positions)
+LAYOUT = 'shell'  # layout of the graph (name in LAYOUTS)
+STABLE_LAYOUTS = ('incremental',)  # layouts which keep the positions of the nodes between views (changes are sent)
+g_node_positions = {}  # IP -> position of every node, placed at the start (incremental layout, datasets: part of their state)
+PRECOMPUTE_WORKERS = 2  # processes which precompute the figures of all time ranges after build (0 -> on demand only)
+g_precomputed = {}  # snapshot -> future of a figure which is still precomputed (precompute_figure)
+PRECOMPUTED_CACHE_SIZE = 1024  # maximal number of kept precomputed figures
+PRECOMPUTED_CACHE_BYTES = 512 * 1024 * 1024  # maximal memory of the kept precomputed figures (pickled)
+g_precomputed_figures = LRUCache(PRECOMPUTED_CACHE_SIZE, PRECOMPUTED_CACHE_BYTES)  # snapshot -> pickled figure and layout
 
 
 ##############################################################################################################################################################
-def network_graph(NODE_TO_CENTER):
-    nodes = current_nodes
-    edges = current_edges
-
-    nodeSet = set()  # contains all IPs
-    for index in range(0, len(nodes)):
-        nodeSet.add(nodes['IP'][index])
+def network_graph(nodes, edges, NODE_TO_CENTER, snapshot=None):
+    """
+    figure of the graph
+    :param nodes: DataFrame of the nodes
+    :param edges: DataFrame of the edges
+    :param NODE_TO_CENTER: IP of the node in the middle ('' or None -> no node to center)
+    :param snapshot: key of the nodes and edges (e.g. time range index), None -> layout not cached
+    """
+    nodeSet = dict.fromkeys(nodes['IP'])  # contains all IPs (dict as ordered set)
 
     # to define the centric point of the networkx layout
     shells = []
@@ -54,21 +100,12 @@ def network_graph(NODE_TO_CENTER):
             shell2.append(ele)
     shells.append(shell2)
 
-    G = nx.from_pandas_edgelist(edges, 'From IP', 'To IP', True,
-                                create_using=nx.MultiDiGraph())
-
-    nx.set_node_attributes(G, nodes.set_index('IP')['Type'].to_dict(), 'Type')
-    nx.set_node_attributes(G, nodes.set_index('IP')['Ports in'].to_dict(), 'Ports in')
-    nx.set_node_attributes(G, nodes.set_index('IP')['Ports out'].to_dict(), 'Ports out')
-    # pos = nx.layout.spring_layout(G)
-    # pos = nx.layout.circular_layout(G)
-    # pos = nx.layout.spiral_layout(G)
-    if len(shell2) > 1:
-        pos = nx.drawing.layout.shell_layout(G, shells)
-    else:
-        pos = nx.drawing.layout.spring_layout(G)
-    for node in G.nodes:
-        G.nodes[node]['pos'] = list(pos[node])
+    # positions of the nodes (repeated views from the layout cache) and of the edge ends (in order of the edges DataFrame)
+    node_ips, node_pos = cached_layout(nodeSet, edges, shells, NODE_TO_CENTER, snapshot)
+    from_index = node_ips.get_indexer(edges['From IP'])
+    to_index = node_ips.get_indexer(edges['To IP'])
+    from_pos = node_pos[from_index]
+    to_pos = node_pos[to_index]
 
     if len(shell2) == 0:
         traceRecode = []  # contains edge_trace, node_trace, middle_node_trace
@@ -76,13 +113,15 @@ def network_graph(NODE_TO_CENTER):
         node_trace = go.Scatter(x=tuple([1]), y=tuple([1]), text=tuple([str(NODE_TO_CENTER)]),
                                 textposition="bottom center",
                                 mode='markers+text',
-                                marker={'size': 50, 'color': 'LightSkyBlue'})
+                                marker={'size': 50, 'color': 'LightSkyBlue'},
+                                uid='center-' + values_digest(NODE_TO_CENTER))
         traceRecode.append(node_trace)
 
         node_trace1 = go.Scatter(x=tuple([1]), y=tuple([1]),
                                  mode='markers',
                                  marker={'size': 50, 'color': 'LightSkyBlue'},
-                                 opacity=0)
+                                 opacity=0,
+                                 uid='center-hover')
         traceRecode.append(node_trace1)
 
         figure = {
@@ -96,101 +135,96 @@ def network_graph(NODE_TO_CENTER):
         return figure
 
     traceRecode = []  # contains edge_trace, node_trace, middle_node_trace
+    # WebGL for large graphs (SVG slows down with many points)
+    scatter = go.Scattergl if len(edges) > WEBGL_EDGE_THRESHOLD else go.Scatter
     ############################################################################################################################################################
     # TODO - color range according to the attack priorities??
-    colors = list(Color('black').range_to(Color('black'), len(G.edges())))
-    colors = ['rgb' + str(x.rgb) for x in colors]
-    index = 0
-    for edge in G.edges:
-        x0, y0 = G.nodes[edge[0]]['pos']
-        x1, y1 = G.nodes[edge[1]]['pos']
-
-        weight = float(G.edges[edge]['Weight']) / max(edges['Weight']) * 8
-        # ensure minimal weight
-        if weight < 1:
-            weight = 2
-
-        trace = go.Scatter(x=tuple([x0, x1, None]), y=tuple([y0, y1, None]),
-                           mode='lines',
-                           line={'width': weight},
-                           marker=dict(color=colors[index]),
-                           line_shape='spline',
-                           opacity=1)
+    colors = ['rgb' + str(Color('black').rgb)] * len(edges)
+
+    # one trace per (width, color): the edges are None separated line segments
+    # every trace has a uid of its name and the digest of its values: traces with the same uid are equal (update_figure)
+    weights = edges['Weight'].to_numpy(dtype=float) / max(edges['Weight']) * 8
+    # ensure minimal weight
+    weights[weights < 1] = 2
+    weights = np.round(weights / EDGE_WIDTH_STEP) * EDGE_WIDTH_STEP
+
+    buckets = {}  # (width, color) -> indexes of the edges
+    for index, bucket in enumerate(zip(weights.tolist(), colors)):
+        buckets.setdefault(bucket, []).append(index)
+    for (weight, color), indexes in sorted(buckets.items()):
+        segments_x = np.full(3 * len(indexes), None, dtype=object)
+        segments_y = np.full(3 * len(indexes), None, dtype=object)
+        segments_x[0::3] = from_pos[indexes, 0]
+        segments_x[1::3] = to_pos[indexes, 0]
+        segments_y[0::3] = from_pos[indexes, 1]
+        segments_y[1::3] = to_pos[indexes, 1]
+        trace = scatter(x=segments_x, y=segments_y,
+                        mode='lines',
+                        line={'width': weight, 'color': color},
+                        hoverinfo='skip',
+                        opacity=1,
+                        uid='edges-' + str(weight) + '-' + color + '-' +
+                            values_digest(from_pos[indexes], to_pos[indexes]))
         traceRecode.append(trace)
-        index = index + 1
     ###############################################################################################################################################################
-    node_trace = go.Scatter(x=[], y=[], hovertext=[], text=[], mode='markers+text', textposition="bottom center",
-                            hoverlabel_align='left',
-                            hoverinfo="text", marker={'size': 50, 'color': []})
-
-    index = 0
-    for node in G.nodes():
-        x, y = G.nodes[node]['pos']
-        hovertext = "<b>IP Address:</b> " + str(nodes['IP'][index]) + "<br>" + "<b>Type:</b> " + \
-                    str(G.nodes[node]['Type']) + "<br>" + '<b>Ports out:</b> ' + values_as_string(
-            G.nodes[node]['Ports out'], 5) \
-                    + "<br>" + '<b>Ports in:</b> ' + values_as_string(G.nodes[node]['Ports in'], 5)
-        text = nodes['IP'][index]
-        node_trace['x'] += tuple([x])
-        node_trace['y'] += tuple([y])
-        node_trace['hovertext'] += tuple([hovertext])
-        node_trace['text'] += tuple([text])
-        if str(G.nodes[node]['Type']) == 'Attacker':
-            node_trace['marker']['color'] += tuple(['red'])
-        elif str(G.nodes[node]['Type']) == 'Victim':
-            node_trace['marker']['color'] += tuple(['green'])
-        else:
-            node_trace['marker']['color'] += tuple(['yellow'])
-        index = index + 1
+    # node attributes in order of G.nodes
+    node_info = nodes.drop_duplicates('IP').set_index('IP').reindex(node_ips)
+    node_types = node_info['Type'].astype(str)
+    node_hovertext = "<b>IP Address:</b> " + node_ips.astype(str) + "<br>" + "<b>Type:</b> " + node_types + "<br>" + \
+                     '<b>Ports out:</b> ' + values_as_strings(node_info['Ports out'], 5) + "<br>" + \
+                     '<b>Ports in:</b> ' + values_as_strings(node_info['Ports in'], 5)
+    # colors as numbers of a discrete color scale (arrays of color names are validated one by one)
+    node_colors = np.select([node_types == 'Attacker', node_types == 'Victim'], [0, 1], 2)
+    node_trace = scatter(x=node_pos[:, 0], y=node_pos[:, 1], hovertext=node_hovertext.to_numpy(),
+                         text=node_ips.to_numpy(), mode='markers+text', textposition="bottom center",
+                         hoverlabel_align='left',
+                         hoverinfo="text", marker={'size': 50, 'color': node_colors, 'cmin': 0, 'cmax': 2,
+                                                   'colorscale': discrete_colorscale(['red', 'green', 'yellow'])},
+                         uid='nodes-' + values_digest(node_pos, node_hovertext.to_numpy(), node_colors))
 
     traceRecode.append(node_trace)
     ################################################################################################################################################################
-    middle_hover_trace = go.Scatter(x=[], y=[], hovertext=[], mode='markers', hoverinfo="text",
-                                    marker={'size': 32, 'color': []},
-                                    opacity=0, hoverlabel_align='left')
-
-    index = 0
-    for edge in G.edges:
-        x0, y0 = G.nodes[edge[0]]['pos']
-        x1, y1 = G.nodes[edge[1]]['pos']
-
-        # generate good looking hover text
-        attack_string = values_as_string(G.edges[edge]['Attack Name'], 2)
-        class_string = values_as_string(G.edges[edge]['Classification'], 2)
-        prio_string = values_as_string(G.edges[edge]['Priority'], 2)
-        from_ip_string = str(G.edges[edge]['From IP'])
-        from_ports_string = str(G.edges[edge]['From Ports'])
-        to_ip_string = str(G.edges[edge]['To IP'])
-        to_ports_string = str(G.edges[edge]['To Ports'])
-        count_string = values_as_string(G.edges[edge]['Count'], 2)
-        timestamps_string = values_as_string(G.edges[edge]['Timestamps'], 2)
-
-        # hovertext = "<b>Attacks:</b> " + attack_string + "<br>" + "<b>Classifications:</b> " + class_string + "<br>" + \
-        #             "<b>Priorities:</b> " + prio_string + "<br>" + "<b>From IP:</b> " + from_ip_string + "<br>" + \
-        #             "<b>To IP:</b> " + to_ip_string + "<br>" + "<b>Number of Alerts:</b> " + count_string + \
-        #             "<br>" + "<br>" + "<i>click to see more information in the table</i>"
-
-        hovertext = "<b>Number of Attacks:</b> " + str(len(G.edges[edge]['Attack Name'])) + "<br>" + \
-                    "<b>Number of Alerts:</b> " + str(G.edges[edge]['Weight']) + "<br>" + \
-                    "<b>Highest Priority:</b> " + str(max(G.edges[edge]['Priority'])) + "<br>" +\
-                    "<br>" + "<i>click to see more information in the table below</i>"
-
-        middle_hover_trace['x'] += tuple([(x1*3 + x0) / 4])
-        middle_hover_trace['y'] += tuple([(y1*3 + y0) / 4])
-        middle_hover_trace['hovertext'] += tuple([hovertext])
-
-        if isinstance(middle_hover_trace['customdata'], type(None)):
-            middle_hover_trace['customdata'] = []
-        customdata = np.array(list(G.edges[edge].items()), dtype=object)
-        middle_hover_trace['customdata'] += tuple([customdata])
-
-        if '1' in G.edges[edge]['Priority']:
-            middle_hover_trace['marker']['color'] += tuple(['#ffe6e6'])
-        elif '2' in G.edges[edge]['Priority']:
-            middle_hover_trace['marker']['color'] += tuple(['#fff9e6'])
-        else:
-            middle_hover_trace['marker']['color'] += tuple(['white'])
-        index = index + 1
+    # arrowheads: one trace of triangles at 3/4 of the edges, rotated in the direction of the edges
+    # (marker angle: degrees clockwise from up, the axes have the same scale so the data angle is the screen angle)
+    arrow_pos = (from_pos + to_pos * 3) / 4
+    direction = to_pos - from_pos
+    arrow_angles = np.degrees(np.arctan2(direction[:, 0], direction[:, 1]))
+    arrow_trace = scatter(x=arrow_pos[:, 0], y=arrow_pos[:, 1],
+                          mode='markers',
+                          hoverinfo='skip',
+                          marker={'symbol': 'triangle-up', 'size': ARROW_SIZE, 'angle': arrow_angles,
+                                  'color': ARROW_COLOR},
+                          uid='arrows-' + values_digest(arrow_pos, arrow_angles))
+    traceRecode.append(arrow_trace)
+    ################################################################################################################################################################
+    # number of attacks and priorities of every edge (one row per attack)
+    priorities = edges['Priority'].reset_index(drop=True).explode().astype(str)
+    attack_counts = priorities.groupby(level=0).size()
+    # (string) maximum as the maximum of the sorted category codes
+    priority_codes = pd.Categorical(priorities)
+    highest_priorities = pd.Series(priority_codes.codes, index=priorities.index).groupby(level=0).max()
+    highest_priorities = pd.Series(priority_codes.categories[highest_priorities].astype(str),
+                                   index=highest_priorities.index)
+    # generate good looking hover text
+    edge_hovertext = "<b>Number of Attacks:</b> " + attack_counts.astype(str) + "<br>" + \
+                     "<b>Number of Alerts:</b> " + edges['Weight'].reset_index(drop=True).astype(str) + "<br>" + \
+                     "<b>Highest Priority:</b> " + highest_priorities + "<br>" + \
+                     "<br>" + "<i>click to see more information in the table below</i>"
+    # key of the edge (From IP, To IP), the attributes are looked up in the EdgeStore on click
+    customdata = np.column_stack([edges['From IP'].to_numpy(dtype=object), edges['To IP'].to_numpy(dtype=object)])
+    edge_colors = np.select([(priorities == '1').groupby(level=0).any(), (priorities == '2').groupby(level=0).any()],
+                            [0, 1], 2)
+    middle_hover_trace = scatter(x=arrow_pos[:, 0], y=arrow_pos[:, 1],
+                                 hovertext=edge_hovertext.to_numpy(), customdata=customdata, mode='markers',
+                                 hoverinfo="text",
+                                 marker={'size': 32, 'color': edge_colors, 'cmin': 0, 'cmax': 2,
+                                         'colorscale': discrete_colorscale(['#ffe6e6', '#fff9e6', 'white'])},
+                                 opacity=0, hoverlabel_align='left',
+                                 # digest of the values of the hover texts and keys (the texts are long)
+                                 uid='edge-hover-' + values_digest(arrow_pos, node_ips.to_numpy(), from_index, to_index,
+                                                                   attack_counts.to_numpy(),
+                                                                   edges['Weight'].to_numpy(dtype=float),
+                                                                   highest_priorities.to_numpy(), edge_colors))
 
     traceRecode.append(middle_hover_trace)
     #################################################################################################################################################################
@@ -199,27 +233,446 @@ def network_graph(NODE_TO_CENTER):
         "layout": go.Layout(title='Interactive IDS Alert Visualization', showlegend=False, hovermode='closest',
                             margin={'b': 40, 'l': 40, 'r': 40, 't': 40},
                             xaxis={'showgrid': False, 'zeroline': False, 'showticklabels': False},
-                            yaxis={'showgrid': False, 'zeroline': False, 'showticklabels': False},
+                            yaxis={'showgrid': False, 'zeroline': False, 'showticklabels': False,
+                                   'scaleanchor': 'x'},
                             height=800,
                             clickmode='event',
-                            annotations=[
-                                dict(
-                                    ax=(G.nodes[edge[0]]['pos'][0] + G.nodes[edge[1]]['pos'][0]) / 2,
-                                    ay=(G.nodes[edge[0]]['pos'][1] + G.nodes[edge[1]]['pos'][1]) / 2, axref='x',
-                                    ayref='y',
-                                    x=(G.nodes[edge[1]]['pos'][0] * 3 + G.nodes[edge[0]]['pos'][0]) / 4,
-                                    y=(G.nodes[edge[1]]['pos'][1] * 3 + G.nodes[edge[0]]['pos'][1]) / 4, xref='x',
-                                    yref='y',
-                                    showarrow=True,
-                                    arrowhead=3,
-                                    arrowsize=5,
-                                    arrowwidth=1,
-                                    opacity=1
-                                ) for edge in G.edges]
                             )}
     return figure
 
 
+def cached_layout(nodeSet, edges, shells, NODE_TO_CENTER, snapshot):
+    """
+    layout (LAYOUT) of the snapshot from the layout cache, computed and cached if missing
+    (not cached if the snapshot has no key)
+    :return: tuple of the IPs (pd.Index, in order of the graph) and their positions (numpy array n x 2)
+    """
+    # the positions of most layouts do not depend on the node to center (it is moved to the center afterwards)
+    centered = LAYOUT in CENTERED_LAYOUTS
+    layout_key = (snapshot, NODE_TO_CENTER if centered else '', LAYOUT)
+    layout = None
+    if snapshot is not None:
+        layout = g_layout_cache.get(layout_key)
+    if layout is None:
+        layout = LAYOUTS[LAYOUT](nodeSet, edges, shells, snapshot_dataset(snapshot))
+        if snapshot is not None:
+            g_layout_cache.put(layout_key, layout, layout[0].memory_usage(deep=True) + layout[1].nbytes)
+
+    node_ips, node_pos = layout
+    if not centered and NODE_TO_CENTER in node_ips:
+        node_pos = node_pos - node_pos[node_ips.get_loc(NODE_TO_CENTER)]
+    return node_ips, node_pos
+
+
+def snapshot_dataset(snapshot):
+    """dataset of the snapshot key (None without datasets or key, see view_snapshot)"""
+    if snapshot is not None and len(snapshot) == 3 and snapshot[1] == 'time range':
+        return snapshot[0]
+    return None
+
+
+def shell_positions(nodeSet, edges, shells, dataset=None):
+    """
+    shell layout: the node to center (shells[0]) in the middle, all other nodes on a circle around it
+    (spring layout if there is at most one other node)
+    :return: tuple of the IPs (pd.Index, in order of the graph) and their positions (numpy array n x 2)
+    """
+    # graph only for the layout, the attributes of nodes and edges are taken from the DataFrames
+    # pos = nx.layout.spring_layout(G)
+    # pos = nx.layout.circular_layout(G)
+    # pos = nx.layout.spiral_layout(G)
+    if len(shells[1]) > 1:
+        # the shell layout needs the nodes only
+        G = nx.Graph()
+        G.add_nodes_from(nodeSet)
+        pos = nx.drawing.layout.shell_layout(G, shells)
+    else:
+        G = nx.from_pandas_edgelist(edges, 'From IP', 'To IP', create_using=nx.MultiDiGraph())
+        pos = nx.drawing.layout.spring_layout(G)
+    node_ips = pd.Index(list(G.nodes))
+    return node_ips, np.array([pos[node] for node in node_ips], dtype=float).reshape(-1, 2)
+
+
+def incremental_positions(nodeSet, edges, shells, dataset=None):
+    """
+    incremental layout: the nodes keep their positions (node_positions of the dataset, placed at the start), so the
+    layout of a snapshot does not depend on the snapshots shown before
+    nodes without a position are placed next to the others for this snapshot only (the positions are not changed)
+    :return: tuple of the IPs (pd.Index, in order of the graph) and their positions (numpy array n x 2)
+    """
+    positions = node_positions(dataset)
+    if not all(ip in positions for ip in nodeSet):
+        positions = place_nodes(nodeSet, edges, positions)
+    node_ips = pd.Index(list(nodeSet))
+    return node_ips, np.array([positions[ip] for ip in node_ips], dtype=float).reshape(-1, 2)
+
+
+def force_positions(nodeSet, edges, shells, dataset=None):
+    """
+    force-directed layout for large graphs (layouts.force_layout on the edge list of the DataFrame)
+    :return: tuple of the IPs (pd.Index, in order of the graph) and their positions (numpy array n x 2)
+    """
+    node_ips = pd.Index(list(nodeSet))
+    sources = node_ips.get_indexer(edges['From IP'])
+    targets = node_ips.get_indexer(edges['To IP'])
+    known = (sources >= 0) & (targets >= 0)
+    return node_ips, layouts.force_layout(sources[known], targets[known], len(node_ips), seed=0)
+
+
+def place_nodes(nodeSet, edges, positions):
+    """
+    incremental layout: places the nodes without a position next to the nodes placed before
+    :param positions: dict IP -> position of the placed nodes (not modified)
+    :return: dict IP -> position of the placed nodes and the nodes of the snapshot
+    """
+    # neighbors only (undirected, no multiple edges)
+    G = nx.from_pandas_edgelist(edges, 'From IP', 'To IP')
+    G.add_nodes_from(nodeSet)
+    placed = dict(positions)
+    placed.update(layouts.incremental_layout(G, positions, seed=0))
+    return placed
+
+
+def node_positions(dataset=None):
+    """
+    incremental layout: positions of the nodes placed at the start, of the dataset (part of its state, see
+    dataset_positions) or g_node_positions without datasets
+    :return: dict IP -> position
+    """
+    if dataset is not None and g_datasets is not None:
+        return g_datasets.get(dataset)[3] or {}
+    return g_node_positions
+
+
+def sweep_layouts(nodes_list, edges_list):
+    """
+    incremental layout: places the nodes of all time ranges in one sweep, every time range only adds its new nodes
+    to the positions of the time ranges before
+    :return: dict IP -> position of all nodes
+    """
+    print('[*] Start computing the layouts of ' + str(len(nodes_list)) + ' time ranges')
+    start = process_time()
+    positions = {}
+    for nodes, edges in zip(nodes_list, edges_list):
+        nodeSet = dict.fromkeys(nodes['IP'])
+        if not all(ip in positions for ip in nodeSet):
+            positions = place_nodes(nodeSet, edges, positions)
+    print('[*] Computing the layouts successful (' + str(len(positions)) + ' nodes, ' +
+          str(round(process_time() - start, 3)) + ' s)')
+    return positions
+
+
+def dataset_positions(nodes_list, edges_list):
+    """
+    positions of the nodes of a dataset, computed when it is loaded (part of its state, see main.load_dataset)
+    :return: dict IP -> position (sweep_layouts) for the incremental layout, otherwise None
+    """
+    if LAYOUT != 'incremental':
+        return None
+    return sweep_layouts(nodes_list, edges_list)
+
+
+def start_precomputing(nodes_list, edges_list, shown_snapshot):
+    """
+    precomputes the figures (without node to center) of all time ranges but the shown one in background processes,
+    most recent first, update_graph uses them as soon as they are ready
+    the nodes and edges of the time ranges are built in the workers (nodes_list and edges_list may be SnapshotLists)
+    :param shown_snapshot: key of the snapshot of the initial figure (not precomputed)
+    """
+    snapshots = [('time range', index) for index in reversed(range(len(nodes_list)))
+                 if ('time range', index) != shown_snapshot]
+    if PRECOMPUTE_WORKERS <= 0 or len(snapshots) == 0:
+        return
+    print('[*] Start precomputing the figures of ' + str(len(snapshots)) + ' time ranges with ' +
+          str(PRECOMPUTE_WORKERS) + ' workers')
+    executor = ProcessPoolExecutor(max_workers=PRECOMPUTE_WORKERS, initializer=init_precompute_worker,
+                                   initargs=(nodes_list, edges_list, g_node_positions, LAYOUT, WEBGL_EDGE_THRESHOLD))
+    for snapshot in snapshots:
+        future = executor.submit(precompute_figure, snapshot)
+        g_precomputed[snapshot] = future
+        future.add_done_callback(functools.partial(store_precomputed, snapshot))
+    # the workers exit when all figures are computed
+    executor.shutdown(wait=False)
+
+
+def init_precompute_worker(nodes_list, edges_list, node_positions, layout, webgl_edge_threshold):
+    """data and settings of the worker processes (start_precomputing)"""
+    global g_nodes_list
+    global g_edges_list
+    global g_node_positions
+    global LAYOUT
+    global WEBGL_EDGE_THRESHOLD
+    g_nodes_list, g_edges_list = nodes_list, edges_list
+    g_node_positions = node_positions
+    LAYOUT = layout
+    WEBGL_EDGE_THRESHOLD = webgl_edge_threshold
+    if hasattr(os, 'nice'):
+        # the callbacks of the server come first
+        os.nice(10)
+
+
+def precompute_figure(snapshot):
+    """
+    computes the figure without node to center of a time range (worker process, see start_precomputing)
+    :param snapshot: ('time range', index)
+    :return: tuple of the figure (network_graph) and the layout (IPs, positions), pickled
+    """
+    figure = network_graph(g_nodes_list[snapshot[-1]], g_edges_list[snapshot[-1]], '', snapshot)
+    layout = g_layout_cache.get((snapshot, '', LAYOUT))
+    g_layout_cache.clear()
+    return pickle.dumps((figure, layout), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def store_precomputed(snapshot, future):
+    """
+    moves a precomputed figure from its future to g_precomputed_figures (once, called when the future is done)
+    """
+    if g_precomputed.pop(snapshot, None) is None:
+        return
+    if future.cancelled():
+        return
+    if future.exception() is not None:
+        print('[*]ERROR: Precomputing a figure failed: ' + repr(future.exception()))
+        return
+    data = future.result()
+    g_precomputed_figures.put(snapshot, data, len(data))
+
+
+def wait_for_precomputing():
+    """wait until all figures are precomputed (start_precomputing)"""
+    futures = dict(g_precomputed)
+    if futures:
+        print('[*] Waiting for the precomputed figures')
+        concurrent.futures.wait(list(futures.values()))
+        for snapshot, future in futures.items():
+            store_precomputed(snapshot, future)
+
+
+def precomputed_figure(snapshot, node_to_center):
+    """
+    precomputed figure of the snapshot (start_precomputing), its layout is added to the layout cache
+    :return: figure (network_graph) or None if there is a node to center or the figure is not ready (yet)
+    """
+    if node_to_center:
+        return None
+    data = g_precomputed_figures.get(snapshot)
+    if data is None:
+        return None
+    figure, layout = pickle.loads(data)
+    layout_key = (snapshot, '', LAYOUT)
+    if layout is not None and layout_key not in g_layout_cache:
+        g_layout_cache.put(layout_key, layout, layout[0].memory_usage(deep=True) + layout[1].nbytes)
+    return figure
+
+
+# layouts of the graph: name -> function(nodeSet, edges, shells, dataset) returning the IPs and their positions
+LAYOUTS = {
+    'shell': shell_positions,  # around the node to center
+    'incremental': incremental_positions,  # stable positions between time ranges and windows
+    'force': force_positions,  # force-directed, for large graphs
+}
+CENTERED_LAYOUTS = ('shell',)  # layouts which place the node to center, the others are moved to put it in the middle
+
+
+def layout_cache_stats():
+    """markdown text with the statistics of the layout cache (stats panel)"""
+    lookups = g_layout_cache.hits + g_layout_cache.misses
+    return d(f"""
+    Layout cache hits: &nbsp; &nbsp; &nbsp;*{str(round(g_layout_cache.hit_rate() * 100, 1))} % of {str(lookups)}*  
+    Cached layouts: &nbsp; &nbsp; &nbsp; &nbsp; &nbsp;*{str(len(g_layout_cache))} ({str(round(g_layout_cache.num_bytes / 1e6, 1))} MB)*  
+    """) + precompute_stats()
+
+
+def precompute_stats():
+    """markdown text with the number of precomputed figures (stats panel), empty if nothing is precomputed"""
+    if len(g_precomputed) == 0 and len(g_precomputed_figures) == 0:
+        return ''
+    return d(f"""
+    Precomputed figures: &nbsp;*{str(len(g_precomputed_figures))} ({str(round(g_precomputed_figures.num_bytes / 1e6, 1))} MB), {str(len(g_precomputed))} pending*  
+    """)
+
+
+def filter_rows(rows, filter_query):
+    """
+    rows of the attack details table which match the filter of the table (e.g. "{Priority} = 1 && {To IP} contains 10.")
+    numbers are compared as numbers, other values as strings, unknown expressions are ignored
+    :param rows: rows of the attack details table (DataFrame, EdgeStore.attack_rows)
+    :param filter_query: filter query of the dash DataTable
+    :return: matching rows
+    """
+    for expression in (filter_query or '').split(' && '):
+        match = FILTER_EXPRESSION.match(expression)
+        if match is None or match['column'] not in rows.columns:
+            continue
+        relation = match['operator']
+        case = True
+        if relation[:1] in ('i', 's') and relation[1:] in FILTER_OPERATORS:
+            # case insensitive (i) or sensitive (s)
+            case = relation[0] == 's'
+            relation = relation[1:]
+        relation = FILTER_OPERATORS.get(relation)
+        value = match['value']
+        if relation is None:
+            continue
+        if value[:1] in ('"', "'", '`') and value[-1:] == value[:1] and len(value) > 1:
+            value = value[1:-1]
+        else:
+            try:
+                number = float(value)
+            except ValueError:
+                number = None
+            if number is not None and relation in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+                # compare as numbers
+                numbers = numeric_column(rows, match['column'])
+                rows = rows[FILTER_COMPARISONS[relation](numbers, number).to_numpy()]
+                continue
+        strings = rows[match['column']].astype(str)
+        if not case:
+            strings, value = strings.str.lower(), value.lower()
+        if relation == 'contains':
+            mask = strings.str.contains(value, regex=False)
+        elif relation == 'datestartswith':
+            mask = strings.str.startswith(value)
+        else:
+            mask = FILTER_COMPARISONS[relation](strings, value)
+        rows = rows[mask.to_numpy(dtype=bool)]
+    return rows
+
+
+def sort_rows(rows, sort_by):
+    """
+    rows of the attack details table sorted like the table (columns of numbers as numbers, others as strings)
+    :param rows: rows of the attack details table (DataFrame, EdgeStore.attack_rows)
+    :param sort_by: sort_by of the dash DataTable (list of column_id and direction)
+    :return: sorted rows
+    """
+    sort_by = [sort for sort in sort_by or [] if sort['column_id'] in rows.columns]
+    if len(sort_by) == 0 or len(rows) <= 1:
+        return rows
+    keys = pd.DataFrame(index=rows.index)
+    for index, sort in enumerate(sort_by):
+        numbers = numeric_column(rows, sort['column_id'])
+        keys[index] = numbers if numbers.notna().all() else rows[sort['column_id']].astype(str)
+    order = keys.sort_values(list(keys.columns), ascending=[sort['direction'] == 'asc' for sort in sort_by],
+                             kind='stable').index
+    return rows.loc[order]
+
+
+def numeric_column(rows, column):
+    """numbers of a column of the attack details table (NaN if a value is not a number)"""
+    return pd.to_numeric(rows[column], errors='coerce').astype(float)
+
+
+# filter expressions of the dash DataTable: {column} operator value
+FILTER_EXPRESSION = re.compile(r'^\s*\{(?P<column>[^}]*)\}\s+(?P<operator>\S+)\s*(?P<value>.*?)\s*$')
+FILTER_OPERATORS = {'=': 'eq', 'eq': 'eq', '!=': 'ne', 'ne': 'ne', '<': 'lt', 'lt': 'lt', '<=': 'le', 'le': 'le',
+                    '>': 'gt', 'gt': 'gt', '>=': 'ge', 'ge': 'ge', 'contains': 'contains',
+                    'datestartswith': 'datestartswith'}
+FILTER_COMPARISONS = {'eq': operator.eq, 'ne': operator.ne, 'lt': operator.lt, 'le': operator.le, 'gt': operator.gt,
+                      'ge': operator.ge}
+
+
+def discrete_colorscale(colors):
+    """color scale which maps the numbers 0, 1, ... (cmin=0, cmax=len(colors)-1) to the given colors"""
+    return [[index / (len(colors) - 1), color] for index, color in enumerate(colors)]
+
+
+def values_digest(*values):
+    """
+    short digest of the values of a trace (numpy arrays, strings, numbers), part of the uid of the trace
+    :return: hex string
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for value in values:
+        if isinstance(value, np.ndarray) and value.dtype.kind in 'biuf':
+            digest.update(str(value.dtype).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, np.ndarray):
+            digest.update('\x1f'.join(map(str, value.ravel())).encode())
+        else:
+            digest.update(str(value).encode())
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def figure_summary(figure, view):
+    """
+    what is kept of a figure sent to a browser to compute the changes of the next one (update_figure)
+    :param figure: figure of network_graph
+    :param view: snapshot and node to center of the figure
+    :return: tuple of the view, the layout (JSON text), the uids of the traces and their number of points
+    """
+    layout = json.dumps(figure['layout'], cls=plotly.utils.PlotlyJSONEncoder, sort_keys=True)
+    uids = tuple(trace.uid for trace in figure['data'])
+    points = tuple(0 if trace.x is None else len(trace.x) for trace in figure['data'])
+    return view, layout, uids, points
+
+
+def summary_size(summary):
+    """memory of a figure summary (bytes, estimated)"""
+    view, layout, uids, points = summary
+    return 64 * (len(view) + len(uids)) + len(layout) + sum(len(uid) for uid in uids)
+
+
+def update_figure(figure, old_summary, view):
+    """
+    returns the update of the graph for the browser: only the changed traces (dash.Patch) compared to the figure
+    the browser shows or the full figure if this figure is unknown (e.g. evicted from the cache), the positions
+    of the nodes change with the view (LAYOUT not in STABLE_LAYOUTS) or most of the points changed
+    the traces are compared by their uids (name and digest of the values, see network_graph)
+    :param figure: new figure (network_graph)
+    :param old_summary: summary of the figure in the browser (figure_summary, None if unknown)
+    :param view: snapshot and node to center of the new figure
+    :return: tuple of the full figure, dash.Patch or dash.no_update and the key of the new figure
+    """
+    summary = figure_summary(figure, view)
+    new_key = uuid.uuid4().hex
+    g_figure_cache.put(new_key, summary, summary_size(summary))
+    if old_summary is None or LAYOUT not in STABLE_LAYOUTS or old_summary[1] != summary[1]:
+        return figure, new_key
+    old_uids, uids, points = old_summary[2], summary[2], summary[3]
+    changed = [index for index, uid in enumerate(uids) if index >= len(old_uids) or old_uids[index] != uid]
+    if len(changed) == 0 and len(old_uids) == len(uids):
+        return dash.no_update, new_key
+    if sum(points[index] for index in changed) >= sum(points):
+        return figure, new_key
+    patch = dash.Patch()
+    for index in changed:
+        if index < len(old_uids):
+            patch['data'][index] = figure['data'][index]
+    if len(uids) > len(old_uids):
+        patch['data'].extend(figure['data'][len(old_uids):])
+    for index in range(len(old_uids) - 1, len(uids) - 1, -1):
+        del patch['data'][index]
+    return patch, new_key
+
+
+def update_graph(nodes, edges, snapshot, node_to_center, figure_key):
+    """
+    update_figure of the graph of the nodes and edges, the edges are kept for the clicks on this figure
+    nothing is computed if the browser shows the figure of the snapshot and node to center already
+    :param snapshot: key of the nodes and edges (view_snapshot)
+    :param node_to_center: IP of the node in the middle
+    :param figure_key: key of the figure in the browser
+    :return: tuple of the full figure, dash.Patch or dash.no_update and the key of the new figure
+    """
+    view = (snapshot, node_to_center or '')
+    old_summary = g_figure_cache.get(figure_key)
+    if old_summary is not None and old_summary[0] == view:
+        return dash.no_update, figure_key
+    figure = precomputed_figure(snapshot, node_to_center)
+    if figure is None:
+        figure = network_graph(nodes, edges, node_to_center, snapshot)
+    figure, new_key = update_figure(figure, old_summary, view)
+    g_edge_stores.put(new_key, (snapshot, my_parser.EdgeStore(edges)))
+    return figure, new_key
+
+
+def values_as_strings(values, num):
+    """values_as_string for every list of a Series"""
+    return pd.Series([values_as_string(listo, num) for listo in values], index=values.index, dtype=object)
+
+
 def values_as_string(listo, num):
     my_string = ""
     for index, value in enumerate(listo):
@@ -254,26 +707,180 @@ def pretty_time_delta(my_timedelta):
 
 
 
-def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=None, time_ranges=None, timer_start=process_time()):
+def slider_to_time(position):
+    """converts a position of the time window range slider to a timestamp (microseconds since EPOCH)"""
+    first = g_alert_index.first_time()
+    return first + (g_alert_index.last_time() - first) * position // RANGE_SLIDER_STEPS
+
+
+def time_to_slider(time):
+    """converts a datetime to the nearest position of the time window range slider"""
+    first = g_alert_index.first_time()
+    duration = max(g_alert_index.last_time() - first, 1)
+    return round((my_parser.datetime_to_timestamp(time) - first) * RANGE_SLIDER_STEPS / duration)
+
+
+def sliding_window_bounds():
+    """first and last end of the sliding window (microseconds since EPOCH)"""
+    last = g_sliding_window.last_time()
+    return min(g_sliding_window.first_time() + g_sliding_window.window, last), last
+
+
+def sliding_window_controls(position):
+    """components to move the sliding window step by step or play it (also used as invisible dummies)"""
+    return [
+        html.Button('<<', id='sliding-step-back', n_clicks=0),
+        html.Button('Play', id='sliding-play', n_clicks=0),
+        html.Button('>>', id='sliding-step-forward', n_clicks=0),
+        html.Br(),
+        html.Div(id='sliding-window-label'),
+        dcc.Interval(id='sliding-interval', interval=SLIDING_PLAY_INTERVAL, disabled=True),
+        dcc.Store(id='sliding-position', data=position),
+    ]
+
+
+def forget_dataset(dataset):
+    """
+    drops the data kept for a dataset evicted from the DatasetPool: figures, edges of the tables and layouts
+    (computed again when the dataset is shown again, the node positions are part of its state)
+    """
+    g_figure_cache.remove_where(lambda key, summary: snapshot_dataset(summary[0][0]) == dataset)
+    g_edge_stores.remove_where(lambda key, value: snapshot_dataset(value[0]) == dataset)
+    g_layout_cache.remove_where(lambda key, layout: snapshot_dataset(key[0]) == dataset)
+
+
+def view_snapshot(value, window, position, dataset):
+    """
+    nodes and edges selected in the browser (time range slider, time window, position of the sliding window or
+    dataset and time range slider)
+    :return: tuple of the nodes and edges DataFrames and the key of the snapshot
+    """
+    if g_datasets is not None:
+        # the dataset is loaded if necessary, the slider may still be at a time range of the dataset before
+        nodes_list, edges_list, time_ranges, positions = g_datasets.get(dataset)
+        value = min(value, len(nodes_list) - 1)
+        return nodes_list[value], edges_list[value], (dataset, 'time range', value)
+    elif g_follower is not None:
+        # published after the last poll with new alerts (publish_follow_view)
+        return g_follow_view
+    elif g_sliding_window is not None:
+        # the window ending at the position (the sliding window graph itself is not moved)
+        nodes, edges = g_sliding_window.get(position)
+        return nodes, edges, ('sliding',) + g_sliding_window.find(position)
+    elif g_alert_index is not None:
+        # aggregate the alerts of the selected time window
+        start, end = slider_to_time(window[0]), slider_to_time(window[1])
+        nodes, edges = g_alert_index.get(start, end)
+        return nodes, edges, ('window',) + g_alert_index.find(start, end)
+    return g_nodes_list[value], g_edges_list[value], ('time range', value)
+
+
+def time_range_marks(time_ranges, num_ranges):
+    """marks of the time range slider (dataset without time ranges: one mark)"""
+    if len(time_ranges) == 0:
+        return {index: {'label': 'all'} for index in range(num_ranges)}
+    return {index: {'label': time.strftime("%Y/%m/%d-%H:%M:%S")} for index, time in enumerate(time_ranges)}
+
+
+def dataset_stats():
+    """markdown text with the statistics of the dataset pool (stats panel), empty without datasets"""
+    if g_datasets is None:
+        return ''
+    return d(f"""
+    Loaded datasets: &nbsp; &nbsp; &nbsp; &nbsp;*{str(len(g_datasets.pool))} of {str(len(g_datasets))} ({str(round(g_datasets.pool.num_bytes / 1e6, 1))} MB)*  
+    Datasets parsed / spilled / read back: &nbsp;*{str(g_datasets.num_loads)} / {str(g_datasets.num_spills)} / {str(g_datasets.num_spill_loads)}*  
+    """)
+
+
+def follower_snapshot_key():
+    """key of the current snapshot of the follower (changes with every read alert and with a new log file)"""
+    return 'follow', g_follower.inode, g_follower.offset, g_follower.num_alerts
+
+
+def publish_follow_view():
+    """
+    builds the snapshot of the followed alerts and (incremental layout) places its new nodes, then publishes both
+    for the callbacks, which only read g_follow_view and g_node_positions (called after a poll with new alerts)
+    """
+    global g_follow_view
+    global g_node_positions
+    nodes, edges = g_follower.snapshot()
+    if LAYOUT == 'incremental':
+        # the followed alerts only grow, new nodes keep their positions in the next snapshots
+        nodeSet = dict.fromkeys(nodes['IP'])
+        if not all(ip in g_node_positions for ip in nodeSet):
+            # replaced before the view, so the new view finds the positions of its nodes
+            g_node_positions = place_nodes(nodeSet, edges, g_node_positions)
+    g_follow_view = nodes, edges, follower_snapshot_key()
+
+
+def start_following():
+    """
+    starts the thread which polls the followed log file, once per process with its first request (a worker process
+    forked after build has no threads of the build process)
+    """
+    global g_follow_thread
+    with g_snapshot_lock:
+        if g_follower is None or (g_follow_thread is not None and g_follow_thread.is_alive()):
+            return
+        g_follow_thread = threading.Thread(target=follow_log, name='follow', daemon=True)
+        g_follow_thread.start()
+
+
+def follow_log():
+    """
+    polls the followed log file every FOLLOW_POLL_INTERVAL milliseconds and publishes the snapshot if there are
+    new alerts (thread of start_following), the callbacks only read the published snapshot
+    """
+    while True:
+        sleep(FOLLOW_POLL_INTERVAL / 1000)
+        try:
+            with g_snapshot_lock:
+                if g_follower.poll():
+                    publish_follow_view()
+        except Exception as error:
+            print('[*]ERROR: Following the log file failed: ' + repr(error))
+
+
+def follow_components(disabled=False):
+    """components to poll the followed log file (also used as invisible dummies)"""
+    return [
+        html.Div(id='follow-status'),
+        dcc.Interval(id='follow-interval', interval=FOLLOW_POLL_INTERVAL, disabled=disabled),
+    ]
+
+
+def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=None, time_ranges=None, alert_index=None,
+          sliding_window=None, sliding_step=None, follower=None, datasets=None, file_format='csv',
+          timer_start=process_time()):
     """
     builds the server (html, callbacks etc.)
     :param nodes: if existing: list of dicts of nodes (display-only)
-    :param nodes_file: if existing: nodes csv file to read and display (export-display, import-display)
+    :param nodes_file: if existing: nodes file (csv, parquet or feather) to read and display (export-display, import-display)
     :param edges: if existing: list of dicts of edges (display-only)
-    :param edges_file: if existing: edges csv file to read and display (export-display, import-display)
+    :param edges_file: if existing: edges file (csv, parquet or feather) to read and display (export-display, import-display)
     :param alert_file: if existing: csv file which needs to be loaded (display-only)
     :param time_ranges: if existing: list of time ranges/steps for filter component
+    :param alert_index: if existing: time index of the alerts, any time window can be selected (display-window)
+    :param sliding_window: if existing: SlidingWindowGraph, the window is moved step by step (display-sliding)
+    :param sliding_step: step of the sliding window (microseconds)
+    :param follower: if existing: LogFollower, the graph grows with the followed log file (follow)
+    :param datasets: if existing: DatasetPool, one of the datasets is selected and loaded on demand (display-datasets)
+    :param file_format: format of nodes_file and edges_file (csv, parquet or feather)
     """
     print('[*] Start building the server')
     # for debug purpose: increase display range of dicts
     pd.set_option("display.max_rows", None, "display.max_columns", None)
 
-    global NODE_TO_CENTER
     global flag_use_file
-    global current_nodes
-    global current_edges
     global g_nodes_list
     global g_edges_list
+    global g_alert_index
+    global g_sliding_window
+    global g_sliding_step
+    global g_follower
+    global g_datasets
+    global g_node_positions
 
     alert_file_name = '-'
     nodes_file_name = '-'
@@ -286,31 +893,74 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
     if isinstance(edges_file, pathlib.Path):
         edges_file_name = os.path.basename(edges_file)
 
-    if not isinstance(nodes_file, type(None)) and not isinstance(edges_file, type(None)):
+    if datasets is not None:
+        if len(datasets) == 0:
+            print('[*]ERROR: No datasets')
+            exit(-1)
+        # datasets are loaded when they are selected, start with the last time range of the first one
+        g_datasets = datasets
+        g_datasets.on_evict = forget_dataset
+        dataset = datasets.names()[0]
+        nodes_list, edges_list, time_ranges, positions = datasets.get(dataset)
+        current_nodes, current_edges = nodes_list[-1], edges_list[-1]
+        current_snapshot = (dataset, 'time range', len(nodes_list) - 1)
+
+        print('[**] Number of Nodes: ' + str(len(current_nodes)))
+        print('[**] Number of Edges: ' + str(len(current_edges)))
+        # a dataset of csv files has no time ranges
+        flag_use_file = len(time_ranges) == 0
+    elif follower is not None:
+        # nodes and edges of all alerts imported so far, updated with every poll
+        g_follower = follower
+        publish_follow_view()
+        current_nodes, current_edges, current_snapshot = g_follow_view
+        # the log file is polled in a thread of the serving process
+        app.server.before_request(start_following)
+
+        print('[**] Number of Nodes: ' + str(len(current_nodes)))
+        print('[**] Number of Edges: ' + str(len(current_edges)))
+        # no time ranges
+        flag_use_file = True
+    elif not isinstance(nodes_file, type(None)) and not isinstance(edges_file, type(None)):
         # load data from files
-        nodes = pd.read_csv(nodes_file)
-        edges = pd.read_csv(edges_file)
-
-        # convert string values to real lists
-        nodes['Ports in'] = nodes['Ports in'].apply(lambda x: ast.literal_eval(x))
-        nodes['Ports out'] = nodes['Ports out'].apply(lambda x: ast.literal_eval(x))
-
-        edges['Attack Name'] = edges['Attack Name'].apply(lambda x: ast.literal_eval(x))
-        edges['Classification'] = edges['Classification'].apply(lambda x: ast.literal_eval(x))
-        edges['Priority'] = edges['Priority'].apply(lambda x: ast.literal_eval(x))
-        edges['From Ports'] = edges['From Ports'].apply(lambda x: ast.literal_eval(x))
-        edges['To Ports'] = edges['To Ports'].apply(lambda x: ast.literal_eval(x))
-        edges['Timestamps'] = edges['Timestamps'].apply(lambda x: ast.literal_eval(x))
-        edges['Count'] = edges['Count'].apply(lambda x: ast.literal_eval(x))
-        edges['Additional'] = edges['Additional'].apply(lambda x: ast.literal_eval(x))
+        nodes, edges = my_parser.import_nodes_and_edges(nodes_file, edges_file, file_format)
 
         g_nodes_list = [nodes]
         g_edges_list = [edges]
         current_nodes = nodes
         current_edges = edges
+        current_snapshot = ('time range', 0)
 
         # set flag for easy use
         flag_use_file = True
+    elif alert_index is not None:
+        # check for valid time_ranges (marks of the range slider)
+        if not isinstance(time_ranges, list) or len(time_ranges) == 0 or len(alert_index) == 0:
+            print('[*]ERROR: Invalid time ranges')
+            exit(-1)
+        # nodes and edges of a time window are aggregated on demand, start with the whole time
+        g_alert_index = alert_index
+        current_nodes, current_edges = alert_index.get(alert_index.first_time(), alert_index.last_time())
+        current_snapshot = ('window',) + alert_index.find(alert_index.first_time(), alert_index.last_time())
+
+        print('[**] Number of Nodes: ' + str(len(current_nodes)))
+        print('[**] Number of Edges: ' + str(len(current_edges)))
+        flag_use_file = False
+    elif sliding_window is not None:
+        if len(sliding_window.times) == 0 or not sliding_step or sliding_step <= 0:
+            print('[*]ERROR: Invalid sliding window')
+            exit(-1)
+        # start with the first window
+        g_sliding_window = sliding_window
+        g_sliding_step = sliding_step
+        current_nodes, current_edges = sliding_window.get(sliding_window_bounds()[0])
+        current_snapshot = ('sliding',) + sliding_window.find(sliding_window_bounds()[0])
+        time_ranges = [my_parser.timestamp_to_datetime(sliding_window.first_time()),
+                       my_parser.timestamp_to_datetime(sliding_window.last_time())]
+
+        print('[**] Number of Nodes: ' + str(len(current_nodes)))
+        print('[**] Number of Edges: ' + str(len(current_edges)))
+        flag_use_file = False
     else:
         # check for valid time_ranges
         if not isinstance(time_ranges, list) or len(time_ranges) == 0:
@@ -321,6 +971,7 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
         g_edges_list = edges
         current_nodes = nodes[-1]
         current_edges = edges[-1]
+        current_snapshot = ('time range', len(nodes) - 1)
 
         print('[**] Number of Nodes: ' + str(len(current_nodes)))
         print('[**] Number of Edges: ' + str(len(current_edges)))
@@ -377,11 +1028,106 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
         marks = {}
         for index, time in enumerate(time_ranges):
             new_str = time_ranges[index].strftime("%Y/%m/%d-%H:%M:%S")
-            marks[index] = {'label': new_str}
+            if g_alert_index is not None:
+                marks[time_to_slider(time)] = {'label': new_str}
+            else:
+                marks[index] = {'label': new_str}
 
     # children for left side components
     children_left_side = []
-    if not flag_use_file:
+    if g_follower is not None:
+        # markdown text and status of the follow mode
+        children_left_side.append(html.Div(
+            className="twelve columns",
+            children=[dcc.Markdown(d("""
+                **Follow Mode**
+
+                New alerts of the log file are shown automatically.
+                """))] + follow_components(),
+            style={'height': '200px'}
+        ))
+    if g_sliding_window is not None:
+        # markdown text for sliding window controls
+        children_left_side.append(dcc.Markdown(d("""
+                **Sliding Time Window**
+
+                Move the time window step by step or play it.
+                """)))
+        # controls (and dummy sliders, see below)
+        children_left_side.append(html.Div(
+            className="twelve columns",
+            children=sliding_window_controls(sliding_window_bounds()[0]) + [
+                html.Div(children=[dcc.Slider(id='my-slider', min=0, max=0, step=0, value=0),
+                                   dcc.RangeSlider(id='my-range-slider', min=0, max=0, value=[0, 0]),
+                                   html.Div(id='output-container-slider')],
+                         style={'display': 'none'}),
+            ],
+            style={'height': '200px'}
+        ))
+    elif g_alert_index is not None:
+        # markdown text for time window range slider
+        children_left_side.append(dcc.Markdown(d("""
+                **Time Window To Visualize**
+
+                Select the start and the end of the time window to be visualized.
+                """)))
+        # range slider (and dummy slider, see below)
+        children_left_side.append(html.Div(
+            className="twelve columns",
+            children=[
+                dcc.RangeSlider(
+                    id='my-range-slider',
+                    min=0,
+                    max=RANGE_SLIDER_STEPS,
+                    step=1,
+                    value=[0, RANGE_SLIDER_STEPS],
+                    marks=marks,
+                    allowCross=False,
+                    vertical=True,
+                ),
+                html.Br(),
+                html.Div(id='output-container-slider'),
+                html.Div(children=[dcc.Slider(id='my-slider', min=0, max=0, step=0, value=0)],
+                         style={'display': 'none'}),
+            ],
+            style={'height': '500px'}
+        ))
+    elif g_datasets is not None:
+        # markdown text for dataset picker and range slider
+        children_left_side.append(dcc.Markdown(d("""
+                **Dataset And Time Range To Visualize**
+
+                Select the dataset and the time range to be visualized.
+                """)))
+        # dataset picker and range slider (the time ranges are changed with the dataset)
+        children_left_side.append(html.Div(
+            className="twelve columns",
+            children=[
+                dcc.Dropdown(
+                    id='dataset',
+                    options=[{'label': name, 'value': name} for name in g_datasets.names()],
+                    value=dataset,
+                    clearable=False,
+                ),
+                html.Br(),
+                dcc.Slider(
+                    id='my-slider',
+                    min=0,
+                    max=len(nodes_list) - 1,
+                    step=None,
+                    value=len(nodes_list) - 1,
+                    marks=time_range_marks(time_ranges, len(nodes_list)),
+                    vertical=True,
+                ),
+                html.Br(),
+                html.Div(id='output-container-slider'),
+                # dummy range slider (only needed in mode display-window)
+                html.Div(children=[dcc.RangeSlider(id='my-range-slider', min=0, max=0, value=[0, 0])],
+                         style={'display': 'none'}),
+            ],
+            style={'height': '550px'}
+        ))
+    elif not flag_use_file:
         # markdown text for range slider
         children_left_side.append(dcc.Markdown(d("""
                 **Time Range To Visualize**
@@ -403,6 +1149,9 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
                 ),
                 html.Br(),
                 html.Div(id='output-container-slider'),
+                # dummy range slider (only needed in mode display-window)
+                html.Div(children=[dcc.RangeSlider(id='my-range-slider', min=0, max=0, value=[0, 0])],
+                         style={'display': 'none'}),
             ],
             style={'height': '500px'}
         ))
@@ -418,11 +1167,22 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
                 max=0,
                 step=0,
                 value=0
-            )
+            ),
+                dcc.RangeSlider(id='my-range-slider', min=0, max=0, value=[0, 0])
             ],
             style={'display': 'none'}
         ))
 
+    # dummy components of the other modes (invisible but needed to get the callbacks running)
+    dummies = []
+    if g_sliding_window is None:
+        dummies += sliding_window_controls(0)
+    if g_follower is None:
+        dummies += follow_components(disabled=True)
+    if g_datasets is None:
+        dummies.append(dcc.Dropdown(id='dataset', options=[], value=None))
+    children_left_side.append(html.Div(children=dummies, style={'display': 'none'}))
+
     # markdown text for node to center
     children_left_side.append(html.Div(
         className="twelve columns",
@@ -438,6 +1198,24 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
         style={'height': '300px'}
     ))
 
+    if LAYOUT == 'incremental' and g_datasets is None and g_follower is None:
+        # stable layouts: every node is placed once at the start (datasets: when they are loaded, see
+        # dataset_positions, follow: when the alerts are imported, see publish_follow_view)
+        if len(g_nodes_list) > 0:
+            g_node_positions = sweep_layouts(g_nodes_list, g_edges_list)
+        elif g_sliding_window is not None:
+            # all alerts (one window from the first to the last alert)
+            first, last = g_sliding_window.first_time(), g_sliding_window.last_time()
+            all_nodes, all_edges = g_sliding_window.get(last, last - first + 1)
+            g_node_positions = sweep_layouts([all_nodes], [all_edges])
+        elif g_alert_index is not None:
+            # the first snapshot has all alerts
+            g_node_positions = sweep_layouts([current_nodes], [current_edges])
+    initial_figure, initial_figure_key = update_graph(current_nodes, current_edges, current_snapshot, '', None)
+    if g_datasets is None and g_follower is None and g_sliding_window is None and g_alert_index is None:
+        # figures of the other time ranges in the background (one dataset with fixed time ranges only)
+        start_precomputing(g_nodes_list, g_edges_list, current_snapshot)
+
     app.layout = html.Div([
         ######### Title
         html.Div([html.H1("Snort Net Viewer")],
@@ -456,8 +1234,9 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
                 ######### middle graph component
                 html.Div(
                     className="eight columns",
-                    children=[dcc.Graph(id="my-graph",
-                                        figure=network_graph(NODE_TO_CENTER))],
+                    children=[dcc.Graph(id="my-graph", figure=initial_figure),
+                              # key of the figure shown in the browser (only changes are sent, see update_figure)
+                              dcc.Store(id='figure-key', data=initial_figure_key)],
                 ),
                 ######### right side two output component
                 html.Div(
@@ -482,9 +1261,10 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
                                 Number of alerts: &nbsp; &nbsp; &nbsp; &nbsp;*{str(sum_alerts)}*  
                                 """
                                                )),
+                                dcc.Markdown(id='layout-cache-stats', children=layout_cache_stats() + dataset_stats()),
                             ],
 
-                            style={'height': '350px'}),
+                            style={'height': '450px' if g_datasets is not None else '400px'}),
 
                         html.Div(
                             className='twelve columns',
@@ -523,9 +1303,16 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
                     children=[dash_table.DataTable(
                         id='my_table',
                         columns=[c for c in columns],
-                        filter_action="native",
-                        sort_action="native",
-                        data=current_edges.to_dict('records'),
+                        # only the page is sent, the rows are filtered and sorted on the server
+                        page_action="custom",
+                        page_current=0,
+                        page_size=TABLE_PAGE_SIZE,
+                        filter_action="custom",
+                        filter_query='',
+                        sort_action="custom",
+                        sort_mode="multi",
+                        sort_by=[],
+                        data=[],
                         style_header={
                             'fontWeight': 'bold',
                             'textAlign': 'left',
@@ -572,19 +1359,91 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
     # TODO - error in export-display mode because first input does not exists - solution? - dash callbacks dynamic input ?
     ######### callback for the time range slider and the node center input component
     @app.callback(
-        dash.dependencies.Output('my-graph', 'figure'),
-        [dash.dependencies.Input('my-slider', 'value'), dash.dependencies.Input('input1', 'value')])
-    def update_time_range_and_node_to_center(value, input1):
-        global current_nodes
-        global current_edges
-        global NODE_TO_CENTER
-        current_nodes = g_nodes_list[value]
-        current_edges = g_edges_list[value]
-        NODE_TO_CENTER = input1
-        blank_row = {}
-        for column in columns:
-            blank_row[column['id']] = ''
-        return network_graph(NODE_TO_CENTER)
+        [dash.dependencies.Output('my-graph', 'figure'), dash.dependencies.Output('figure-key', 'data'),
+         dash.dependencies.Output('layout-cache-stats', 'children')],
+        [dash.dependencies.Input('my-slider', 'value'), dash.dependencies.Input('my-range-slider', 'value'),
+         dash.dependencies.Input('sliding-position', 'data'), dash.dependencies.Input('follow-interval', 'n_intervals'),
+         dash.dependencies.Input('dataset', 'value'), dash.dependencies.Input('input1', 'value')],
+        [dash.dependencies.State('figure-key', 'data')])
+    def update_time_range_and_node_to_center(value, window, position, n_intervals, dataset, input1, figure_key):
+        nodes, edges, snapshot = view_snapshot(value, window, position, dataset)
+        # send only the changes compared to the figure in the browser
+        figure, figure_key = update_graph(nodes, edges, snapshot, input1, figure_key)
+        if figure is dash.no_update and dash.callback_context.triggered[0]['prop_id'] == 'follow-interval.n_intervals':
+            # no new alerts published since the figure in the browser (follow_log)
+            raise dash.exceptions.PreventUpdate
+        return figure, figure_key, layout_cache_stats() + dataset_stats()
+
+    ######### callback for the dataset picker
+    @app.callback(
+        [dash.dependencies.Output('my-slider', 'max'), dash.dependencies.Output('my-slider', 'marks'),
+         dash.dependencies.Output('my-slider', 'value')],
+        [dash.dependencies.Input('dataset', 'value')])
+    def select_dataset(dataset):
+        if g_datasets is None:
+            raise dash.exceptions.PreventUpdate
+        # time ranges of the selected dataset, start with the last one
+        nodes_list, edges_list, time_ranges, positions = g_datasets.get(dataset)
+        return len(nodes_list) - 1, time_range_marks(time_ranges, len(nodes_list)), len(nodes_list) - 1
+
+    ######### callback for the selected time window
+    @app.callback(
+        dash.dependencies.Output('output-container-slider', 'children'),
+        [dash.dependencies.Input('my-range-slider', 'value')])
+    def display_time_window(window):
+        if g_alert_index is None:
+            return ''
+        start, end = (my_parser.timestamp_to_datetime(slider_to_time(position)) for position in window)
+        return 'Selected: ' + start.strftime("%Y/%m/%d-%H:%M:%S") + ' - ' + end.strftime("%Y/%m/%d-%H:%M:%S")
+
+    ######### callback for the sliding window controls
+    @app.callback(
+        [dash.dependencies.Output('sliding-position', 'data'), dash.dependencies.Output('sliding-interval', 'disabled'),
+         dash.dependencies.Output('sliding-play', 'children'),
+         dash.dependencies.Output('sliding-window-label', 'children')],
+        [dash.dependencies.Input('sliding-interval', 'n_intervals'),
+         dash.dependencies.Input('sliding-step-back', 'n_clicks'),
+         dash.dependencies.Input('sliding-step-forward', 'n_clicks'),
+         dash.dependencies.Input('sliding-play', 'n_clicks')],
+        [dash.dependencies.State('sliding-position', 'data'), dash.dependencies.State('sliding-interval', 'disabled')])
+    def move_sliding_window(n_intervals, n_back, n_forward, n_play, position, disabled):
+        if g_sliding_window is None:
+            raise dash.exceptions.PreventUpdate
+        first, last = sliding_window_bounds()
+        playing = not disabled
+        trigger = dash.callback_context.triggered[0]['prop_id'].split('.')[0]
+        if trigger == 'sliding-play':
+            playing = not playing
+            if playing and position >= last:
+                # play again from the beginning
+                position = first
+        elif trigger == 'sliding-step-back':
+            playing = False
+            position -= g_sliding_step
+        elif trigger in ('sliding-step-forward', 'sliding-interval'):
+            position += g_sliding_step
+        position = max(first, min(position, last))
+        if position >= last:
+            # end of the alerts reached
+            playing = False
+
+        start = my_parser.timestamp_to_datetime(position - g_sliding_window.window)
+        end = my_parser.timestamp_to_datetime(position)
+        label = 'Window: ' + start.strftime("%Y/%m/%d-%H:%M:%S") + ' - ' + end.strftime("%Y/%m/%d-%H:%M:%S")
+        return position, not playing, 'Pause' if playing else 'Play', label
+
+    ######### callback for the status of the follow mode
+    @app.callback(
+        dash.dependencies.Output('follow-status', 'children'),
+        [dash.dependencies.Input('follow-interval', 'n_intervals')])
+    def display_follow_status(n_intervals):
+        if g_follower is None:
+            return ''
+        status = 'Alerts: ' + str(g_follower.num_alerts) + ' (' + str(g_follower.offset) + ' bytes read)'
+        if g_follower.last_time is not None:
+            last = my_parser.timestamp_to_datetime(g_follower.last_time)
+            status += ', last alert: ' + last.strftime("%Y/%m/%d-%H:%M:%S")
+        return status
 
     ######### callback for the click data component
     @app.callback(
@@ -594,75 +1453,40 @@ def build(nodes=None, nodes_file=None, edges=None, edges_file=None, alert_file=N
         if clickData:
             return json.dumps(clickData, indent=2)
 
-    ######### callback for the table component
+    ######### callback for the table component (paged, sorted and filtered on the server)
     @app.callback(
-        dash.dependencies.Output('my_table', 'data'),
-        [dash.dependencies.Input('my-graph', 'clickData'), dash.dependencies.Input('my_table', 'columns')])
-    def display_click_data_in_table(clickData, columns):
-        if not clickData or 'customdata' not in clickData['points'][0]:
+        [dash.dependencies.Output('my_table', 'data'), dash.dependencies.Output('my_table', 'page_count')],
+        [dash.dependencies.Input('my-graph', 'clickData'), dash.dependencies.Input('my_table', 'columns'),
+         dash.dependencies.Input('my_table', 'page_current'), dash.dependencies.Input('my_table', 'page_size'),
+         dash.dependencies.Input('my_table', 'sort_by'), dash.dependencies.Input('my_table', 'filter_query'),
+         dash.dependencies.Input('figure-key', 'data')],
+        [dash.dependencies.State('my-slider', 'value'), dash.dependencies.State('my-range-slider', 'value'),
+         dash.dependencies.State('sliding-position', 'data'), dash.dependencies.State('dataset', 'value')])
+    def display_click_data_in_table(clickData, columns, page_current, page_size, sort_by, filter_query, figure_key,
+                                    value, window, position, dataset):
+        rows = None
+        if clickData and 'customdata' in clickData['points'][0]:
+            # edges of the figure in the browser
+            snapshot, edge_store = g_edge_stores.get(figure_key, (None, None))
+            if edge_store is None:
+                # figure evicted or shown by another worker process: edges of the selected snapshot
+                edge_store = my_parser.EdgeStore(view_snapshot(value, window, position, dataset)[1])
+            # attacks of the clicked edge (From IP, To IP)
+            from_ip, to_ip = clickData['points'][0]['customdata']
+            rows = edge_store.attack_rows(from_ip, to_ip)
+        if rows is None:
             # just show blank row
             blank_row = {}
             for column in columns:
                 blank_row[column['id']] = ''
-            return [blank_row]
-        else:
-            current_edge = clickData['points'][0]['customdata']
-            return edge_to_dicts_for_table(current_edge)
-
-    def edge_to_dicts_for_table(edge):
-        """
-        generates a list of dicts from a single edge
-        :param edge:
-        :return: list of dicts to display them in the table
-        """
-        list_of_dicts = []
-        num_attacks = len(edge[0][1])
-
-        for i in range(num_attacks):
-            dict = {}
-            for index, pairs in enumerate(edge):
-                if not isinstance(pairs[1], list):
-                    # single data like IP or Weight
-                    dict[pairs[0]] = str(pairs[1])
-                elif pairs[0] == 'Additional':
-                    # format links to clickable
-                    dict[pairs[0]] = build_markdown_links(pairs[1][i])
-                else:
-                    # list data like attack names or ports
-                    # format string for better look
-                    dict[pairs[0]] = str(pairs[1][i]).replace('[', '').replace(']', '').replace('\'', '')
-
-
-            list_of_dicts.append(dict)
-
-        # go over lines to swap from_ip and to_ip where direction is opposite
-        for index, dicto in enumerate(list_of_dicts):
-            if dicto["Attack Direction"] == str(1):
-                # swap IPs
-                from_ip = dicto["To IP"]
-                to_ip = dicto["From IP"]
-                # write back to list
-                list_of_dicts[index]["From IP"] = from_ip
-                list_of_dicts[index]["To IP"] = to_ip
-
-        return list_of_dicts
-
-    def build_markdown_links(my_list):
-        """
-        extract links from a string and build clickable markdown links
-        :param my_list: list in which the given string is
-        :return: string with markdown links
-        """
-        all_links = re.findall(r'http:.*?\].*?', my_list[0])
-
-        new = ''
-        for link in all_links:
-            # html_my = html.A(html.P('Link'), href=link[:-1])
-            my_link = '[' + link[:-1] + '"](' + link[
-                                                :-1] + ")"  # cut the last character because "]" is still in the string
-            new += '  ' + my_link  # two whitspaces means line break in markdown
-
-        # example = ['[Stack Overflow](http://stackoverflow.com)', '[Stack Overflow](http://stackoverflow.com)']
-        return new
+            return [blank_row], 1
+
+        rows = filter_rows(rows, filter_query)
+        rows = sort_rows(rows, sort_by)
+        # only the rows of the page
+        page_count = max(1, -(-len(rows) // page_size))
+        page_current = min(page_current or 0, page_count - 1)
+        page = rows.iloc[page_current * page_size:(page_current + 1) * page_size]
+        return page[[column['id'] for column in columns]].to_dict('records'), page_count
 
     print('[*] Server build successfully')
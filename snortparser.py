@@ -1,7 +1,27 @@
-import copy
+import ast
+import atexit
 import datetime
+import itertools
+from array import array
+from collections import deque
+import heapq
+import io
+import locale
+import mmap
+import os
+import pickle
 import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as parquet
+
+from lrucache import LRUCache
 
 current_min_number_alerts = 0  # minimal number of an alert
 current_max_number_alerts = 0  # maximal number of an alert
@@ -12,6 +32,46 @@ TYPE_ATTACKER = 'Attacker'
 TYPE_VICTIM = 'Victim'
 TYPE_COMPROMISED = 'Compromised'
 
+STREAM_CHUNK_SIZE = 100000  # alerts sorted in memory at once while streaming, larger logs are merged from temporary files
+STREAM_SPILL_BATCH = 1000  # alerts pickled and read back at once from the temporary files of a stream
+SNAPSHOT_CACHE_SIZE = 8  # number of rebuilt time range snapshots kept in memory
+FOLLOW_CHUNK_SIZE = 64 * 1024 * 1024  # bytes read at once while following a log file
+FOLLOW_HEAD_SIZE = 256  # first bytes of a followed log file, used to detect a replaced file
+FOLLOW_CHECKPOINT_INTERVAL = 60  # minimal seconds between two checkpoints of a followed log file (and one at exit)
+CHECKPOINT_VERSION = 2  # version of the follower checkpoints, older checkpoints are ignored
+
+# columns of the nodes and edges DataFrames (Node.to_dict, Edge.to_dict)
+NODE_COLUMNS = ['IP', 'Type', 'Ports in', 'Ports out']
+EDGE_COLUMNS = ['Attack Name', 'Classification', 'Priority', 'From IP', 'To IP', 'Attack Direction', 'From Ports',
+                'To Ports', 'Timestamps', 'Count', 'Weight', 'Additional']
+
+# file formats of the exported nodes and edges (csv: lists as python literals, parquet/feather: native list columns)
+EXPORT_FORMATS = ['csv', 'parquet', 'feather']
+
+TIMESTAMP_FORMAT = "%Y/%m/%d-%H:%M:%S.%f"  # format of Alert.timestamp
+EPOCH = datetime.datetime(1970, 1, 1)  # Alert.time counts the microseconds since EPOCH
+# caches of parse_timestamp (a log usually covers only a few days and consecutive alerts often share the second)
+# the last second is one tuple which is replaced in one assignment, so concurrent parsers never see half an update
+timestamp_days = {}  # date (YYYY/MM/DD) -> days since EPOCH
+timestamp_last_second = ('', 0)  # (timestamp up to the seconds, microseconds since EPOCH) of the last parsed timestamp
+
+# regular expressions for the three header lines of an alert (fallback of the fast tokenizer)
+RE_SIGNATURE = re.compile(r'\[\*\*\].*\[(.*?)\](.*?)\[\*\*\]')
+RE_CLASSIFICATION = re.compile(r'\[Classification: (\b[a-zA-Z -]+\b)\].\[Priority: ([1-9])\]')
+RE_ADDRESSES_PORTS = re.compile(
+    r'([0-9/]+-[0-9:.]+)\s+.*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):(\d{1,5})\s+->\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):(\d{1,5})')
+RE_ADDRESSES = re.compile(
+    r'([0-9/]+-[0-9:.]+)\s+.*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+->\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
+# anchored patterns of the fast tokenizer for the standard header lines (groups need no strip)
+RE_FAST_CLASSIFICATION = re.compile(r'\[Classification: ([a-zA-Z](?:[a-zA-Z -]*[a-zA-Z])?)\] \[Priority: ([1-9])\]')
+RE_FAST_ADDRESSES = re.compile(
+    r'([0-9/]+-[0-9:.]+) (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})(?::(\d{1,5}))? -> (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})(?::(\d{1,5}))?\s*$')
+# IPv4 addresses as integers for the AlertTable (a log has few distinct addresses)
+IP_CODE_CACHE_SIZE = 65536  # number of converted addresses which are remembered
+ip_code_cache = {}  # address -> integer value or None if it is not in its usual form (e.g. leading zeros)
+IP_KEYS = 1 << 32  # number of IPv4 addresses, keys of addresses not in their usual form start here (alert_keys)
+TIMESTAMP_LENGTH = 26  # length of a timestamp in TIMESTAMP_FORMAT (microseconds with 6 digits)
+
 
 class Alert:
     name = None
@@ -20,6 +80,7 @@ class Alert:
     from_ip = None
     to_ip = None
     timestamp = None
+    time = None  # parsed timestamp (int, microseconds since EPOCH)
 
     from_port = ""
     to_port = ""
@@ -32,114 +93,678 @@ class Alert:
             return False
 
 
+class AlertTable:
+    """
+    Compact columnar store of alerts: parallel arrays instead of one Alert object per alert
+    (timestamps as int64, IPv4 addresses as uint32, ports as uint16, priority as uint8 and
+    dictionary-encoded signature names, classifications and Xref information)
+    iterating or indexing gives Alert objects (object view for compatibility), the same as the list of alert objects:
+    addresses, ports and timestamps which are not in their usual form (e.g. leading zeros, ports above 65535, fewer
+    digits of the fraction) are kept as strings in self.raws and given back unchanged
+    """
+
+    def __init__(self):
+        self.times = array('q')  # microseconds since EPOCH
+        self.from_ips = array('I')
+        self.to_ips = array('I')
+        self.from_ports = array('H')
+        self.to_ports = array('H')
+        self.has_ports = array('B')  # 0: alert without ports (e.g. ICMP)
+        self.priorities = array('B')
+        self.name_codes = array('I')  # index in self.names
+        self.classification_codes = array('I')  # index in self.classifications
+        self.additional_codes = array('I')  # index in self.additionals
+        self.raw_codes = array('I')  # index in self.raws, 0: addresses, ports and timestamp in their usual form
+
+        # dictionaries of the encoded strings
+        self.names = []
+        self.classifications = []
+        self.additionals = []
+        self.codes = ({}, {}, {})  # string -> code for names, classifications, additionals
+        # (from IP, to IP, from port, to port, timestamp) strings of the alerts not in their usual form
+        self.raws = [None]
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        for index in range(len(self.times)):
+            yield self.get_alert(index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.times)
+        if not 0 <= index < len(self.times):
+            raise IndexError('alert index out of range')
+        return self.get_alert(index)
+
+    def append(self, alert_obj):
+        """encode a validated alert object and add it as new row"""
+        # encode everything first to not end up with a half-written row
+        from_ip = ip_code(alert_obj.from_ip)
+        to_ip = ip_code(alert_obj.to_ip)
+        has_ports = 1 if alert_obj.from_port else 0
+        from_port = port_code(alert_obj.from_port) if has_ports else 0
+        to_port = port_code(alert_obj.to_port) if has_ports else 0
+        raw_code = 0
+        if from_ip is None or to_ip is None or from_port is None or to_port is None or \
+                not regular_timestamp(alert_obj.timestamp):
+            # kept as strings, the numbers are only used for the rows in their usual form
+            raw_code = len(self.raws)
+            self.raws.append((alert_obj.from_ip, alert_obj.to_ip, alert_obj.from_port, alert_obj.to_port,
+                              alert_obj.timestamp))
+            from_ip = from_ip or 0
+            to_ip = to_ip or 0
+            from_port = from_port or 0
+            to_port = to_port or 0
+
+        self.times.append(alert_obj.time)
+        self.from_ips.append(from_ip)
+        self.to_ips.append(to_ip)
+        self.from_ports.append(from_port)
+        self.to_ports.append(to_port)
+        self.has_ports.append(has_ports)
+        self.priorities.append(int(alert_obj.priority))
+        self.name_codes.append(self.encode(0, self.names, alert_obj.name))
+        self.classification_codes.append(self.encode(1, self.classifications, alert_obj.classification))
+        self.additional_codes.append(self.encode(2, self.additionals, alert_obj.additional))
+        self.raw_codes.append(raw_code)
+
+    def encode(self, dictionary, values, value):
+        """return the code of value in the given dictionary (add it if not existing)"""
+        code = self.codes[dictionary].get(value)
+        if code is None:
+            code = len(values)
+            values.append(value)
+            self.codes[dictionary][value] = code
+        return code
+
+    def get_alert(self, index):
+        """decode the row at index to an Alert object"""
+        alert_obj = Alert()
+        alert_obj.name = self.names[self.name_codes[index]]
+        alert_obj.classification = self.classifications[self.classification_codes[index]]
+        alert_obj.priority = str(self.priorities[index])
+        alert_obj.from_ip = int_to_ip(self.from_ips[index])
+        alert_obj.to_ip = int_to_ip(self.to_ips[index])
+        alert_obj.time = self.times[index]
+        alert_obj.timestamp = format_timestamp(alert_obj.time)
+        if self.has_ports[index]:
+            alert_obj.from_port = str(self.from_ports[index])
+            alert_obj.to_port = str(self.to_ports[index])
+        additional = self.additionals[self.additional_codes[index]]
+        if additional:
+            alert_obj.additional = additional
+        raw = self.raws[self.raw_codes[index]]
+        if raw is not None:
+            alert_obj.from_ip, alert_obj.to_ip, alert_obj.from_port, alert_obj.to_port, alert_obj.timestamp = raw
+        return alert_obj
+
+    def columns(self):
+        """return all columns as numpy arrays (views, no copy)"""
+        return {
+            'time': np.frombuffer(self.times, dtype=np.int64),
+            'from_ip': np.frombuffer(self.from_ips, dtype=np.uint32),
+            'to_ip': np.frombuffer(self.to_ips, dtype=np.uint32),
+            'from_port': np.frombuffer(self.from_ports, dtype=np.uint16),
+            'to_port': np.frombuffer(self.to_ports, dtype=np.uint16),
+            'has_ports': np.frombuffer(self.has_ports, dtype=np.uint8),
+            'priority': np.frombuffer(self.priorities, dtype=np.uint8),
+            'name': np.frombuffer(self.name_codes, dtype=np.uint32),
+            'classification': np.frombuffer(self.classification_codes, dtype=np.uint32),
+            'additional': np.frombuffer(self.additional_codes, dtype=np.uint32),
+            'raw': np.frombuffer(self.raw_codes, dtype=np.uint32),
+        }
+
+    def set_columns(self, columns, names, classifications, additionals, raws=(None,)):
+        """
+        replace all rows by the given columns and dictionaries (inverse of columns(), e.g. to load a saved table)
+        :param columns: dict of numpy arrays like columns()
+        :param names: dictionary of the signature names (list of strings)
+        :param classifications: dictionary of the classifications
+        :param additionals: dictionary of the Xref information
+        :param raws: strings of the alerts not in their usual form (self.raws)
+        """
+        for name, attribute in (('time', 'times'), ('from_ip', 'from_ips'), ('to_ip', 'to_ips'),
+                                ('from_port', 'from_ports'), ('to_port', 'to_ports'), ('has_ports', 'has_ports'),
+                                ('priority', 'priorities'), ('name', 'name_codes'),
+                                ('classification', 'classification_codes'), ('additional', 'additional_codes'),
+                                ('raw', 'raw_codes')):
+            column = array(getattr(self, attribute).typecode)
+            column.frombytes(np.ascontiguousarray(columns[name], dtype=column.typecode).tobytes())
+            setattr(self, attribute, column)
+        self.names = list(names)
+        self.classifications = list(classifications)
+        self.additionals = list(additionals)
+        self.raws = [None] + [tuple(raw) for raw in raws[1:]]
+        self.codes = tuple({value: code for code, value in enumerate(values)}
+                           for values in (self.names, self.classifications, self.additionals))
+
+    def sort(self):
+        """sort all rows by timestamp (stable, like sorted() for alert objects)"""
+        order = np.argsort(np.frombuffer(self.times, dtype=np.int64), kind='stable')
+        self.reorder(order)
+
+    def reorder(self, order):
+        """rearrange all rows in the given order (array of row indices)"""
+        for name in ('times', 'from_ips', 'to_ips', 'from_ports', 'to_ports', 'has_ports', 'priorities',
+                     'name_codes', 'classification_codes', 'additional_codes', 'raw_codes'):
+            column = getattr(self, name)
+            reordered = array(column.typecode)
+            reordered.frombytes(np.frombuffer(column, dtype=column.typecode)[order].tobytes())
+            setattr(self, name, reordered)
+
+    def extend(self, other):
+        """append all rows of another table (dictionary codes are translated)"""
+        translations = []
+        for dictionary, (values, other_values) in enumerate(
+                [(self.names, other.names), (self.classifications, other.classifications),
+                 (self.additionals, other.additionals)]):
+            translations.append(np.array([self.encode(dictionary, values, value) for value in other_values],
+                                         dtype=np.uint32))
+
+        # the raws of the other table are appended (0 stays 0)
+        translations.append(np.array([0] + list(range(len(self.raws), len(self.raws) + len(other.raws) - 1)),
+                                     dtype=np.uint32))
+        self.raws.extend(other.raws[1:])
+
+        for name in ('times', 'from_ips', 'to_ips', 'from_ports', 'to_ports', 'has_ports', 'priorities'):
+            getattr(self, name).extend(getattr(other, name))
+        for name, translation in zip(('name_codes', 'classification_codes', 'additional_codes', 'raw_codes'),
+                                     translations):
+            codes = np.frombuffer(getattr(other, name), dtype=np.uint32)
+            getattr(self, name).frombytes(translation[codes].tobytes() if len(codes) else b'')
+
+    def memory_usage(self):
+        """approximate memory usage in bytes (columns and dictionaries)"""
+        size = sum(column.itemsize * len(column) for column in self.columns().values())
+        for values in (self.names, self.classifications, self.additionals):
+            size += sum(len(value) for value in values)
+        size += sum(len(value) for raw in self.raws[1:] for value in raw)
+        return size
+
+
+def ip_to_int(ip):
+    """converts a dotted IPv4 address to an integer (ValueError if not valid)"""
+    groups = [int(group) for group in ip.split('.')]
+    if len(groups) != 4 or max(groups) > 255:
+        raise ValueError('invalid IPv4 address: ' + ip)
+    return (groups[0] << 24) | (groups[1] << 16) | (groups[2] << 8) | groups[3]
+
+
+def int_to_ip(value):
+    """converts an integer back to a dotted IPv4 address"""
+    return str(value >> 24) + '.' + str((value >> 16) & 255) + '.' + str((value >> 8) & 255) + '.' + str(value & 255)
+
+
+def ip_code(ip):
+    """
+    integer value of an IPv4 address in its usual form (int_to_ip gives it back unchanged), None otherwise
+    (e.g. leading zeros or numbers above 255), the results are cached
+    """
+    code = ip_code_cache.get(ip, False)
+    if code is False:
+        try:
+            code = ip_to_int(ip)
+        except ValueError:
+            code = None
+        if code is not None and int_to_ip(code) != ip:
+            code = None
+        if len(ip_code_cache) >= IP_CODE_CACHE_SIZE:
+            ip_code_cache.clear()
+        ip_code_cache[ip] = code
+    return code
+
+
+def port_code(port):
+    """port number of a port in its usual form (no leading zeros, at most 65535), None otherwise"""
+    if port.isdigit() and (port[0] != '0' or port == '0') and (len(port) < 5 or int(port) <= 65535):
+        return int(port)
+    return None
+
+
+def regular_timestamp(timestamp):
+    """True if the timestamp is in TIMESTAMP_FORMAT with 6 digits of the fraction (format_timestamp gives it back)"""
+    if len(timestamp) != TIMESTAMP_LENGTH or timestamp[4] + timestamp[7] + timestamp[10] + timestamp[13] + \
+            timestamp[16] + timestamp[19] != '//-::.':
+        return False
+    digits = timestamp[:4] + timestamp[5:7] + timestamp[8:10] + timestamp[11:13] + timestamp[14:16] + \
+        timestamp[17:19] + timestamp[20:]
+    return digits.isascii() and digits.isdigit()
+
+
 def read_log_file(file_path):
     """
-    Read log file and create a list of alerts (strings)
+    Read log file lazily and yield the alerts one by one (strings)
+    only the lines of the current alert are kept in memory, so the file size does not matter
     :param file_path: file path of the Snort log file (alert)
-    :return: list of list of strings (list of alerts consists of the lines)
+    :return: generator of list of strings (one alert consists of its lines)
     """
     print('[*] Start reading the log file')
-    all_alerts = []  # all alerts, list of alerts consists of all lines
 
     with open(file_path, 'r') as current:
-        lines = current.readlines()
-        if not lines:
+        empty = True
+        for alert in split_alert_blocks(current):
+            empty = False
+            yield alert
+        if empty:
             print('FILE IS EMPTY')
-            return -1
-        else:
-            # load alerts one by one
-            alert = []  # new alert
-            for line in lines:
-                if line.startswith('[**]'):
-                    # new alert
-                    if len(alert) != 0:
-                        all_alerts.append(alert)
-                    alert = [line.strip('\n')]
-                elif line != '\n':
-                    # line belongs to the same alert
-                    alert.append(line.strip('\n'))
-            # add last alert to list
-            all_alerts.append(alert)
+            return
     print('[*] Log file successfully read')
-    return all_alerts
 
 
-def import_alerts(all_alerts):
+def split_alert_blocks(lines):
     """
-    Go over all_alerts list and extract details to create Alert objects
-    :param all_alerts: list of list of strings
-    :return: list of validated alerts (list of alert objects)
+    Group lines of a Snort log into alerts (a new alert starts with a [**] header)
+    :param lines: iterable of lines (e.g. an opened file)
+    :return: generator of list of strings (one alert consists of its lines)
     """
-    print('[*] Start importing alerts')
-    alerts_validated = []
-    alerts_corrupted = []
+    alert = []  # new alert
+    for line in lines:
+        if line.startswith('[**]'):
+            # new alert
+            if len(alert) != 0:
+                yield alert
+            alert = [line.strip('\n')]
+        elif line != '\n':
+            # line belongs to the same alert
+            alert.append(line.strip('\n'))
+    # last alert
+    if len(alert) != 0:
+        yield alert
+
+
+def parse_alert(alert, year=None, fast=True):
+    """
+    Extract the details of a single alert and create an Alert object
+    :param alert: list of strings (lines of one alert)
+    :param year: year as string to prepend to the timestamps (Snort leaves it out), default: current year
+    :param fast: use the fast tokenizer for the header lines (regular expressions only for unusual lines)
+    :return: alert object (not validated yet)
+    """
+    if not year:
+        year = str(datetime.datetime.now().year)
 
-    for alert in all_alerts:
-        alert_obj = Alert()
-        # m = re.search(r'(\b[a-zA-Z -]+\b)', alert[0])
-        m = re.search(r'\[\*\*\].*\[(.*?)\](.*?)\[\*\*\]', alert[0])
+    alert_obj = Alert()
+    name = tokenize_signature_line(alert[0]) if fast else None
+    if name is None:
+        m = RE_SIGNATURE.search(alert[0])
         if m:
-            alert_obj.name = m.group(2).strip()
+            name = m.group(2).strip()
+    alert_obj.name = name
 
-        m = re.search(r'\[Classification: (\b[a-zA-Z -]+\b)\].\[Priority: ([1-9])\]', alert[1])
+    if len(alert) < 3:
+        # incomplete alert (e.g. cut off at the end of the file)
+        return alert_obj
+
+    tokens = tokenize_classification_line(alert[1]) if fast else None
+    if tokens is None:
+        m = RE_CLASSIFICATION.search(alert[1])
         if m:
-            alert_obj.classification = m.group(1).strip()
-            alert_obj.priority = m.group(2).strip()
-
-        m = re.search(
-            r'([0-9/]+-[0-9:.]+)\s+.*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):(\d{1,5})\s+->\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):(\d{1,5})',
-            alert[2])
-        if not m:
-            m = re.search(
-                r'([0-9/]+-[0-9:.]+)\s+.*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+->\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})',
-                alert[2])
-            if m:
-                alert_obj.timestamp = str(datetime.datetime.now().year) + '/' + m.group(1).strip()
-                alert_obj.from_ip = m.group(2).strip()
-                alert_obj.to_ip = m.group(3).strip()
-                # print('Date: ' + m.group(1) + ' Time: ' + m.group(2) + ' FromIP: ' + m.group(3) + ' ToIP: ' + m.group(4))
+            tokens = m.group(1).strip(), m.group(2).strip()
+    if tokens:
+        alert_obj.classification, alert_obj.priority = tokens
+
+    tokens = tokenize_address_line(alert[2]) if fast else None
+    if tokens is None:
+        m = RE_ADDRESSES_PORTS.search(alert[2])
+        if m:
+            tokens = tuple(group.strip() for group in m.groups())
         else:
-            alert_obj.timestamp = str(datetime.datetime.now().year) + '/' + m.group(1).strip()
-            alert_obj.from_ip = m.group(2).strip()
-            alert_obj.from_port = m.group(3).strip()
-            alert_obj.to_ip = m.group(4).strip()
-            alert_obj.to_port = m.group(5).strip()
+            m = RE_ADDRESSES.search(alert[2])
+            if m:
+                tokens = m.group(1).strip(), m.group(2).strip(), '', m.group(3).strip(), ''
+    if tokens:
+        timestamp, alert_obj.from_ip, from_port, alert_obj.to_ip, to_port = tokens
+        alert_obj.timestamp = year + '/' + timestamp
+        if from_port:
+            alert_obj.from_port = from_port
+            alert_obj.to_port = to_port
+
+    # lines 3 and 4 contain packet information
+    # because every line will be unique, we will leave it out for now
+
+    # if 3 < len(alert):
+    #     alert_obj.additional = alert[3]
+
+    # if 4 < len(alert):
+    #     alert_obj.additional += '\n' + alert[4]
+
+    if 5 < len(alert):
+        # Xref information
+        alert_obj.additional = alert[5]
+
+    if alert_obj.timestamp:
+        # parse the timestamp once, all following steps work with the integer value
+        try:
+            alert_obj.time = parse_timestamp(alert_obj.timestamp)
+        except ValueError:
+            # invalid date or time
+            alert_obj.timestamp = None
+
+    return alert_obj
+
+
+def tokenize_signature_line(line):
+    """
+    Fast tokenizer for the standard first header line: [**] [gid:sid:rev] Signature name [**]
+    :param line: first line of an alert
+    :return: signature name or None if the line needs the regular expression
+    """
+    line = line.rstrip()
+    if not line.startswith('[**] [') or not line.endswith('[**]'):
+        return None
+    close = line.find(']', 6)
+    if close == -1 or close > len(line) - 5 or '[' in line[6:close]:
+        return None
+    name = line[close + 1:-4]
+    if '[' in name:
+        # the regular expression takes the last bracket pair as rule id
+        return None
+    return name.strip()
+
+
+def tokenize_classification_line(line):
+    """
+    Fast tokenizer for the standard second header line: [Classification: Some class] [Priority: 2]
+    :param line: second line of an alert
+    :return: tuple of classification and priority or None if the line needs the regular expression
+    """
+    m = RE_FAST_CLASSIFICATION.match(line)
+    if m:
+        return m.groups()
+    return None
+
+
+def tokenize_address_line(line):
+    """
+    Fast tokenizer for the standard third header line: 05/31-08:15:35.192846 1.2.3.4:5 -> 6.7.8.9:10
+    (ports are missing for e.g. ICMP)
+    :param line: third line of an alert
+    :return: tuple of timestamp, from ip, from port, to ip, to port or None if the line needs the regular expressions
+    """
+    m = RE_FAST_ADDRESSES.match(line)
+    if not m:
+        return None
+    timestamp, from_ip, from_port, to_ip, to_port = m.groups()
+    if from_port and to_port:
+        return timestamp, from_ip, from_port, to_ip, to_port
+    if not from_port and not to_port:
+        return timestamp, from_ip, '', to_ip, ''
+    # only one port given
+    return None
+
+
+def parse_timestamp(timestamp):
+    """
+    Fast parser for timestamps in the fixed TIMESTAMP_FORMAT (without strptime)
+    the days since EPOCH are cached per date (timestamp_days), because a log usually covers only a few days,
+    and the last parsed second is remembered (timestamp_last_second), because consecutive alerts often share it
+    :param timestamp: string like 2020/05/31-08:15:35.192846
+    :return: microseconds since EPOCH (int)
+    """
+    global timestamp_last_second
+    if len(timestamp) < 21 or timestamp[10] != '-' or timestamp[13] != ':' or timestamp[16] != ':' \
+            or timestamp[19] != '.':
+        # not the usual format, let strptime do the work
+        return datetime_to_timestamp(datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT))
+
+    fraction = timestamp[20:]
+    if len(fraction) > 6 or not fraction.isdigit():
+        raise ValueError('invalid timestamp: ' + timestamp)
+    # like %f: the fraction is padded to microseconds
+    microseconds = int(fraction) * 10 ** (6 - len(fraction))
+
+    last_second = timestamp_last_second
+    if timestamp[:19] == last_second[0]:
+        return last_second[1] + microseconds
+
+    date = timestamp[:10]
+    days = timestamp_days.get(date)
+    if days is None:
+        if date[4] != '/' or date[7] != '/':
+            raise ValueError('invalid timestamp: ' + timestamp)
+        days = datetime.date(int(date[:4]), int(date[5:7]), int(date[8:10])).toordinal() - EPOCH.toordinal()
+        timestamp_days[date] = days
+
+    hours = int(timestamp[11:13])
+    minutes = int(timestamp[14:16])
+    seconds = int(timestamp[17:19])
+    if hours > 23 or minutes > 59 or seconds > 59:
+        raise ValueError('invalid timestamp: ' + timestamp)
+
+    second = (((days * 24 + hours) * 60 + minutes) * 60 + seconds) * 1000000
+    timestamp_last_second = (timestamp[:19], second)
+    return second + microseconds
+
+
+def reset_timestamp_cache():
+    """empty the caches of parse_timestamp"""
+    global timestamp_days
+    global timestamp_last_second
+    timestamp_days = {}
+    timestamp_last_second = ('', 0)
+
+
+def datetime_to_timestamp(my_datetime):
+    """converts a datetime to microseconds since EPOCH (int)"""
+    return (my_datetime - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def timestamp_to_datetime(timestamp):
+    """converts microseconds since EPOCH (int) back to a datetime"""
+    return EPOCH + datetime.timedelta(microseconds=timestamp)
+
+
+def format_timestamp(timestamp):
+    """formats microseconds since EPOCH (int) in TIMESTAMP_FORMAT"""
+    return timestamp_to_datetime(timestamp).strftime(TIMESTAMP_FORMAT)
 
-        # lines 3 and 4 contain packet information
-        # because every line will be unique, we will leave it out for now
 
-        # if 3 < len(alert):
-        #     alert_obj.additional = alert[3]
+def stream_alerts(all_alerts, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Go over all_alerts lazily and yield the validated Alert objects sorted by timestamp (same order as import_alerts)
+    chunks of chunk_size alerts are sorted in memory and spilled to temporary files, the sorted chunks are merged,
+    so the parse -> aggregate pipeline runs with bounded memory
+    :param all_alerts: iterable of list of strings (e.g. generator of read_log_file)
+    :param chunk_size: number of alerts which are sorted in memory at once
+    :return: generator of validated alerts sorted by timestamp (alert objects)
+    """
+    print('[*] Start importing alerts (streaming)')
+    num_validated = 0
+    num_corrupted = 0
+    year = str(datetime.datetime.now().year)
+    chunk = []
+    runs = []  # temporary files of the sorted chunks (in file order)
+
+    try:
+        for alert in all_alerts:
+            alert_obj = parse_alert(alert, year)
+            # alert object created, now validate and add to the current chunk
+            if alert_obj.validate():
+                num_validated += 1
+                chunk.append(alert_obj)
+                if len(chunk) >= chunk_size:
+                    runs.append(spill_alerts(sorted(chunk, key=lambda x: x.time)))
+                    chunk = []
+            else:
+                num_corrupted += 1
+        chunk.sort(key=lambda x: x.time)
+
+        print('[*] Importing alerts successful (' + str(num_validated) + ' successful / ' + str(
+            num_corrupted) + ' ignored)')
+        # ties keep the file order (earlier chunks first) like the stable sort of import_alerts
+        yield from heapq.merge(*[read_spilled_alerts(run) for run in runs], chunk, key=lambda x: x.time)
+    finally:
+        for run in runs:
+            run.close()
+
+
+def spill_alerts(alerts):
+    """
+    write sorted alerts to a temporary file (in batches, so they can be read back lazily)
+    :param alerts: list of alert objects
+    :return: temporary file (removed when it is closed)
+    """
+    run = tempfile.TemporaryFile()
+    for index in range(0, len(alerts), STREAM_SPILL_BATCH):
+        pickle.dump(alerts[index:index + STREAM_SPILL_BATCH], run, protocol=pickle.HIGHEST_PROTOCOL)
+    return run
+
 
-        # if 4 < len(alert):
-        #     alert_obj.additional += '\n' + alert[4]
+def read_spilled_alerts(run):
+    """generator of the alerts of a temporary file of spill_alerts (one batch in memory at a time)"""
+    run.seek(0)
+    while True:
+        try:
+            alerts = pickle.load(run)
+        except EOFError:
+            return
+        yield from alerts
 
-        if 5 < len(alert):
-            # Xref information
-            alert_obj.additional = alert[5]
 
+def import_alerts(all_alerts, columnar=False):
+    """
+    Go over all_alerts and extract details to create Alert objects
+    :param all_alerts: iterable of list of strings (e.g. generator of read_log_file)
+    :param columnar: return an AlertTable (compact columnar store) instead of a list
+    :return: list of validated alerts sorted by timestamp (list of alert objects) or AlertTable
+    """
+    print('[*] Start importing alerts')
+    alerts_validated = AlertTable() if columnar else []
+    num_corrupted = 0
+    year = str(datetime.datetime.now().year)
+
+    for alert in all_alerts:
+        alert_obj = parse_alert(alert, year)
         # alert object created, now validate and add to new list
-        if alert_obj.validate():
-            alerts_validated.append(alert_obj)
-        else:
-            alerts_corrupted.append(alert_obj)
+        if alert_obj.validate() and add_alert(alerts_validated, alert_obj):
+            continue
+        num_corrupted += 1
 
     # sort all alerts by timestamp
-    alerts_validated = sorted(alerts_validated, key=lambda x: datetime.datetime.strptime(x.timestamp, "%Y/%m/%d-%H:%M:%S.%f"))
+    if columnar:
+        alerts_validated.sort()
+    else:
+        alerts_validated = sorted(alerts_validated, key=lambda x: x.time)
 
     print('[*] Importing alerts successful (' + str(len(alerts_validated)) + ' successful / ' + str(
-        len(alerts_corrupted)) + ' ignored)')
+        num_corrupted) + ' ignored)')
     return alerts_validated
 
 
+def add_alert(alerts, alert_obj):
+    """
+    add a validated alert to a list or AlertTable
+    :return: False if the alert can not be stored
+    """
+    try:
+        alerts.append(alert_obj)
+    except ValueError:
+        return False
+    return True
+
+
+def import_alerts_parallel(file_path, workers=2, columnar=False):
+    """
+    Read and import the log file in parallel: the memory-mapped file is split into byte ranges
+    (aligned on the next [**] header), each range is parsed in its own process and the validated
+    alerts are merged in timestamp order (same result as import_alerts(read_log_file(file_path)))
+    :param file_path: file path of the Snort log file (alert)
+    :param workers: number of processes
+    :param columnar: return an AlertTable (the workers send compact tables instead of alert objects)
+    :return: list of validated alerts sorted by timestamp (list of alert objects) or AlertTable
+    """
+    print('[*] Start reading and importing the log file with ' + str(workers) + ' workers')
+
+    with open(file_path, 'rb') as current:
+        if current.seek(0, io.SEEK_END) == 0:
+            print('FILE IS EMPTY')
+            return AlertTable() if columnar else []
+        with mmap.mmap(current.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ranges = split_byte_ranges(mm, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(import_byte_range, [file_path] * len(ranges), ranges,
+                                    [columnar] * len(ranges)))
+
+    if columnar:
+        # concatenate the tables in file order and sort them stable
+        alerts_validated = AlertTable()
+        for alerts, _ in results:
+            alerts_validated.extend(alerts)
+        alerts_validated.sort()
+    else:
+        # every range is sorted already, merge them (ties keep the file order like the stable sort)
+        alerts_validated = list(heapq.merge(*[alerts for alerts, _ in results],
+                                            key=lambda x: x.time))
+    num_corrupted = sum(corrupted for _, corrupted in results)
+
+    print('[*] Importing alerts successful (' + str(len(alerts_validated)) + ' successful / ' + str(
+        num_corrupted) + ' ignored)')
+    return alerts_validated
+
+
+def split_byte_ranges(mm, parts, start=0, end=None):
+    """
+    Split a memory-mapped log file into (nearly) equal byte ranges which start with a [**] header
+    :param mm: memory-mapped log file
+    :param parts: number of wanted ranges
+    :param start: first byte of the part of the file to split (start of an alert block)
+    :param end: end of the part of the file to split (default: end of the file)
+    :return: list of (start, end) tuples (less than parts if the file has too few alerts)
+    """
+    size = len(mm) if end is None else end
+    bounds = [start]
+    for i in range(1, parts):
+        # next alert header after the naive split position
+        pos = mm.find(b'\n[**]', max(start + (size - start) * i // parts, bounds[-1]), size)
+        if pos == -1:
+            break
+        if pos + 1 > bounds[-1]:
+            bounds.append(pos + 1)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def import_byte_range(file_path, byte_range, columnar=False):
+    """
+    Worker of import_alerts_parallel: parse all alerts in the given byte range of the log file
+    :param file_path: file path of the Snort log file (alert)
+    :param byte_range: (start, end) tuple
+    :param columnar: collect the alerts in an AlertTable
+    :return: tuple of the sorted validated alerts (list or AlertTable) and the number of corrupted alerts
+    """
+    start, end = byte_range
+    with open(file_path, 'rb') as current:
+        with mmap.mmap(current.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # decode like open(file_path, 'r') does (locale encoding, universal newlines)
+            text = mm[start:end].decode(locale.getpreferredencoding(False))
+
+    alerts_validated = AlertTable() if columnar else []
+    num_corrupted = 0
+    year = str(datetime.datetime.now().year)
+    for alert in split_alert_blocks(io.StringIO(text, newline=None)):
+        alert_obj = parse_alert(alert, year)
+        if alert_obj.validate() and add_alert(alerts_validated, alert_obj):
+            continue
+        num_corrupted += 1
+
+    if columnar:
+        alerts_validated.sort()
+    else:
+        alerts_validated.sort(key=lambda x: x.time)
+    return alerts_validated, num_corrupted
+
+
 def calculate_time_ranges(imported, intv=5):
     """
     calculates intv time ranges (steps)
     :param imported: validated alerts (list of alert objects)
     :return: list with timestamps
     """
-    start = datetime.datetime.strptime(imported[0].timestamp, "%Y/%m/%d-%H:%M:%S.%f")
-    end = datetime.datetime.strptime(imported[len(imported) - 1].timestamp, "%Y/%m/%d-%H:%M:%S.%f")
+    start = timestamp_to_datetime(imported[0].time)
+    end = timestamp_to_datetime(imported[len(imported) - 1].time)
     diff = (end - start) / intv
     result = []
     for i in range(intv - 1):
@@ -154,26 +779,26 @@ def generate_nodes_and_edges(alerts_validated, time_ranges=None):
     generates nodes and edges from the alert objects and returns one or a list of nodes and edges
     :param alerts_validated: list of alert objects
     :param time_ranges: if existing: time ranges/steps to which the nodes and edges need to be divided
-    :return: a list of nodes and a list of edges (no time ranges) OR a list of dicts of nodes and a list of dicts of edges (according to the time ranges)
+    :return: a list of nodes and a list of edges (no time ranges) OR a list of DataFrames of nodes and a list of DataFrames of edges (according to the time ranges, rebuilt lazily from deltas)
     """
     print('[*] Start generating nodes and edges')
-    all_nodes = []
-    all_edges = []
-    nodes_list = []
-    edges_list = []
+    graph = GraphAggregator(track_changes=bool(time_ranges))
+    all_nodes = graph.nodes
+    all_edges = graph.edges
+    snapshots = TimeRangeSnapshots()
     i = 0
+    if time_ranges:
+        # compare integer timestamps instead of datetimes
+        time_ranges = [datetime_to_timestamp(time) for time in time_ranges]
 
     for alert_obj in alerts_validated:
         if time_ranges:
-            current_alert_time = datetime.datetime.strptime(alert_obj.timestamp, "%Y/%m/%d-%H:%M:%S.%f")
+            current_alert_time = alert_obj.time
 
             if current_alert_time > time_ranges[i]:
                 # current alert exceeds the current time range
-                # copy/save all nodes & edges until now
-                cur_nodes_dict = pd.DataFrame.from_records(node.to_dict() for node in copy.deepcopy(all_nodes))
-                cur_edges_dict = pd.DataFrame.from_records(edge.to_dict() for edge in copy.deepcopy(all_edges))
-                nodes_list.append(cur_nodes_dict)
-                edges_list.append(cur_edges_dict)
+                # save the changes of all nodes & edges since the last time range
+                snapshots.checkpoint(graph)
                 i = i + 1
 
                 # move current alert to the right time range
@@ -181,91 +806,345 @@ def generate_nodes_and_edges(alerts_validated, time_ranges=None):
                 for x in range(i, len(time_ranges) - 1):
                     if current_alert_time > time_ranges[i]:
                         # current alert exceeds the current time range
-                        # copy/save all nodes & edges until now
-                        cur_nodes_dict = pd.DataFrame.from_records(node.to_dict() for node in copy.deepcopy(all_nodes))
-                        cur_edges_dict = pd.DataFrame.from_records(edge.to_dict() for edge in copy.deepcopy(all_edges))
-                        nodes_list.append(cur_nodes_dict)
-                        edges_list.append(cur_edges_dict)
+                        # nothing changed since the last time range (empty delta)
+                        snapshots.checkpoint(graph)
                         i = i + 1
 
-        # NODE
-        # check if node already exists and update type
-        # check From IP
-        existing_node, index = find_node_by_ip(all_nodes, alert_obj.from_ip)
-        if existing_node:
-            if existing_node.get_type() == TYPE_VICTIM:
-                existing_node.set_type(TYPE_COMPROMISED)
-            if alert_obj.from_port:
-                existing_node.add_port_out(alert_obj.from_port)
-            all_nodes[index] = existing_node
-        else:
-            # create new node
-            new_node = Node(alert_obj.from_ip, TYPE_ATTACKER)
-            if alert_obj.from_port:
-                new_node.add_port_out(alert_obj.from_port)
-            all_nodes.append(new_node)
-
-        # check To IP
-        existing_node, index = find_node_by_ip(all_nodes, alert_obj.to_ip)
-        if existing_node:
-            if alert_obj.to_port:
-                existing_node.add_port_in(alert_obj.to_port)
-            all_nodes[index] = existing_node
-        else:
-            # create new node
-            new_node = Node(alert_obj.to_ip, TYPE_VICTIM)
-            if alert_obj.to_port:
-                new_node.add_port_in(alert_obj.to_port)
-            all_nodes.append(new_node)
-
-        # EDGE
-        # check if edge already exists
-        flag = False
-        for index, edge in enumerate(all_edges):
-            # compare with each edge and check if there exists already the same type
-            if edge.compare_with_alert(alert_obj):
-                edge.merge_with_alert(alert_obj)
-                all_edges[index] = edge
-                flag = True
-
-        if not flag:
-            new_edge = Edge([alert_obj.name], [alert_obj.classification], [alert_obj.priority], alert_obj.from_ip,
-                            alert_obj.to_ip, [0], [alert_obj.from_port], [alert_obj.to_port], [alert_obj.timestamp],
-                            [alert_obj.additional])
-            all_edges.append(new_edge)
-
-    cur_nodes_dict = pd.DataFrame.from_records(node.to_dict() for node in copy.deepcopy(all_nodes))
-    cur_edges_dict = pd.DataFrame.from_records(edge.to_dict() for edge in copy.deepcopy(all_edges))
-
-    nodes_list.append(cur_nodes_dict)
-    edges_list.append(cur_edges_dict)
+        # merge alert into the nodes and edges (hash indexes, O(1) per alert)
+        graph.add_alert(alert_obj)
 
     print('[*] Nodes and Edges successfully generated')
     if time_ranges:
-        return nodes_list, edges_list
+        # last time range contains all nodes & edges
+        snapshots.checkpoint(graph)
+        return snapshots.nodes, snapshots.edges
     else:
         return all_nodes, all_edges
 
 
+def generate_nodes_and_edges_vectorized(alerts_validated, time_ranges=None):
+    """
+    generates nodes and edges like generate_nodes_and_edges, but with group-bys on the alert columns
+    instead of a python loop over all alerts (vectorized engine)
+    :param alerts_validated: AlertTable (or list of alert objects, which will be converted) sorted by timestamp
+    :param time_ranges: if existing: time ranges/steps to which the nodes and edges need to be divided
+    :return: DataFrame of nodes and DataFrame of edges (no time ranges) OR a list of DataFrames of nodes and a list of DataFrames of edges (according to the time ranges)
+    """
+    print('[*] Start generating nodes and edges (vectorized)')
+    table = alerts_validated
+    if not isinstance(table, AlertTable):
+        table = AlertTable()
+        for alert_obj in alerts_validated:
+            add_alert(table, alert_obj)
+    columns = table.columns()
+
+    if not time_ranges:
+        nodes, edges = aggregate_alert_columns(table, columns)
+        print('[*] Nodes and Edges successfully generated')
+        return nodes, edges
+
+    # same snapshots as the loop: one for every crossed time range and one with all alerts
+    ends = []
+    for time in time_ranges[:-1]:
+        time = datetime_to_timestamp(time)
+        if len(table) and time < columns['time'][-1]:
+            ends.append(int(np.searchsorted(columns['time'], time, side='right')))
+    ends.append(len(table))
+
+    nodes_list = []
+    edges_list = []
+    for end in ends:
+        nodes, edges = aggregate_alert_columns(table, {key: column[:end] for key, column in columns.items()})
+        nodes_list.append(nodes)
+        edges_list.append(edges)
+
+    print('[*] Nodes and Edges successfully generated')
+    return nodes_list, edges_list
+
+
+def aggregate_alert_columns(table, columns):
+    """
+    computes the nodes and edges DataFrames (same schema as Node.to_dict / Edge.to_dict) with group-bys
+    all groups are numbered in order of appearance (pd.factorize), so the order matches the loop engine
+    :param table: AlertTable (dictionaries of the encoded strings)
+    :param columns: dict of numpy arrays (columns of the alerts in the order of processing)
+    :return: DataFrame of nodes and DataFrame of edges
+    """
+    num_alerts = len(columns['time'])
+    if num_alerts == 0:
+        return pd.DataFrame(columns=NODE_COLUMNS), pd.DataFrame(columns=EDGE_COLUMNS)
+    has_ports = columns['has_ports'] == 1
+    from_ip, to_ip, from_port, to_port, ip_strings, port_strings = alert_keys(table, columns)
+
+    # NODES
+    # every alert has two roles, the From IP is processed before the To IP
+    roles = np.empty(2 * num_alerts, dtype=np.int64)
+    roles[0::2] = from_ip
+    roles[1::2] = to_ip
+    node_codes, node_ips = pd.factorize(roles)
+    from_nodes = node_codes[0::2]
+    to_nodes = node_codes[1::2]
+    num_nodes = len(node_ips)
+
+    # first appearance as From IP -> Attacker, only To IP -> Victim, To IP before From IP -> Compromised
+    first_from = first_occurrence(from_nodes, num_nodes, num_alerts)
+    first_to = first_occurrence(to_nodes, num_nodes, num_alerts)
+    node_type = np.where(first_from <= first_to, TYPE_ATTACKER,
+                         np.where(first_from == num_alerts, TYPE_VICTIM, TYPE_COMPROMISED))
+    node_ip_strings = np.array([int_to_ip(ip) if ip < IP_KEYS else ip_strings[ip - IP_KEYS]
+                                for ip in node_ips.tolist()], dtype=object)
+
+    nodes = pd.DataFrame({
+        'IP': node_ip_strings,
+        'Type': node_type,
+        'Ports in': group_unique_values(to_nodes[has_ports], to_port[has_ports], num_nodes, port_strings),
+        'Ports out': group_unique_values(from_nodes[has_ports], from_port[has_ports], num_nodes, port_strings),
+    })
+
+    # EDGES
+    # group by unordered IP pair (node codes), the first alert defines From IP and To IP of the edge
+    low = np.minimum(from_nodes, to_nodes).astype(np.int64)
+    high = np.maximum(from_nodes, to_nodes).astype(np.int64)
+    edge_codes, _ = pd.factorize(low * num_nodes + high)
+    num_edges = edge_codes.max() + 1
+    edge_first = first_occurrence(edge_codes, num_edges, num_alerts)
+    direction = (from_nodes != from_nodes[edge_first][edge_codes]).astype(np.int64)
+
+    # attacks of an edge: group by signature and direction
+    attack_key = ((edge_codes.astype(np.int64) * 2 + direction) << 31) | columns['name'].astype(np.int64)
+    attack_codes, _ = pd.factorize(attack_key)
+    num_attacks = attack_codes.max() + 1
+    attack_first = first_occurrence(attack_codes, num_attacks, num_alerts)
+    attack_count = np.bincount(attack_codes, minlength=num_attacks)
+
+    # first and last (new) timestamp of every attack
+    new_time = ~pd.DataFrame({'attack': attack_codes, 'time': columns['time']}).duplicated().to_numpy()
+    new_rows = np.flatnonzero(new_time)
+    attack_last = new_rows[::-1][np.unique(attack_codes[new_rows[::-1]], return_index=True)[1]]
+    first_time = format_timestamps(columns['time'][attack_first])
+    last_time = format_timestamps(columns['time'][attack_last])
+    timestamps = [first + " --- " + last for first, last in zip(first_time, last_time)]
+
+    attacks = {
+        'Attack Name': np.array(table.names, dtype=object)[columns['name'][attack_first]],
+        'Classification': np.array(table.classifications, dtype=object)[columns['classification'][attack_first]],
+        'Priority': np.array([str(priority) for priority in range(256)], dtype=object)[
+            columns['priority'][attack_first]],
+        'Attack Direction': direction[attack_first],
+        'From Ports': np.array(group_unique_values(attack_codes, from_port, num_attacks, port_strings) + [None],
+                               dtype=object)[:-1],
+        'To Ports': np.array(group_unique_values(attack_codes, to_port, num_attacks, port_strings) + [None],
+                             dtype=object)[:-1],
+        'Timestamps': np.array(timestamps, dtype=object),
+        'Count': attack_count,
+        'Additional': np.array(group_unique_values(attack_codes, columns['additional'].astype(np.int64), num_attacks,
+                                                   np.array(table.additionals, dtype=object)) + [None],
+                               dtype=object)[:-1],
+    }
+
+    # attacks are numbered in order of appearance, sort them by edge (stable)
+    attack_edges = edge_codes[attack_first]
+    order = np.argsort(attack_edges, kind='stable')
+    edge_from_nodes = from_nodes[edge_first]
+    edge_to_nodes = to_nodes[edge_first]
+    edges = {}
+    for column, values in attacks.items():
+        edges[column] = split_groups(attack_edges[order], values[order], num_edges)
+    edges['Weight'] = np.bincount(attack_edges, weights=attack_count, minlength=num_edges).astype(np.int64)
+    edges['From IP'] = node_ip_strings[edge_from_nodes]
+    edges['To IP'] = node_ip_strings[edge_to_nodes]
+    edges = pd.DataFrame(edges)[EDGE_COLUMNS]
+
+    return nodes, edges
+
+
+def alert_keys(table, columns):
+    """
+    addresses and ports of the alerts as integer keys for the group-bys: addresses as their integer value, ports as
+    index in the port strings (0: no port); the addresses and ports the AlertTable keeps as strings (table.raws)
+    get keys after the usual ones
+    :param table: AlertTable (strings of the alerts not in their usual form)
+    :param columns: dict of numpy arrays (columns of the alerts)
+    :return: tuple of the from IP, to IP, from port and to port keys (int64 arrays), the IP strings of the keys from
+    IP_KEYS on (list) and the port strings of all port keys (array)
+    """
+    has_ports = columns['has_ports'] == 1
+    from_ip = columns['from_ip'].astype(np.int64)
+    to_ip = columns['to_ip'].astype(np.int64)
+    from_port = np.where(has_ports, columns['from_port'].astype(np.int64) + 1, 0)
+    to_port = np.where(has_ports, columns['to_port'].astype(np.int64) + 1, 0)
+    port_strings = [''] + [str(port) for port in range(65536)]
+    ip_strings = []
+    rows = np.flatnonzero(columns['raw'])
+    if len(rows):
+        # few alerts, keyed one by one
+        ip_keys = {}
+        port_keys = {}
+
+        def ip_key(ip):
+            key = ip_code(ip)
+            if key is None:
+                key = ip_keys.get(ip)
+                if key is None:
+                    key = ip_keys[ip] = IP_KEYS + len(ip_strings)
+                    ip_strings.append(ip)
+            return key
+
+        def port_key(port):
+            if not port:
+                return 0
+            key = port_code(port)
+            if key is not None:
+                return key + 1
+            key = port_keys.get(port)
+            if key is None:
+                key = port_keys[port] = len(port_strings)
+                port_strings.append(port)
+            return key
+
+        for row, raw_code in zip(rows.tolist(), columns['raw'][rows].tolist()):
+            raw = table.raws[raw_code]
+            from_ip[row] = ip_key(raw[0])
+            to_ip[row] = ip_key(raw[1])
+            from_port[row] = port_key(raw[2])
+            to_port[row] = port_key(raw[3])
+    return from_ip, to_ip, from_port, to_port, ip_strings, np.array(port_strings, dtype=object)
+
+
+def first_occurrence(codes, num_groups, missing):
+    """index of the first row of every group (missing if the group does not occur)"""
+    first = np.full(num_groups, missing, dtype=np.int64)
+    groups, index = np.unique(codes, return_index=True)
+    first[groups] = index
+    return first
+
+
+def group_unique_values(codes, values, num_groups, strings):
+    """
+    list of unique values (in order of appearance) for every group
+    :param codes: group of every row (int array)
+    :param values: value of every row (int array, index in strings)
+    :param num_groups: number of groups
+    :param strings: values as strings (array)
+    :return: list with one list of strings per group
+    """
+    unique = ~pd.DataFrame({'group': codes, 'value': values}).duplicated().to_numpy()
+    codes = codes[unique]
+    order = np.argsort(codes, kind='stable')
+    return split_groups(codes[order], strings[values[unique][order]], num_groups)
+
+
+def split_groups(sorted_codes, values, num_groups):
+    """split values (sorted by group) into one python list per group"""
+    bounds = np.searchsorted(sorted_codes, np.arange(num_groups + 1)).tolist()
+    values = values.tolist()
+    return [values[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def format_timestamps(times):
+    """formats an array of timestamps (microseconds since EPOCH) in TIMESTAMP_FORMAT (faster than strftime)"""
+    days, microseconds = np.divmod(np.asarray(times, dtype=np.int64), 86400 * 1000000)
+    seconds, microseconds = np.divmod(microseconds, 1000000)
+    minutes, seconds = np.divmod(seconds, 60)
+    hours, minutes = np.divmod(minutes, 60)
+    dates = {day: timestamp_to_datetime(day * 86400 * 1000000).strftime('%Y/%m/%d') for day in np.unique(days).tolist()}
+    return [dates[day] + '-%02d:%02d:%02d.%06d' % (hour, minute, second, microsecond)
+            for day, hour, minute, second, microsecond in zip(days.tolist(), hours.tolist(), minutes.tolist(),
+                                                              seconds.tolist(), microseconds.tolist())]
+
+
 def export_to_csv(nodes, edges):
     """
     generates a csv file and saves under fix name
-    :param nodes: list of nodes
-    :param edges: list of edges
+    :param nodes: list of nodes (or DataFrame of the vectorized engine)
+    :param edges: list of edges (or DataFrame of the vectorized engine)
     :return: nothing
     """
     print('[*] Start exporting to csv (nodes.csv, edges.csv in root folder)')
 
-    df_n = pd.DataFrame.from_records(node.to_dict() for node in nodes)
+    df_n = nodes if isinstance(nodes, pd.DataFrame) else pd.DataFrame.from_records(node.to_dict() for node in nodes)
     df_n.to_csv('nodes.csv', index=False)
 
-    df_e = pd.DataFrame.from_records(edge.to_dict() for edge in edges)
+    df_e = edges if isinstance(edges, pd.DataFrame) else pd.DataFrame.from_records(edge.to_dict() for edge in edges)
     df_e.to_csv('edges.csv', index=False)
 
     print('[*] csv successfully exported')
     return 'nodes.csv', 'edges.csv'
 
 
+def import_from_csv(nodes_file, edges_file):
+    """
+    reads the nodes and edges of csv files (export_to_csv)
+    :param nodes_file: path to the csv file of the nodes
+    :param edges_file: path to the csv file of the edges
+    :return: tuple of the nodes and edges DataFrames (lists as real lists)
+    """
+    nodes = pd.read_csv(nodes_file)
+    edges = pd.read_csv(edges_file)
+
+    # convert string values to real lists
+    for column in ('Ports in', 'Ports out'):
+        nodes[column] = nodes[column].apply(ast.literal_eval)
+    for column in ('Attack Name', 'Classification', 'Priority', 'From Ports', 'To Ports', 'Timestamps', 'Count',
+                   'Additional'):
+        edges[column] = edges[column].apply(ast.literal_eval)
+    return nodes, edges
+
+
+def export_nodes_and_edges(nodes, edges, file_format='csv'):
+    """
+    generates the files of the nodes and edges in the given format and saves them under fix names
+    (nodes.<format>, edges.<format> in root folder), parquet and feather keep the lists as list columns
+    :param nodes: list of nodes (or DataFrame of the vectorized engine)
+    :param edges: list of edges (or DataFrame of the vectorized engine)
+    :param file_format: one of EXPORT_FORMATS
+    :return: tuple of the file names of the nodes and edges
+    """
+    if file_format == 'csv':
+        return export_to_csv(nodes, edges)
+    nodes_file, edges_file = 'nodes.' + file_format, 'edges.' + file_format
+    print('[*] Start exporting to ' + file_format + ' (' + nodes_file + ', ' + edges_file + ' in root folder)')
+
+    df_n = nodes if isinstance(nodes, pd.DataFrame) else pd.DataFrame.from_records(node.to_dict() for node in nodes)
+    df_e = edges if isinstance(edges, pd.DataFrame) else pd.DataFrame.from_records(edge.to_dict() for edge in edges)
+    for df, file_name in ((df_n, nodes_file), (df_e, edges_file)):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if file_format == 'parquet':
+            parquet.write_table(table, file_name)
+        else:
+            feather.write_feather(table, file_name)
+
+    print('[*] ' + file_format + ' successfully exported')
+    return nodes_file, edges_file
+
+
+def import_nodes_and_edges(nodes_file, edges_file, file_format='csv'):
+    """
+    reads the nodes and edges of files in the given format (export_nodes_and_edges)
+    :param nodes_file: path to the file of the nodes
+    :param edges_file: path to the file of the edges
+    :param file_format: one of EXPORT_FORMATS
+    :return: tuple of the nodes and edges DataFrames (lists as real lists)
+    """
+    if file_format == 'csv':
+        return import_from_csv(nodes_file, edges_file)
+    frames = []
+    for file_name in (nodes_file, edges_file):
+        if file_format == 'parquet':
+            table = parquet.read_table(file_name)
+        else:
+            table = feather.read_table(file_name)
+        columns = {}
+        for name, column in zip(table.column_names, table.columns):
+            if pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+                # python lists (pandas would give numpy arrays)
+                columns[name] = pd.Series(column.to_pylist(), dtype=object)
+            else:
+                columns[name] = column.to_pandas()
+        frames.append(pd.DataFrame(columns))
+    return frames[0], frames[1]
+
+
 def scale_in_range(x, min_before, max_before, min_after=1, max_after=10):
     """converts values in the range [min_before,max_before] to values in the range [min_after,max_after]"""
     return float(min_after + float(x - min_before) * float(max_after - min_after) / (max_before - min_before))
@@ -302,16 +1181,15 @@ class Node:
     def __init__(self, ip_address, type):
         self.ip = ip_address
         self.type = type  # 1: Attacker, 2: Victim, 3: Compromised
-        self.ports_in = []
-        self.ports_out = []
+        # dicts as ordered sets (keys only) for O(1) lookups
+        self.ports_in = {}
+        self.ports_out = {}
 
     def add_port_in(self, port):
-        if port not in self.ports_in:
-            self.ports_in.append(port)
+        self.ports_in[port] = None
 
     def add_port_out(self, port):
-        if port not in self.ports_out:
-            self.ports_out.append(port)
+        self.ports_out[port] = None
 
     def get_type(self):
         return self.type
@@ -323,14 +1201,14 @@ class Node:
         return {
             'IP': self.ip,
             'Type': self.type,
-            'Ports in': self.ports_in,
-            'Ports out': self.ports_out,
+            'Ports in': list(self.ports_in),
+            'Ports out': list(self.ports_out),
         }
 
 
 class Edge:
     # parameterized constructor
-    def __init__(self, attack_names, classifications, priorities, from_ip, to_ip, directions, from_ports, to_ports, timestamps,
+    def __init__(self, attack_names, classifications, priorities, from_ip, to_ip, directions, from_ports, to_ports, times,
                  additional):
         self.attack_names = attack_names
         self.classifications = classifications
@@ -340,19 +1218,25 @@ class Edge:
         self.directions = directions
         self.number_alerts = [1]  # number of alerts per attack
 
+        # per attack: dicts as ordered sets (keys only) for O(1) lookups
         self.from_ports = []
         if from_ports:
-            self.from_ports.append(from_ports)
+            self.from_ports.append(dict.fromkeys(from_ports))
         self.to_ports = []
         if to_ports:
-            self.to_ports.append(to_ports)
-        self.timestamps = []
-        self.timestamps.append(timestamps)
+            self.to_ports.append(dict.fromkeys(to_ports))
+        # per attack: first and last timestamp (microseconds since EPOCH), not every timestamp
+        self.first_times = list(times)
+        self.last_times = list(times)
         self.additional = []
         if additional:
-            self.additional.append(additional)
+            self.additional.append(dict.fromkeys(additional))
         self.weight = 1  # sum of all alerts related to this edge
 
+        # (attack name, direction) -> index of the attack
+        self.attack_index = {(attack_name, direction): index
+                             for index, (attack_name, direction) in enumerate(zip(attack_names, directions))}
+
     def update_weight(self, min_number_alerts, max_number_alerts):
         """update the weight (width of the edge) corresponding to the number of alerts and scale limit"""
         self.weight = scale_in_range(self.number_alerts, min_number_alerts, max_number_alerts,
@@ -383,22 +1267,17 @@ class Edge:
             direction = 0
         else:
             direction = 1
-        for index, attack_name in enumerate(self.attack_names):
-            if attack_name == alert.name:
-                if self.directions[index] == direction:
-                    return index
-        return None
+        return self.attack_index.get((alert.name, direction))
 
     def merge_alert_with_attack(self, index, alert):
         """add all alert information to the corresponding attack in the edge (at index)"""
-        if alert.from_port not in self.from_ports[index]:
-            self.from_ports[index].append(alert.from_port)
-        if alert.to_port not in self.to_ports[index]:
-            self.to_ports[index].append(alert.to_port)
-        if alert.additional not in self.additional[index]:
-            self.additional[index].append(alert.additional)
-        if alert.timestamp not in self.timestamps[index]:
-            self.timestamps[index].append(alert.timestamp)
+        self.from_ports[index][alert.from_port] = None
+        self.to_ports[index][alert.to_port] = None
+        self.additional[index][alert.additional] = None
+        if alert.time < self.first_times[index]:
+            self.first_times[index] = alert.time
+        if alert.time > self.last_times[index]:
+            self.last_times[index] = alert.time
         self.number_alerts[index] += 1  # increase number of this alert
         self.weight += 1  # increase sum of alerts related to the current edge
 
@@ -408,14 +1287,16 @@ class Edge:
         else:
             direction = 1
         """add new attack in edge (new index)"""
+        self.attack_index[(alert.name, direction)] = len(self.attack_names)
         self.attack_names.append(alert.name)
         self.classifications.append(alert.classification)
         self.priorities.append(alert.priority)
         self.directions.append(direction)
-        self.from_ports.append([alert.from_port])
-        self.to_ports.append([alert.to_port])
-        self.timestamps.append([alert.timestamp])
-        self.additional.append([alert.additional])
+        self.from_ports.append({alert.from_port: None})
+        self.to_ports.append({alert.to_port: None})
+        self.first_times.append(alert.time)
+        self.last_times.append(alert.time)
+        self.additional.append({alert.additional: None})
         self.number_alerts.append(1)
         self.weight += 1
 
@@ -427,8 +1308,8 @@ class Edge:
         #         self.timestamps[index] = timestamps[:10]
 
         # Update: just take first and last timestamp
-        for index, timestamps in enumerate(self.timestamps):
-            self.timestamps[index] = str(timestamps[0]) + " --- " + str(timestamps[-1])
+        timestamps = [format_timestamp(first) + " --- " + format_timestamp(last)
+                      for first, last in zip(self.first_times, self.last_times)]
         return {
             'Attack Name': self.attack_names,
             'Classification': self.classifications,
@@ -436,10 +1317,780 @@ class Edge:
             'From IP': self.from_ip,
             'To IP': self.to_ip,
             'Attack Direction': self.directions,
-            'From Ports': self.from_ports,
-            'To Ports': self.to_ports,
-            'Timestamps': self.timestamps,
+            'From Ports': [list(ports) for ports in self.from_ports],
+            'To Ports': [list(ports) for ports in self.to_ports],
+            'Timestamps': timestamps,
             'Count': self.number_alerts,
             'Weight': self.weight,
-            'Additional': self.additional,
+            'Additional': [list(additional) for additional in self.additional],
+        }
+
+
+class GraphAggregator:
+    """
+    aggregates alerts to nodes and edges
+    hash indexes (IP -> node, unordered IP pair -> edge) merge every alert in O(1)
+    """
+
+    def __init__(self, track_changes=False):
+        self.nodes = []  # in order of appearance
+        self.edges = []  # in order of appearance
+        self.node_index = {}  # IP -> node
+        self.edge_index = {}  # (IP, IP) sorted -> edge
+
+        # if tracked: nodes and edges changed since the last TimeRangeSnapshots.checkpoint (in order of change)
+        self.changed_nodes = {} if track_changes else None  # IP -> node
+        self.changed_edges = {} if track_changes else None  # (IP, IP) sorted -> edge
+
+    def add_alert(self, alert_obj):
+        """merge a validated alert into the nodes and edges"""
+        # NODE
+        # check if node already exists and update type
+        # check From IP
+        existing_node = self.node_index.get(alert_obj.from_ip)
+        if existing_node:
+            if existing_node.get_type() == TYPE_VICTIM:
+                existing_node.set_type(TYPE_COMPROMISED)
+            if alert_obj.from_port:
+                existing_node.add_port_out(alert_obj.from_port)
+        else:
+            # create new node
+            new_node = Node(alert_obj.from_ip, TYPE_ATTACKER)
+            if alert_obj.from_port:
+                new_node.add_port_out(alert_obj.from_port)
+            self.add_node(new_node)
+
+        # check To IP
+        existing_node = self.node_index.get(alert_obj.to_ip)
+        if existing_node:
+            if alert_obj.to_port:
+                existing_node.add_port_in(alert_obj.to_port)
+        else:
+            # create new node
+            new_node = Node(alert_obj.to_ip, TYPE_VICTIM)
+            if alert_obj.to_port:
+                new_node.add_port_in(alert_obj.to_port)
+            self.add_node(new_node)
+
+        # EDGE
+        # check if edge already exists (same IPs in any direction)
+        key = ip_pair(alert_obj.from_ip, alert_obj.to_ip)
+        existing_edge = self.edge_index.get(key)
+        if existing_edge:
+            existing_edge.merge_with_alert(alert_obj)
+        else:
+            existing_edge = Edge([alert_obj.name], [alert_obj.classification], [alert_obj.priority], alert_obj.from_ip,
+                                 alert_obj.to_ip, [0], [alert_obj.from_port], [alert_obj.to_port],
+                                 [alert_obj.time], [alert_obj.additional])
+            self.add_edge(existing_edge)
+
+        if self.changed_nodes is not None:
+            self.changed_nodes[alert_obj.from_ip] = self.node_index[alert_obj.from_ip]
+            self.changed_nodes[alert_obj.to_ip] = self.node_index[alert_obj.to_ip]
+            self.changed_edges[key] = existing_edge
+
+    def add_node(self, node):
+        self.nodes.append(node)
+        self.node_index[node.ip] = node
+
+    def add_edge(self, edge):
+        self.edges.append(edge)
+        self.edge_index[ip_pair(edge.from_ip, edge.to_ip)] = edge
+
+
+class TimeRangeSnapshots:
+    """
+    cumulative snapshots of the nodes and edges at the end of every time range, stored as deltas
+    (new nodes, type changes, new ports, new edges and attacks, count increments) instead of copies of the graph
+    a snapshot is rebuilt from the deltas when it is requested and kept in a LRU cache
+    self.nodes and self.edges can be indexed like the former lists of DataFrames
+    """
+
+    def __init__(self, cache_size=SNAPSHOT_CACHE_SIZE):
+        self.deltas = []  # one (node deltas, edge deltas) tuple per time range
+        self.node_marks = {}  # IP -> (type, number of ports in, number of ports out) at the last checkpoint
+        self.edge_marks = {}  # (IP, IP) sorted -> list of (count, number of from ports, to ports, additional) per attack
+        self.cache = LRUCache(cache_size)
+        self.nodes = SnapshotList(self, 0)
+        self.edges = SnapshotList(self, 1)
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def checkpoint(self, graph):
+        """end the current time range: store the changes of the graph since the last checkpoint"""
+        node_deltas = []
+        for ip, node in graph.changed_nodes.items():
+            # (IP, new type or None, new ports in, new ports out)
+            mark = self.node_marks.get(ip)
+            if mark is None:
+                node_deltas.append((ip, node.type, list(node.ports_in), list(node.ports_out)))
+            else:
+                node_deltas.append((ip, node.type if node.type != mark[0] else None,
+                                    list(itertools.islice(node.ports_in, mark[1], None)),
+                                    list(itertools.islice(node.ports_out, mark[2], None))))
+            self.node_marks[ip] = (node.type, len(node.ports_in), len(node.ports_out))
+
+        edge_deltas = []
+        for key, edge in graph.changed_edges.items():
+            marks = self.edge_marks.get(key, [])
+            attack_deltas = []
+            for index in range(len(edge.attack_names)):
+                count = edge.number_alerts[index]
+                last_timestamp = edge.last_times[index]
+                if index < len(marks):
+                    # (index, None, count increment, new from ports, new to ports, new additional, last timestamp)
+                    old_count, num_from_ports, num_to_ports, num_additional = marks[index]
+                    if count == old_count:
+                        continue
+                    attack_deltas.append((index, None, count - old_count,
+                                          list(itertools.islice(edge.from_ports[index], num_from_ports, None)),
+                                          list(itertools.islice(edge.to_ports[index], num_to_ports, None)),
+                                          list(itertools.islice(edge.additional[index], num_additional, None)),
+                                          last_timestamp))
+                else:
+                    # new attack: (index, (name, classification, priority, direction, first timestamp), count, ...)
+                    attack_deltas.append((index, (edge.attack_names[index], edge.classifications[index],
+                                                  edge.priorities[index], edge.directions[index],
+                                                  edge.first_times[index]),
+                                          count, list(edge.from_ports[index]), list(edge.to_ports[index]),
+                                          list(edge.additional[index]), last_timestamp))
+            self.edge_marks[key] = [(edge.number_alerts[index], len(edge.from_ports[index]),
+                                     len(edge.to_ports[index]), len(edge.additional[index]))
+                                    for index in range(len(edge.attack_names))]
+            edge_deltas.append((key, edge.from_ip, edge.to_ip, attack_deltas))
+
+        graph.changed_nodes.clear()
+        graph.changed_edges.clear()
+        self.deltas.append((node_deltas, edge_deltas))
+
+    def get(self, index):
+        """return the snapshot (DataFrame of nodes, DataFrame of edges) at the end of the time range index"""
+        if index < 0:
+            index += len(self.deltas)
+        if not 0 <= index < len(self.deltas):
+            raise IndexError('time range index out of range')
+        snapshot = self.cache.get(index)
+        if snapshot is None:
+            snapshot = self.rebuild(index)
+            self.cache.put(index, snapshot)
+        return snapshot
+
+    def rebuild(self, index):
+        """apply the deltas of the time ranges 0 to index and build the DataFrames"""
+        nodes = {}  # IP -> [type, ports in, ports out]
+        edges = {}  # (IP, IP) sorted -> (From IP, To IP, list of attacks)
+        for node_deltas, edge_deltas in self.deltas[:index + 1]:
+            for ip, new_type, ports_in, ports_out in node_deltas:
+                node = nodes.get(ip)
+                if node is None:
+                    nodes[ip] = [new_type, list(ports_in), list(ports_out)]
+                else:
+                    if new_type:
+                        node[0] = new_type
+                    node[1].extend(ports_in)
+                    node[2].extend(ports_out)
+            for key, from_ip, to_ip, attack_deltas in edge_deltas:
+                attacks = edges.setdefault(key, (from_ip, to_ip, []))[2]
+                for attack_index, info, count, from_ports, to_ports, additional, last_timestamp in attack_deltas:
+                    if info:
+                        # [name, classification, priority, direction, first timestamp, last timestamp, count, ...]
+                        attacks.append(list(info) + [last_timestamp, count, list(from_ports), list(to_ports),
+                                                     list(additional)])
+                    else:
+                        attack = attacks[attack_index]
+                        attack[5] = last_timestamp
+                        attack[6] += count
+                        attack[7].extend(from_ports)
+                        attack[8].extend(to_ports)
+                        attack[9].extend(additional)
+
+        # first and last timestamps of all attacks formatted at once
+        times = [attack[4] for _, _, attacks in edges.values() for attack in attacks] + \
+                [attack[5] for _, _, attacks in edges.values() for attack in attacks]
+        times = iter(format_timestamps(times))
+        for _, _, attacks in edges.values():
+            for attack in attacks:
+                attack[4] = next(times)
+        for _, _, attacks in edges.values():
+            for attack in attacks:
+                attack[5] = next(times)
+
+        nodes_df = pd.DataFrame.from_records({
+            'IP': ip,
+            'Type': node[0],
+            'Ports in': node[1],
+            'Ports out': node[2],
+        } for ip, node in nodes.items())
+        edges_df = pd.DataFrame.from_records({
+            'Attack Name': [attack[0] for attack in attacks],
+            'Classification': [attack[1] for attack in attacks],
+            'Priority': [attack[2] for attack in attacks],
+            'From IP': from_ip,
+            'To IP': to_ip,
+            'Attack Direction': [attack[3] for attack in attacks],
+            'From Ports': [attack[7] for attack in attacks],
+            'To Ports': [attack[8] for attack in attacks],
+            'Timestamps': [attack[4] + " --- " + attack[5] for attack in attacks],
+            'Count': [attack[6] for attack in attacks],
+            'Weight': sum(attack[6] for attack in attacks),
+            'Additional': [attack[9] for attack in attacks],
+        } for from_ip, to_ip, attacks in edges.values())
+        return nodes_df, edges_df
+
+
+class AlertIndex:
+    """
+    time index over the alerts (sorted AlertTable): the alerts of any [start, end] window are found by
+    binary search on the int64 timestamps and aggregated with the vectorized engine on demand,
+    so no copies of the graph need to be precomputed (results of recent windows are cached)
+    """
+
+    def __init__(self, table, cache_size=SNAPSHOT_CACHE_SIZE):
+        self.table = table
+        self.columns = table.columns()
+        self.times = self.columns['time']
+        self.cache = LRUCache(cache_size)
+
+    def __len__(self):
+        return len(self.times)
+
+    def first_time(self):
+        """timestamp of the first alert (microseconds since EPOCH)"""
+        return int(self.times[0])
+
+    def last_time(self):
+        """timestamp of the last alert (microseconds since EPOCH)"""
+        return int(self.times[-1])
+
+    def find(self, start, end):
+        """return the row range [low, high) of the alerts with start <= timestamp <= end (microseconds since EPOCH)"""
+        low = int(np.searchsorted(self.times, start, side='left'))
+        high = int(np.searchsorted(self.times, end, side='right'))
+        return low, max(low, high)
+
+    def get(self, start, end):
+        """return the nodes and edges (DataFrames) of all alerts in the window [start, end]"""
+        rows = self.find(start, end)
+        snapshot = self.cache.get(rows)
+        if snapshot is None:
+            snapshot = aggregate_alert_columns(self.table, {key: column[rows[0]:rows[1]]
+                                                            for key, column in self.columns.items()})
+            self.cache.put(rows, snapshot)
+        return snapshot
+
+
+class EdgeStore:
+    """
+    edges of one snapshot (DataFrame) looked up by (From IP, To IP): the figure carries only these keys,
+    the attributes of a clicked edge are looked up on the server
+    the attack details (one row per attack) are built for the clicked edge only
+    """
+
+    def __init__(self, edges):
+        self.edges = edges
+
+    def __len__(self):
+        return len(self.edges)
+
+    def row(self, from_ip, to_ip):
+        """return the row of the edge or None if there is no such edge"""
+        # one vectorized comparison per click instead of an index over every edge of the snapshot
+        rows = np.flatnonzero((self.edges['From IP'].to_numpy() == from_ip) &
+                              (self.edges['To IP'].to_numpy() == to_ip))
+        if len(rows) == 0:
+            return None
+        return int(rows[0])
+
+    def get(self, from_ip, to_ip):
+        """return the attributes of the edge as list of (column, value) pairs or None if there is no such edge"""
+        row = self.row(from_ip, to_ip)
+        if row is None:
+            return None
+        return [(column, self.edges[column].iloc[row]) for column in self.edges.columns]
+
+    def attack_rows(self, from_ip, to_ip):
+        """
+        return the attack details of the edge (DataFrame, one row per attack) or None if there is no such edge,
+        all values as strings (lists without brackets and quotes, references as markdown links, IPs in the
+        direction of the attack)
+        """
+        edge = self.get(from_ip, to_ip)
+        if edge is None:
+            return None
+        num_attacks = len(dict(edge)['Attack Name'])
+        columns = {}
+        for column, value in edge:
+            if not isinstance(value, list):
+                # single data like IP or Weight
+                columns[column] = [str(value)] * num_attacks
+            elif column == 'Additional':
+                columns[column] = [markdown_links(item) for item in value[:num_attacks]]
+            else:
+                # list data like attack names or ports: one element per attack
+                columns[column] = [str(item).replace('[', '').replace(']', '').replace('\'', '')
+                                   for item in value[:num_attacks]]
+        if 'Attack Direction' in columns:
+            # swap the IPs where the direction is opposite
+            for index, direction in enumerate(columns['Attack Direction']):
+                if direction == '1':
+                    columns['From IP'][index], columns['To IP'][index] = \
+                        columns['To IP'][index], columns['From IP'][index]
+        return pd.DataFrame(columns, columns=list(self.edges.columns), dtype=object)
+
+
+def markdown_links(references):
+    """
+    clickable markdown links of the references of an attack
+    :param references: list of strings, the links are extracted from the first one
+    :return: string with the markdown links
+    """
+    if len(references) == 0:
+        return ''
+    all_links = re.findall(r'http:.*?\].*?', references[0])
+
+    new = ''
+    for link in all_links:
+        # cut the last character because "]" is still in the string
+        my_link = '[' + link[:-1] + '"](' + link[:-1] + ")"
+        new += '  ' + my_link  # two whitspaces means line break in markdown
+    return new
+
+
+class SlidingWindowGraph:
+    """
+    nodes and edges of the alerts in a sliding time window (end - window, end] (non-cumulative)
+    every node, edge, attack and port keeps reference counts to the alerts in the window:
+    alerts entering or leaving the window update the graph incrementally in O(1) per alert
+    the server only uses get (read-only): every window is built in its own graph, so the result depends on the
+    position of the window only and not on the windows shown before (results of recent windows are cached)
+    """
+
+    def __init__(self, alerts, window, times=None, cache_size=SNAPSHOT_CACHE_SIZE):
+        """
+        :param alerts: validated alerts sorted by timestamp (list of alert objects or AlertTable)
+        :param window: length of the window (microseconds)
+        :param times: timestamps of the alerts (numpy int64 array, computed if not given)
+        :param cache_size: number of windows kept by get
+        """
+        self.alerts = alerts
+        if times is not None:
+            self.times = times
+        elif isinstance(alerts, AlertTable):
+            self.times = alerts.columns()['time']
+        else:
+            self.times = np.fromiter((alert.time for alert in alerts), dtype=np.int64, count=len(alerts))
+        self.window = window
+        self.cache = LRUCache(cache_size)
+        self.tail = 0  # the alerts tail to head - 1 are in the window
+        self.head = 0
+        self.end = None  # end of the current window (microseconds since EPOCH)
+        self.nodes = {}  # IP -> WindowNode
+        self.edges = {}  # (IP, IP) sorted -> WindowEdge
+
+    def __len__(self):
+        """number of alerts in the current window"""
+        return self.head - self.tail
+
+    def first_time(self):
+        """timestamp of the first alert (microseconds since EPOCH)"""
+        return int(self.times[0])
+
+    def last_time(self):
+        """timestamp of the last alert (microseconds since EPOCH)"""
+        return int(self.times[-1])
+
+    def find(self, end, window=None):
+        """
+        return the alert range [tail, head) of the window (end - window, end]
+        :param window: length of the window (microseconds, default: length of this sliding window)
+        """
+        window = self.window if window is None else window
+        tail = int(np.searchsorted(self.times, end - window, side='right'))
+        head = int(np.searchsorted(self.times, end, side='right'))
+        return tail, max(tail, head)
+
+    def get(self, end, window=None):
+        """
+        return the nodes and edges (DataFrames) of the window (end - window, end] without moving this graph
+        (built in a new graph, like moving an empty window to end)
+        :param window: length of the window (microseconds, default: length of this sliding window)
+        """
+        window = self.window if window is None else window
+        rows = self.find(end, window)
+        snapshot = self.cache.get(rows)
+        if snapshot is None:
+            graph = SlidingWindowGraph(self.alerts, window, self.times, cache_size=0)
+            graph.move_to(end)
+            snapshot = graph.snapshot()
+            self.cache.put(rows, snapshot)
+        return snapshot
+
+    def clear(self, position=0):
+        """remove all alerts from the window and continue at the alert index position"""
+        self.nodes.clear()
+        self.edges.clear()
+        self.tail = self.head = position
+
+    def move_to(self, end):
+        """
+        slide the window to (end - window, end]: add the entering and remove the leaving alerts
+        moving backwards (or jumping over a whole window) starts again with an empty window
+        :param end: new end of the window (microseconds since EPOCH)
+        """
+        tail, head = self.find(end)
+        if self.end is not None and end < self.end or tail >= self.head:
+            self.clear(tail)
+        while self.head < head:
+            self.add_alert(self.head)
+            self.head += 1
+        while self.tail < tail:
+            self.remove_alert(self.tail)
+            self.tail += 1
+        self.end = end
+
+    def add_alert(self, sequence):
+        """add the alert with index sequence (the newest alert of the window)"""
+        alert_obj = self.alerts[sequence]
+        # NODE
+        node = self.nodes.get(alert_obj.from_ip)
+        if node is None:
+            node = self.nodes[alert_obj.from_ip] = WindowNode(alert_obj.from_ip)
+        node.from_alerts.append(sequence)
+        if alert_obj.from_port:
+            count_up(node.ports_out, alert_obj.from_port)
+        node.set_type(node.get_type())
+
+        node = self.nodes.get(alert_obj.to_ip)
+        if node is None:
+            node = self.nodes[alert_obj.to_ip] = WindowNode(alert_obj.to_ip)
+        node.to_alerts.append(sequence)
+        if alert_obj.to_port:
+            count_up(node.ports_in, alert_obj.to_port)
+        node.set_type(node.get_type())
+
+        # EDGE
+        key = ip_pair(alert_obj.from_ip, alert_obj.to_ip)
+        edge = self.edges.get(key)
+        if edge is None:
+            edge = self.edges[key] = WindowEdge(key)
+        edge.add_alert(sequence, alert_obj)
+
+    def remove_alert(self, sequence):
+        """remove the alert with index sequence (the oldest alert of the window)"""
+        alert_obj = self.alerts[sequence]
+        # NODE
+        node = self.nodes[alert_obj.from_ip]
+        node.from_alerts.popleft()
+        if alert_obj.from_port:
+            count_down(node.ports_out, alert_obj.from_port)
+        self.update_node(node)
+
+        node = self.nodes[alert_obj.to_ip]
+        node.to_alerts.popleft()
+        if alert_obj.to_port:
+            count_down(node.ports_in, alert_obj.to_port)
+        self.update_node(node)
+
+        # EDGE
+        key = ip_pair(alert_obj.from_ip, alert_obj.to_ip)
+        edge = self.edges[key]
+        edge.remove_alert(alert_obj)
+        if not edge.alerts:
+            del self.edges[key]
+
+    def update_node(self, node):
+        """update the type of a node after an alert left the window (remove the node if unreferenced)"""
+        if node.from_alerts or node.to_alerts:
+            node.set_type(node.get_type())
+        else:
+            del self.nodes[node.ip]
+
+    def snapshot(self):
+        """
+        return the nodes and edges (DataFrames) of the current window
+        nodes, edges and attacks are in order of their first alert in the window (like generate_nodes_and_edges),
+        ports in order of entering the window (a port stays at its position while it is referenced)
+        """
+        if not self.nodes:
+            return pd.DataFrame(columns=NODE_COLUMNS), pd.DataFrame(columns=EDGE_COLUMNS)
+        nodes = sorted(self.nodes.values(), key=WindowNode.first_appearance)
+        edges = sorted(self.edges.values(), key=WindowEdge.first_appearance)
+        return pd.DataFrame.from_records(node.to_dict() for node in nodes), \
+            pd.DataFrame.from_records(edge.to_dict() for edge in edges)
+
+
+class WindowNode(Node):
+    """node of a SlidingWindowGraph: ports are reference counted (port -> number of alerts in the window)"""
+
+    def __init__(self, ip_address):
+        Node.__init__(self, ip_address, TYPE_ATTACKER)
+        # indexes of the alerts in the window with this node as From IP / To IP (oldest first)
+        self.from_alerts = deque()
+        self.to_alerts = deque()
+
+    def get_type(self):
+        """type according to the alerts in the window (first appearance as From IP -> Attacker, ...)"""
+        if not self.to_alerts or self.from_alerts and self.from_alerts[0] <= self.to_alerts[0]:
+            return TYPE_ATTACKER
+        if self.from_alerts:
+            return TYPE_COMPROMISED
+        return TYPE_VICTIM
+
+    def first_appearance(self):
+        """sort key: index of the first alert in the window (From IP before To IP)"""
+        if not self.to_alerts or self.from_alerts and self.from_alerts[0] <= self.to_alerts[0]:
+            return self.from_alerts[0], 0
+        return self.to_alerts[0], 1
+
+
+class WindowEdge:
+    """edge of a SlidingWindowGraph: attacks keep the alerts in the window, ports are reference counted"""
+
+    def __init__(self, key):
+        self.key = key  # (IP, IP) sorted
+        self.alerts = deque()  # (index, From IP) of the alerts in the window (oldest first)
+        self.attacks = {}  # (attack name, From IP) -> WindowAttack
+
+    def add_alert(self, sequence, alert_obj):
+        self.alerts.append((sequence, alert_obj.from_ip))
+        attack = self.attacks.get((alert_obj.name, alert_obj.from_ip))
+        if attack is None:
+            attack = self.attacks[(alert_obj.name, alert_obj.from_ip)] = WindowAttack()
+        attack.alerts.append((sequence, alert_obj))
+        count_up(attack.from_ports, alert_obj.from_port)
+        count_up(attack.to_ports, alert_obj.to_port)
+        count_up(attack.additional, alert_obj.additional)
+
+    def remove_alert(self, alert_obj):
+        self.alerts.popleft()
+        attack = self.attacks[(alert_obj.name, alert_obj.from_ip)]
+        attack.alerts.popleft()
+        count_down(attack.from_ports, alert_obj.from_port)
+        count_down(attack.to_ports, alert_obj.to_port)
+        count_down(attack.additional, alert_obj.additional)
+        if not attack.alerts:
+            del self.attacks[(alert_obj.name, alert_obj.from_ip)]
+
+    def first_appearance(self):
+        """sort key: index of the first alert in the window"""
+        return self.alerts[0][0]
+
+    def to_dict(self):
+        # the first alert in the window defines the direction of the edge
+        from_ip = self.alerts[0][1]
+        to_ip = self.key[1] if from_ip == self.key[0] else self.key[0]
+        attacks = sorted(self.attacks.items(), key=lambda item: item[1].alerts[0][0])
+        return {
+            'Attack Name': [name for (name, _), _ in attacks],
+            'Classification': [attack.alerts[0][1].classification for _, attack in attacks],
+            'Priority': [attack.alerts[0][1].priority for _, attack in attacks],
+            'From IP': from_ip,
+            'To IP': to_ip,
+            'Attack Direction': [0 if attack_from_ip == from_ip else 1 for (_, attack_from_ip), _ in attacks],
+            'From Ports': [list(attack.from_ports) for _, attack in attacks],
+            'To Ports': [list(attack.to_ports) for _, attack in attacks],
+            'Timestamps': [str(attack.alerts[0][1].timestamp) + " --- " + str(attack.alerts[-1][1].timestamp)
+                           for _, attack in attacks],
+            'Count': [len(attack.alerts) for _, attack in attacks],
+            'Weight': len(self.alerts),
+            'Additional': [list(attack.additional) for _, attack in attacks],
         }
+
+
+class WindowAttack:
+    """attack of a WindowEdge: alerts in the window and reference counted ports and additional information"""
+
+    def __init__(self):
+        self.alerts = deque()  # (index, alert object) of the alerts in the window (oldest first)
+        self.from_ports = {}
+        self.to_ports = {}
+        self.additional = {}
+
+
+def count_up(counts, key):
+    """add a reference to key (dict as ordered reference counting set)"""
+    counts[key] = counts.get(key, 0) + 1
+
+
+def count_down(counts, key):
+    """remove a reference to key, the key is removed if it is no longer referenced"""
+    if counts[key] == 1:
+        del counts[key]
+    else:
+        counts[key] -= 1
+
+
+class LogFollower:
+    """
+    follows a growing Snort log file (like tail -f): only the new complete alert blocks (ending with a blank line)
+    are imported and merged into the nodes and edges of a GraphAggregator
+    the byte offset and the aggregates are saved in a checkpoint, so a restart resumes at the offset
+    (at most every FOLLOW_CHECKPOINT_INTERVAL seconds and at exit, saving is proportional to all aggregates)
+    a rotated (other inode or first bytes) or truncated file is read from the beginning, the aggregates are kept
+    """
+
+    def __init__(self, file_path, checkpoint_path=None):
+        self.file_path = str(file_path)
+        self.checkpoint_path = checkpoint_path
+        self.offset = 0  # bytes of the file which are imported already
+        self.inode = None
+        self.head = b''  # first bytes of the file
+        self.num_alerts = 0
+        self.first_time = None  # timestamp of the earliest and latest imported alert (microseconds since EPOCH)
+        self.last_time = None
+        self.graph = GraphAggregator()
+        self.checkpoint_time = None  # time.monotonic() of the last saved checkpoint
+        self.unsaved = False  # True if alerts were imported since the last checkpoint
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_checkpoint()
+        if checkpoint_path:
+            atexit.register(self.flush_checkpoint)
+
+    def poll(self):
+        """
+        import the alert blocks appended since the last poll
+        :return: number of new validated alerts
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            # rotated, but the new file does not exist yet
+            return 0
+
+        num_new = 0
+        num_corrupted = 0
+        year = str(datetime.datetime.now().year)
+        with open(self.file_path, 'rb') as current:
+            head = current.read(FOLLOW_HEAD_SIZE)
+            if stat.st_ino != self.inode or stat.st_size < self.offset or \
+                    head[:len(self.head)] != self.head[:len(head)]:
+                if self.inode is not None:
+                    print('[*] Log file rotated or truncated, reading from the beginning')
+                self.inode = stat.st_ino
+                self.offset = 0
+            self.head = head
+
+            current.seek(self.offset)
+            while True:
+                data = current.read(FOLLOW_CHUNK_SIZE)
+                # only complete alert blocks, an incomplete last block is read again with the next poll
+                end = complete_blocks_end(data)
+                if end == 0:
+                    break
+                text = data[:end].decode(locale.getpreferredencoding(False))
+                # merged in file order (like the log grows), no sorted list of the alerts
+                for alert in split_alert_blocks(io.StringIO(text, newline=None)):
+                    alert_obj = parse_alert(alert, year)
+                    if not alert_obj.validate():
+                        num_corrupted += 1
+                        continue
+                    self.graph.add_alert(alert_obj)
+                    if self.first_time is None or alert_obj.time < self.first_time:
+                        self.first_time = alert_obj.time
+                    if self.last_time is None or alert_obj.time > self.last_time:
+                        self.last_time = alert_obj.time
+                    num_new += 1
+                self.offset += end
+                if len(data) < FOLLOW_CHUNK_SIZE:
+                    break
+                current.seek(self.offset)
+
+        self.num_alerts += num_new
+        if num_new or num_corrupted:
+            print('[*] Following: ' + str(num_new) + ' new alerts imported (' + str(num_corrupted) + ' ignored)')
+        if num_new and self.checkpoint_path:
+            self.unsaved = True
+            if self.checkpoint_time is None or \
+                    time.monotonic() - self.checkpoint_time >= FOLLOW_CHECKPOINT_INTERVAL:
+                self.save_checkpoint()
+        return num_new
+
+    def snapshot(self):
+        """return the nodes and edges (DataFrames) of all imported alerts"""
+        if not self.graph.nodes:
+            return pd.DataFrame(columns=NODE_COLUMNS), pd.DataFrame(columns=EDGE_COLUMNS)
+        return pd.DataFrame.from_records(node.to_dict() for node in self.graph.nodes), \
+            pd.DataFrame.from_records(edge.to_dict() for edge in self.graph.edges)
+
+    def save_checkpoint(self):
+        """save offset and aggregates (written to a temporary file first, so a crash keeps the old checkpoint)"""
+        # one temporary file per process (several server processes may follow the same file)
+        temp_path = self.checkpoint_path + '.' + str(os.getpid()) + '.tmp'
+        with open(temp_path, 'wb') as checkpoint:
+            pickle.dump({
+                'version': CHECKPOINT_VERSION,
+                'file_path': self.file_path,
+                'offset': self.offset,
+                'inode': self.inode,
+                'head': self.head,
+                'num_alerts': self.num_alerts,
+                'first_time': self.first_time,
+                'last_time': self.last_time,
+                'graph': self.graph,
+            }, checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.checkpoint_path)
+        self.checkpoint_time = time.monotonic()
+        self.unsaved = False
+
+    def flush_checkpoint(self):
+        """save the checkpoint if alerts were imported since the last one (e.g. at exit)"""
+        if self.unsaved:
+            self.save_checkpoint()
+
+    def load_checkpoint(self):
+        """resume from the checkpoint (ignored if it belongs to another log file)"""
+        with open(self.checkpoint_path, 'rb') as checkpoint:
+            state = pickle.load(checkpoint)
+        if state.get('version') != CHECKPOINT_VERSION:
+            print('[*] Checkpoint of an older version, starting from the beginning')
+            return
+        if state['file_path'] != self.file_path:
+            print('[*] Checkpoint belongs to ' + state['file_path'] + ', starting from the beginning')
+            return
+        self.offset = state['offset']
+        self.inode = state['inode']
+        self.head = state['head']
+        self.num_alerts = state['num_alerts']
+        self.first_time = state['first_time']
+        self.last_time = state['last_time']
+        self.graph = state['graph']
+        print('[*] Resuming from checkpoint (' + str(self.num_alerts) + ' alerts, offset ' + str(self.offset) + ')')
+
+
+def complete_blocks_end(data):
+    """
+    end of the last complete alert block in data (bytes), an alert block ends with a blank line
+    :return: number of bytes of the complete blocks (0 if there is none)
+    """
+    end = data.rfind(b'\n\n')
+    end = end + 2 if end != -1 else 0
+    crlf_end = data.rfind(b'\n\r\n')
+    if crlf_end != -1:
+        end = max(end, crlf_end + 3)
+    return end
+
+
+class SnapshotList:
+    """read-only list view of the nodes (part 0) or edges (part 1) DataFrames of TimeRangeSnapshots"""
+
+    def __init__(self, snapshots, part):
+        self.snapshots = snapshots
+        self.part = part
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def __getitem__(self, index):
+        return self.snapshots.get(index)[self.part]
+
+    def __iter__(self):
+        for index in range(len(self.snapshots)):
+            yield self[index]
+
+
+def ip_pair(ip_a, ip_b):
+    """key of an edge which is independent of the direction"""
+    if ip_a <= ip_b:
+        return ip_a, ip_b
+    return ip_b, ip_a
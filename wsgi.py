@@ -0,0 +1,52 @@
+#############################################################
+#            SnortNetViewer                               #
+#            author: David Krüger                           #
+#            https://github.com/david-tub/snort-net-viewer  #
+#############################################################
+# WSGI entry point to serve several users with several worker processes, e.g. with gunicorn:
+#   SNORT_NET_VIEWER_ARGS="--mode display-only --file_path alert" gunicorn --preload -w 4 --threads 4 wsgi:server
+# the arguments are the same as for main.py
+# with --preload the alerts are imported and the server is built once, the workers are forked with the data and
+# the precomputed figures, so they are not computed again in every worker
+# this is not a shared store: the memory pages are only shared until they are written, and reading python objects
+# writes their reference counts, so every worker ends up with its own copy of most of the data it uses
+# (caches filled while serving belong to one worker only)
+# mode follow needs a single worker process (every worker would follow the log file on its own)
+
+import gc
+import os
+import shlex
+import sys
+
+import main
+import server as my_server
+
+
+def gunicorn_workers():
+    """
+    number of worker processes of gunicorn (-w/--workers of its command line or GUNICORN_CMD_ARGS, WEB_CONCURRENCY)
+    :return: number of workers, 1 if not given
+    """
+    args = shlex.split(os.environ.get('GUNICORN_CMD_ARGS', '')) + sys.argv[1:]
+    workers = os.environ.get('WEB_CONCURRENCY', '1')
+    for index, arg in enumerate(args):
+        if arg in ('-w', '--workers') and index + 1 < len(args):
+            workers = args[index + 1]
+        elif arg.startswith('--workers='):
+            workers = arg[len('--workers='):]
+        elif arg.startswith('-w') and len(arg) > 2:
+            workers = arg[2:]
+    return int(workers)
+
+
+p = main.parse_arguments(shlex.split(os.environ.get('SNORT_NET_VIEWER_ARGS', '')))
+if p.mode == 'follow' and gunicorn_workers() > 1:
+    raise SystemExit('[*] ERROR: mode follow needs a single worker process (-w 1), every worker would follow the '
+                     'log file on its own')
+if not main.build_server(p):
+    raise SystemExit('[*] ERROR: mode ' + p.mode + ' does not display anything')
+# finish the figures before the workers are started (they are shared, not computed in every worker)
+my_server.wait_for_precomputing()
+# the garbage collector of the workers does not touch the objects built so far (fewer copied pages)
+gc.freeze()
+server = my_server.app.server